@@ -0,0 +1,22 @@
+import os
+from pathlib import Path
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 기본 데이터 경로는 작업 디렉터리가 아니라 프로젝트 루트 기준입니다.
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+# 트랙 카탈로그 파일 (.json, .csv, .sqlite/.sqlite3/.db). 시작할 때 읽지 못하면 서버가 뜨지 않습니다.
+TRACK_CATALOG_PATH = os.getenv("TRACK_CATALOG_PATH", str(DATA_DIR / "tracks.json"))
+# 카탈로그 파일이 바뀌었는지 확인하는 간격(초). 0이면 핫 리로드를 끕니다.
+TRACK_CATALOG_RELOAD_INTERVAL_SECONDS = float(os.getenv("TRACK_CATALOG_RELOAD_INTERVAL_SECONDS", "5"))
+# 목록 API 한 페이지의 최대 트랙 수
+TRACK_PAGE_MAX_LIMIT = int(os.getenv("TRACK_PAGE_MAX_LIMIT", "200"))
+
+# YAMNet 임베딩 최근접 이웃 인덱스 디렉터리 (python -m api.service.embedding_index build로 생성).
+# 디렉터리가 없으면 감정 → 카테고리 매핑으로만 추천합니다.
+TRACK_EMBEDDING_INDEX_PATH = os.getenv("TRACK_EMBEDDING_INDEX_PATH", str(DATA_DIR / "track_index"))
+TRACK_EMBEDDING_TOP_K = int(os.getenv("TRACK_EMBEDDING_TOP_K", "5"))
+# 검색 시 훑을 클러스터 수. 클수록 정확하지만 느려집니다.
+TRACK_EMBEDDING_NPROBE = int(os.getenv("TRACK_EMBEDDING_NPROBE", "16"))
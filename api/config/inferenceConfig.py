@@ -0,0 +1,58 @@
+import os
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# "thread", "process" 또는 "remote" (별도 추론 서버 프로세스 하나가 모델을 올리고 여러 HTTP 워커가 공유)
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", "2"))
+
+# remote 모드에서 HTTP 워커가 접속할 추론 서버의 유닉스 소켓 경로.
+# 소켓 디렉터리는 이 사용자만 쓸 수 있어야 하므로 기본값은 XDG_RUNTIME_DIR 또는 임시 디렉터리 아래의 사용자별 디렉터리입니다.
+INFERENCE_SERVER_SOCKET = os.getenv("INFERENCE_SERVER_SOCKET") or os.path.join(
+    os.getenv("XDG_RUNTIME_DIR") or tempfile.gettempdir(), f"vibe-{os.getuid()}", "inference.sock"
+)
+# HTTP 워커가 시작될 때 추론 서버가 뜨기를 기다리는 최대 시간
+INFERENCE_SERVER_CONNECT_TIMEOUT_SECONDS = float(os.getenv("INFERENCE_SERVER_CONNECT_TIMEOUT_SECONDS", "60"))
+# 추론 서버 프로세스의 Prometheus 지표 포트 (0이면 끔)
+INFERENCE_SERVER_METRICS_PORT = int(os.getenv("INFERENCE_SERVER_METRICS_PORT", "0"))
+
+# 동시에 들어온 클립을 모아 한 번에 추론하는 마이크로 배칭 설정 (최대 크기 1이면 비활성화)
+INFERENCE_BATCH_MAX_SIZE = int(os.getenv("INFERENCE_BATCH_MAX_SIZE", "8"))
+INFERENCE_BATCH_MAX_WAIT_MS = float(os.getenv("INFERENCE_BATCH_MAX_WAIT_MS", "10"))
+
+# YAMNet 추론 백엔드: "tensorflow" (SavedModel/TF Hub), "tflite", "onnx" (YAMNET_MODEL_PATH의 로컬 파일)
+YAMNET_BACKEND = os.getenv("YAMNET_BACKEND", "tensorflow")
+# tensorflow 백엔드가 불러올 로컬 SavedModel 디렉터리 경로 또는 TF Hub 핸들
+YAMNET_MODEL_HANDLE = os.getenv("YAMNET_MODEL_HANDLE", "https://tfhub.dev/google/yamnet/1")
+# tflite/onnx 백엔드가 불러올 모델 파일 (float16, int8 양자화 모델도 파일만 바꿔 지정)
+YAMNET_MODEL_PATH = os.getenv("YAMNET_MODEL_PATH", "")
+# 클래스 이름 CSV 경로 (비우면 모델 파일과 같은 디렉터리의 yamnet_class_map.csv)
+YAMNET_CLASS_MAP_PATH = os.getenv("YAMNET_CLASS_MAP_PATH", "")
+# tflite/onnx 런타임이 호출 하나에 쓸 스레드 수 (0이면 런타임 기본값)
+YAMNET_BACKEND_THREADS = int(os.getenv("YAMNET_BACKEND_THREADS", "0"))
+# 서버 시작 시 모델을 로드하고 합성 클립으로 워밍업할지 여부
+YAMNET_EAGER_LOAD = os.getenv("YAMNET_EAGER_LOAD", "true").lower() in ("1", "true", "yes")
+
+# 감정 점수 계산에 사용할 상위 클래스 수 (0이면 521개 클래스 전체를 사용)
+EMOTION_SCORE_TOP_K = int(os.getenv("EMOTION_SCORE_TOP_K", "10"))
+
+# 동일한 PCM에 대한 감정 분석 결과 캐시 ("memory", "redis", "none")
+ANALYSIS_CACHE_BACKEND = os.getenv("ANALYSIS_CACHE_BACKEND", "memory")
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "1024"))
+ANALYSIS_CACHE_TTL_SECONDS = float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", "600"))
+ANALYSIS_CACHE_REDIS_URL = os.getenv("ANALYSIS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+# 감정 매핑이나 모델을 바꾸면 이 값을 바꿔 공유 캐시의 이전 결과를 무시합니다.
+ANALYSIS_CACHE_NAMESPACE = os.getenv("ANALYSIS_CACHE_NAMESPACE", "vibe:emotion:v2")
+
+# 긴 녹음은 겹치는 구간으로 나눠 순차적으로 추론해 메모리 사용량을 일정하게 유지합니다.
+# 창 하나는 EMOTION_WINDOW_PATCHES개의 YAMNet 패치(패치 간격 0.48초)로 구성됩니다.
+EMOTION_WINDOW_PATCHES = int(os.getenv("EMOTION_WINDOW_PATCHES", "20"))
+EMOTION_WINDOWED_MIN_SECONDS = float(os.getenv("EMOTION_WINDOWED_MIN_SECONDS", "30"))
+
+# 거의 무음인 클립은 YAMNet을 거치지 않고 바로 calm으로 판정합니다.
+# RMS와 피크가 모두 기준(풀스케일 대비 dBFS) 이하일 때만 게이트에 걸립니다.
+SILENCE_GATE_ENABLED = os.getenv("SILENCE_GATE_ENABLED", "true").lower() in ("1", "true", "yes")
+SILENCE_GATE_RMS_DBFS = float(os.getenv("SILENCE_GATE_RMS_DBFS", "-50"))
+SILENCE_GATE_PEAK_DBFS = float(os.getenv("SILENCE_GATE_PEAK_DBFS", "-30"))
@@ -0,0 +1,33 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ANTHROPIC_MODEL = os.getenv("ANTHROPIC_MODEL", "claude-3-5-sonnet-20241022")
+# 로컬 스텁 서버 등으로 요청을 보낼 때 지정합니다.
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL") or None
+
+ANTHROPIC_CONNECT_TIMEOUT_SECONDS = float(os.getenv("ANTHROPIC_CONNECT_TIMEOUT_SECONDS", "3"))
+ANTHROPIC_READ_TIMEOUT_SECONDS = float(os.getenv("ANTHROPIC_READ_TIMEOUT_SECONDS", "30"))
+
+# 첫 시도 뒤 재시도 횟수. 음수면 시도 자체를 건너뛰게 되므로 0으로 맞춥니다.
+ANTHROPIC_MAX_RETRIES = max(0, int(os.getenv("ANTHROPIC_MAX_RETRIES", "2")))
+ANTHROPIC_RETRY_BASE_DELAY_SECONDS = float(os.getenv("ANTHROPIC_RETRY_BASE_DELAY_SECONDS", "0.5"))
+ANTHROPIC_RETRY_MAX_DELAY_SECONDS = float(os.getenv("ANTHROPIC_RETRY_MAX_DELAY_SECONDS", "4"))
+
+# 추천 메시지를 기다릴 최대 시간(ms). 넘으면 기본 메시지로 바로 응답하고, 늦게 온 답은 메시지 캐시에만 저장합니다 (0이면 끔).
+# 스트리밍은 첫 토큰까지의 시간에 적용됩니다.
+ANTHROPIC_LATENCY_BUDGET_MS = float(os.getenv("ANTHROPIC_LATENCY_BUDGET_MS", "8000"))
+# 예산 초과나 오류가 연속으로 이만큼 쌓이면 쿨다운 동안 Claude를 호출하지 않고 기본 메시지를 씁니다 (0이면 끔).
+ANTHROPIC_BREAKER_FAILURE_THRESHOLD = int(os.getenv("ANTHROPIC_BREAKER_FAILURE_THRESHOLD", "5"))
+ANTHROPIC_BREAKER_COOLDOWN_SECONDS = float(os.getenv("ANTHROPIC_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# 동시에 진행할 수 있는 Claude 호출 수와 HTTP 커넥션 풀 크기
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "16"))
+ANTHROPIC_MAX_CONNECTIONS = int(os.getenv("ANTHROPIC_MAX_CONNECTIONS", "32"))
+
+# 감정·감지된 소리·추천 곡 조합별 추천 메시지 캐시 ("memory", "sqlite", "none")
+MESSAGE_CACHE_BACKEND = os.getenv("MESSAGE_CACHE_BACKEND", "memory")
+MESSAGE_CACHE_MAX_ENTRIES = int(os.getenv("MESSAGE_CACHE_MAX_ENTRIES", "4096"))
+MESSAGE_CACHE_TTL_SECONDS = float(os.getenv("MESSAGE_CACHE_TTL_SECONDS", str(24 * 60 * 60)))
+MESSAGE_CACHE_SQLITE_PATH = os.getenv("MESSAGE_CACHE_SQLITE_PATH", "recommendation_cache.sqlite3")
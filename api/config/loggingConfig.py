@@ -0,0 +1,48 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+from typing import Optional
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# DEBUG로 두면 요청마다 단계별 진행 로그가 남습니다.
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "%(asctime)s %(levelname)s [%(process)d] %(name)s: %(message)s")
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_pid: Optional[int] = None
+
+
+def setup_logging():
+    """로거는 큐에 넣기만 하고, 별도 스레드가 큐를 비우며 stderr에 씁니다.
+
+    요청 처리 중 로그를 남겨도 이벤트 루프나 추론 워커가 터미널 출력을 기다리지 않습니다.
+    fork된 워커 프로세스는 부모의 리스너 스레드를 물려받지 못하므로 프로세스마다 새로 설정합니다.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    log_queue = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+
+    _listener = logging.handlers.QueueListener(log_queue, handler)
+    _listener_pid = os.getpid()
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    # 큐에 남은 로그를 모두 쓴 뒤 리스너 스레드를 멈춥니다.
+    global _listener
+    if _listener is not None and _listener_pid == os.getpid():
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,17 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# 바이너리 업로드(/analyze-emotion/upload)로 받을 수 있는 최대 WAV 크기
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+# /analyze-emotion/batch 요청 하나에 담을 수 있는 최대 클립 수
+MAX_BATCH_CLIPS = int(os.getenv("MAX_BATCH_CLIPS", "64"))
+
+# 감정 분석 요청(/analyze-emotion 계열)을 동시에 처리할 최대 수와, 자리가 나기를 기다릴 수 있는 최대 요청 수
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "32"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+# 대기열이 가득 찼을 때 돌려줄 상태 코드 (503 또는 429). 응답에는 Retry-After 헤더가 붙습니다.
+ADMISSION_REJECT_STATUS = int(os.getenv("ADMISSION_REJECT_STATUS", "503"))
+# 요청 하나가 대기부터 분석, 추천 메시지까지 마쳐야 하는 기한(초). 넘으면 남은 작업을 취소하고 504 (0이면 끔)
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", "30"))
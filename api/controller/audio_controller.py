@@ -1,54 +1,421 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from api.model.schemas import EmotionMusicRecommendationResponse
-from api.service.music_service import MusicService
-from api.service.emotion_service import EmotionService
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Literal, Optional, Tuple, TypeVar
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from api.controller.dependencies import Services, get_services
+from api.controller.responses import RawJSON, dumps, encode_object, json_response
+from api.service.admission import ClientDisconnected, DeadlineExceeded, Overloaded
+from api.service.audio_ingest import InvalidAudioError
+from api.model.schemas import (
+    BatchAnalysisResponse,
+    BatchClipResult,
+    BatchSummary,
+    EmotionMusicRecommendationResponse,
+    MusicRecommendationResponse,
+    Track,
+    TrackPage,
+)
+from api.config.inferenceConfig import (
+    EMOTION_WINDOWED_MIN_SECONDS,
+    SILENCE_GATE_ENABLED,
+    SILENCE_GATE_RMS_DBFS,
+    SILENCE_GATE_PEAK_DBFS,
+)
+from api.config.serverConfig import MAX_UPLOAD_BYTES, MAX_BATCH_CLIPS, ADMISSION_REJECT_STATUS
+from api.config.catalogConfig import TRACK_PAGE_MAX_LIMIT
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
-music_service = MusicService()
-emotion_service = EmotionService()
+
+T = TypeVar("T")
 
 class AudioAnalysisRequest(BaseModel):
     audioData: str
+    includeTimeline: bool = False
 
-@router.post("/analyze-emotion", response_model=EmotionMusicRecommendationResponse)
-async def analyze_emotion(request: AudioAnalysisRequest):
+class SoundAnalysisRequest(BaseModel):
+    audioData: str
+
+class BatchClip(BaseModel):
+    id: Optional[str] = None
+    audioData: str
+
+class BatchAnalysisRequest(BaseModel):
+    clips: List[BatchClip] = Field(min_length=1, max_length=MAX_BATCH_CLIPS)
+    # "none"이면 Claude를 호출하지 않고, "shared"면 배치 전체의 대표 감정으로 추천 메시지 하나를 만듭니다.
+    message: Literal["none", "shared"] = "none"
+
+RAW_AUDIO_CONTENT_TYPES = ("audio/wav", "audio/x-wav", "audio/wave", "application/octet-stream")
+
+async def _admitted(services: Services, request: Request, work: Callable[[], Awaitable[T]]) -> T:
+    """동시 처리 한도와 대기열, 요청 기한을 거쳐 work()를 실행하고, 거절·초과·연결 끊김을 HTTP 오류로 바꿉니다."""
     try:
-        print("[Step 1] YAMNet으로 감정 분석 중...")
-        emotion, confidence, emotion_details = emotion_service.analyze_emotion_from_base64(request.audioData)
+        return await services.admission.run(request, work)
+    except Overloaded as e:
+        raise HTTPException(status_code=ADMISSION_REJECT_STATUS, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except ClientDisconnected as e:
+        # 받을 클라이언트가 없으므로 본문은 의미가 없고, 지표에서 구분할 수 있도록 nginx 관례의 499로 기록합니다.
+        raise HTTPException(status_code=499, detail=str(e))
+
+def _analysis_error(route: str, e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, InvalidAudioError):
+        # 잘못된 base64나 WAV는 다시 보내도 같은 결과이므로 로그 없이 바로 400을 돌려줍니다.
+        # 그 밖의 ValueError(설정 오류, numpy 내부 오류 등)는 서버 쪽 문제이므로 기록하고 500으로 돌려줍니다.
+        return HTTPException(status_code=400, detail=str(e))
+    logger.exception("Error in %s", route)
+    return HTTPException(status_code=500, detail=str(e))
+
+async def _analyze_emotion(services: Services, fingerprint_method: str, audio_data, include_timeline: bool = False):
+    audio_bytes, cache_key, duration = await services.inference_executor.run(fingerprint_method, audio_data)
+    if include_timeline:
+        cache_key = f"{cache_key}:timeline"
+    cached = services.analysis_cache.get(cache_key)
+    if cached is not None:
+        emotion, confidence, emotion_details = cached
+        return emotion, confidence, emotion_details
+
+    if include_timeline or duration > EMOTION_WINDOWED_MIN_SECONDS:
+        # 긴 녹음은 전체 파형을 만들지 않고 구간 단위로 추론해 메모리 사용량을 제한합니다.
+        result = await services.inference_executor.run('analyze_windowed', audio_bytes, include_timeline)
+    else:
+        waveform, result = await services.inference_executor.run('decode_audio_bytes_gated', audio_bytes)
+        if result is None:
+            result = await services.inference_batcher.analyze(waveform)
+
+    _store_analysis(services, cache_key, result)
+    return result
+
+def _store_analysis(services: Services, cache_key: str, result):
+    if 'silence_gate' in result[2]:
+        services.silence_gate_stats['absorbed'] += 1
+    services.analysis_cache.set(cache_key, result)
+
+async def _analyze_batch(services: Services, audio_list: List[str]) -> List[Tuple[Optional[tuple], Optional[str]]]:
+    """클립마다 (분석 결과, None) 또는 (None, 오류 메시지)를 돌려줍니다.
+
+    캐시에 없는 짧은 클립은 한 번의 워커 호출로 함께 디코딩·리샘플링하고, 한 번의 YAMNet 호출로 함께 추론합니다.
+    """
+    outcomes: List[Tuple[Optional[tuple], Optional[str]]] = [(None, None)] * len(audio_list)
+    fingerprints = await services.inference_executor.run('run_each', 'fingerprint_audio_base64', audio_list)
 
-        print(f"[감정 분석 완료] 감정: {emotion}, 신뢰도: {confidence:.2f}")
-        print(f"[감지된 소리] {', '.join([c['name'] for c in emotion_details.get('top_classes', [])][:3])}")
+    short_clips = []
+    long_clips = []
+    for index, (fingerprint, error) in enumerate(fingerprints):
+        if error is not None:
+            outcomes[index] = (None, error)
+            continue
 
-        print("[Step 2] Claude API로 음악 추천 중...")
-        recommendation_result = music_service.get_recommendations_by_emotion_with_claude(
-            emotion,
-            emotion_details
+        audio_bytes, cache_key, duration = fingerprint
+        cached = services.analysis_cache.get(cache_key)
+        if cached is not None:
+            outcomes[index] = (tuple(cached), None)
+        elif duration > EMOTION_WINDOWED_MIN_SECONDS:
+            long_clips.append((index, audio_bytes, cache_key))
+        else:
+            short_clips.append((index, audio_bytes, cache_key))
+
+    async def analyze_long(index: int, audio_bytes: bytes, cache_key: str):
+        try:
+            result = await services.inference_executor.run('analyze_windowed', audio_bytes)
+        except Exception as e:
+            outcomes[index] = (None, str(e))
+            return
+        _store_analysis(services, cache_key, result)
+        outcomes[index] = (result, None)
+
+    async def analyze_short():
+        if not short_clips:
+            return
+
+        decoded = await services.inference_executor.run('run_each', 'decode_audio_bytes_gated', [clip[1] for clip in short_clips])
+        waveforms = []
+        for (index, _, cache_key), (prepared, error) in zip(short_clips, decoded):
+            if error is not None:
+                outcomes[index] = (None, error)
+                continue
+            waveform, gated = prepared
+            if gated is not None:
+                _store_analysis(services, cache_key, gated)
+                outcomes[index] = (gated, None)
+            else:
+                waveforms.append((index, cache_key, waveform))
+
+        if not waveforms:
+            return
+        try:
+            results = await services.inference_executor.run('analyze_waveforms', [waveform for _, _, waveform in waveforms])
+        except Exception as e:
+            for index, _, _ in waveforms:
+                outcomes[index] = (None, str(e))
+            return
+        for (index, cache_key, _), result in zip(waveforms, results):
+            _store_analysis(services, cache_key, result)
+            outcomes[index] = (result, None)
+
+    await asyncio.gather(analyze_short(), *[analyze_long(*clip) for clip in long_clips])
+    return outcomes
+
+async def _recommend(services: Services, emotion: str, confidence: float, emotion_details: dict) -> bytes:
+    """추천을 만들어 EmotionMusicRecommendationResponse 형태의 JSON 본문을 돌려줍니다."""
+    logger.info(
+        "감정 분석 완료: %s (신뢰도 %.2f), 감지된 소리: %s",
+        emotion, confidence, ', '.join([c['name'] for c in emotion_details.get('top_classes', [])][:3])
+    )
+
+    logger.debug("[Step 2] Claude API로 음악 추천 중...")
+    recommendation_result = await services.music_service.get_recommendations_by_emotion_with_claude(
+        emotion,
+        emotion_details
+    )
+
+    logger.debug(
+        "[추천 완료] %d개의 음악 추천, 메시지 미리보기: %.100s",
+        len(recommendation_result['tracks']), recommendation_result['recommendation_message']
+    )
+
+    return encode_object({
+        'emotion': emotion,
+        'confidence': confidence,
+        'emotion_description': services.emotion_service.get_emotion_description(emotion),
+        'recommendation_message': recommendation_result['recommendation_message'],
+        'recommendations': RawJSON(services.music_service.catalog.encode_tracks(recommendation_result['tracks'])),
+        'emotion_details': emotion_details,
+    })
+
+@router.post("/analyze-sound", response_model=MusicRecommendationResponse)
+def analyze_sound(request: SoundAnalysisRequest, services: Services = Depends(get_services)):
+    """YAMNet 없이 에너지·ZCR·스펙트럼 중심만으로 주변 소리 카테고리를 정하는 가벼운 분석 경로입니다."""
+    try:
+        category, confidence = services.audio_service.analyze_audio_base64(request.audioData)
+    except Exception as e:
+        raise _analysis_error("analyze_sound", e)
+    category_info = services.audio_service.get_category_info(category)
+    tracks = services.music_service.get_recommendations_by_category(category)
+    return json_response(encode_object({
+        'category': category_info["name"],
+        'description': category_info["description"],
+        'recommendations': RawJSON(services.music_service.catalog.encode_tracks(tracks)),
+    }))
+
+@router.post("/analyze-emotion", response_model=EmotionMusicRecommendationResponse)
+async def analyze_emotion(request: AudioAnalysisRequest, http_request: Request, services: Services = Depends(get_services)):
+    async def work():
+        logger.debug("[Step 1] YAMNet으로 감정 분석 중...")
+        emotion, confidence, emotion_details = await _analyze_emotion(
+            services, 'fingerprint_audio_base64', request.audioData, request.includeTimeline
         )
+        return await _recommend(services, emotion, confidence, emotion_details)
+
+    try:
+        return json_response(await _admitted(services, http_request, work))
+    except Exception as e:
+        raise _analysis_error("analyze_emotion", e)
+
+@router.post("/analyze-emotion/batch", response_model=BatchAnalysisResponse)
+async def analyze_emotion_batch(request: BatchAnalysisRequest, http_request: Request, services: Services = Depends(get_services)):
+    """여러 클립을 한 번에 분석합니다. 실패한 클립은 해당 결과의 error에만 기록되고 나머지는 정상 처리됩니다."""
+    try:
+        response = await _admitted(services, http_request, lambda: _analyze_emotion_batch(services, request))
+        # 이미 검증한 모델이므로 pydantic-core로 바로 JSON 바이트를 만듭니다.
+        return json_response(response.model_dump_json().encode())
+    except Exception as e:
+        raise _analysis_error("analyze_emotion_batch", e)
 
-        print(f"[추천 완료] {len(recommendation_result['tracks'])}개의 음악 추천")
-        print(f"[추천 메시지 미리보기] {recommendation_result['recommendation_message'][:100]}...")
+async def _analyze_emotion_batch(services: Services, request: BatchAnalysisRequest) -> BatchAnalysisResponse:
+    logger.debug("[Step 1] YAMNet으로 %d개 클립 감정 분석 중...", len(request.clips))
+    outcomes = await _analyze_batch(services, [clip.audioData for clip in request.clips])
 
-        return EmotionMusicRecommendationResponse(
+    results = []
+    for position, (clip, (analysis, error)) in enumerate(zip(request.clips, outcomes)):
+        clip_id = clip.id if clip.id is not None else str(position)
+        if error is not None:
+            results.append(BatchClipResult(id=clip_id, error=error))
+            continue
+
+        emotion, confidence, emotion_details = analysis
+        results.append(BatchClipResult(
+            id=clip_id,
             emotion=emotion,
             confidence=confidence,
-            emotion_description=emotion_service.get_emotion_description(emotion),
-            recommendation_message=recommendation_result['recommendation_message'],
-            recommendations=recommendation_result['tracks'],
+            emotion_description=services.emotion_service.get_emotion_description(emotion),
             emotion_details=emotion_details
+        ))
+
+    return BatchAnalysisResponse(results=results, summary=await _summarize_batch(services, results, request.message))
+
+async def _summarize_batch(services: Services, results: List[BatchClipResult], message: str) -> Optional[BatchSummary]:
+    succeeded = [result for result in results if result.error is None]
+    if not succeeded:
+        return None
+
+    # 신뢰도 합이 가장 큰 감정을 대표 감정으로 고르고, 그 감정 중 가장 확실한 클립의 세부 정보로 추천합니다.
+    weights = {}
+    for result in succeeded:
+        weights[result.emotion] = weights.get(result.emotion, 0.0) + result.confidence
+    emotion = max(weights, key=weights.get)
+    representative = max((result for result in succeeded if result.emotion == emotion), key=lambda result: result.confidence)
+
+    if message == "shared":
+        logger.debug("[Step 2] Claude API로 배치 요약 추천 중...")
+        recommendation = await services.music_service.get_recommendations_by_emotion_with_claude(emotion, representative.emotion_details)
+        tracks, recommendation_message = recommendation['tracks'], recommendation['recommendation_message']
+    else:
+        tracks, recommendation_message = services.music_service.select_recommended_tracks(emotion, representative.emotion_details), None
+
+    return BatchSummary(
+        emotion=emotion,
+        confidence=weights[emotion] / len(succeeded),
+        emotion_description=services.emotion_service.get_emotion_description(emotion),
+        recommendations=tracks,
+        recommendation_message=recommendation_message
+    )
+
+def _sse_event(event: str, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + data + b"\n\n"
+
+@router.post("/analyze-emotion/stream")
+async def analyze_emotion_stream(request: AudioAnalysisRequest, http_request: Request, services: Services = Depends(get_services)):
+    """감정 분석 결과와 추천 곡을 먼저 보내고, Claude 추천 메시지는 SSE로 토큰 단위로 이어서 보냅니다.
+
+    이벤트 순서: analysis → message (여러 번) → done
+    동시 처리 한도와 요청 기한은 분석 단계에만 적용됩니다. 메시지 스트림은 연결이 끊기면 Starlette가 멈춥니다.
+    """
+    async def work():
+        logger.debug("[Step 1] YAMNet으로 감정 분석 중...")
+        emotion, confidence, emotion_details = await _analyze_emotion(
+            services, 'fingerprint_audio_base64', request.audioData, request.includeTimeline
         )
+        return emotion, confidence, emotion_details, services.music_service.select_recommended_tracks(emotion, emotion_details)
+
+    try:
+        emotion, confidence, emotion_details, recommended_tracks = await _admitted(services, http_request, work)
+    except Exception as e:
+        raise _analysis_error("analyze_emotion_stream", e)
 
+    async def event_stream():
+        yield _sse_event("analysis", encode_object({
+            "emotion": emotion,
+            "confidence": confidence,
+            "emotion_description": services.emotion_service.get_emotion_description(emotion),
+            "recommendations": RawJSON(services.music_service.catalog.encode_tracks(recommended_tracks)),
+            "emotion_details": emotion_details,
+        }))
+
+        async for text in services.music_service.stream_recommendation_message(emotion, emotion_details, recommended_tracks):
+            yield _sse_event("message", dumps({"text": text}))
+
+        yield _sse_event("done", b"{}")
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _read_upload(request: Request) -> bytes:
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"Audio exceeds {MAX_UPLOAD_BYTES} bytes")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    if content_type == "multipart/form-data":
+        form = await request.form(max_files=1)
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="multipart body must contain a 'file' field")
+        if upload.size is not None and upload.size > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"Audio exceeds {MAX_UPLOAD_BYTES} bytes")
+        return await upload.read()
+
+    if content_type in RAW_AUDIO_CONTENT_TYPES:
+        body = bytearray()
+        async for chunk in request.stream():
+            body += chunk
+            if len(body) > MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"Audio exceeds {MAX_UPLOAD_BYTES} bytes")
+        return body
+
+    raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type or 'none'}")
+
+@router.post(
+    "/analyze-emotion/upload",
+    response_model=EmotionMusicRecommendationResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                        "required": ["file"],
+                    }
+                },
+                "audio/wav": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def analyze_emotion_upload(request: Request, includeTimeline: bool = False, services: Services = Depends(get_services)):
+    audio_data = await _read_upload(request)
+
+    async def work():
+        logger.debug("[Step 1] YAMNet으로 감정 분석 중...")
+        emotion, confidence, emotion_details = await _analyze_emotion(services, 'fingerprint_audio_bytes', audio_data, includeTimeline)
+        return await _recommend(services, emotion, confidence, emotion_details)
+
+    try:
+        return json_response(await _admitted(services, request, work))
     except Exception as e:
-        print(f"Error in analyze_emotion: {e}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _analysis_error("analyze_emotion_upload", e)
 
 @router.get("/emotions")
-async def get_emotions():
+async def get_emotions(services: Services = Depends(get_services)):
+    return json_response(services.emotions_json)
+
+@router.get("/tracks", response_model=TrackPage)
+async def list_tracks(
+    category: Optional[str] = None,
+    artist: Optional[str] = None,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=TRACK_PAGE_MAX_LIMIT),
+    services: Services = Depends(get_services)
+):
+    # 트랙 JSON은 카탈로그 로드 시 미리 직렬화해 두었으므로 모델 검증 없이 그대로 이어 붙여 보냅니다.
+    body = services.music_service.catalog.page_json(offset=offset, limit=limit, category=category, artist=artist)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/tracks/{track_id}", response_model=Track)
+async def get_track(track_id: str, services: Services = Depends(get_services)):
+    body = services.music_service.catalog.get_encoded(track_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Track not found: {track_id}")
+    return Response(content=body, media_type="application/json")
+
+@router.get("/inference/stats")
+async def get_inference_stats(services: Services = Depends(get_services)):
     return {
-        "emotions": [
-            {"id": emotion_id, "description": description}
-            for emotion_id, description in emotion_service.emotion_descriptions.items()
-        ]
+        **services.inference_executor.stats(),
+        'backend': services.emotion_service.backend,
+        'batching': services.inference_batcher.stats(),
+        'admission': services.admission.stats(),
+        'cache': services.analysis_cache.stats(),
+        'silence_gate': {
+            'enabled': SILENCE_GATE_ENABLED,
+            'rms_dbfs': SILENCE_GATE_RMS_DBFS,
+            'peak_dbfs': SILENCE_GATE_PEAK_DBFS,
+            **services.silence_gate_stats,
+        },
     }
+
+@router.get("/recommendation/stats")
+async def get_recommendation_stats(services: Services = Depends(get_services)):
+    return services.music_service.stats()
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Optional
+
+from fastapi import Request
+
+from api.controller.responses import dumps
+from api.service.audio_service import AudioService
+from api.service.music_service import MusicService
+from api.service.emotion_service import EmotionService
+from api.service.inference_executor import create_inference_executor
+from api.service.inference_batcher import InferenceBatcher
+from api.service.cache_backend import create_cache_backend
+from api.service.admission import AdmissionController
+from api.service.circuit_breaker import CIRCUIT_STATE_VALUES
+from api.service.metrics import (
+    ADMISSION_ACTIVE,
+    ADMISSION_WAITING,
+    ANTHROPIC_IN_FLIGHT,
+    BATCHER_PENDING,
+    INFERENCE_IN_FLIGHT,
+    INFERENCE_QUEUE_DEPTH,
+    LLM_CIRCUIT_STATE,
+)
+from api.config.inferenceConfig import (
+    INFERENCE_EXECUTOR,
+    INFERENCE_WORKERS,
+    INFERENCE_SERVER_SOCKET,
+    INFERENCE_SERVER_CONNECT_TIMEOUT_SECONDS,
+    INFERENCE_BATCH_MAX_SIZE,
+    INFERENCE_BATCH_MAX_WAIT_MS,
+    YAMNET_EAGER_LOAD,
+    ANALYSIS_CACHE_BACKEND,
+    ANALYSIS_CACHE_MAX_ENTRIES,
+    ANALYSIS_CACHE_TTL_SECONDS,
+    ANALYSIS_CACHE_REDIS_URL,
+    ANALYSIS_CACHE_NAMESPACE,
+)
+from api.config.catalogConfig import TRACK_CATALOG_RELOAD_INTERVAL_SECONDS
+from api.config.serverConfig import ADMISSION_MAX_CONCURRENCY, ADMISSION_MAX_QUEUE, REQUEST_DEADLINE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """요청 처리에 쓰는 서비스 묶음. 앱 lifespan에서 만들어 app.state.services에 두고 get_services로 주입합니다.
+
+    모듈을 불러오는 것만으로는 서비스가 만들어지지 않으므로, 테스트나 도구는 필요한 서비스만 직접 만들 수 있고
+    벤치마크는 가짜 모델을 설치한 Services를 main.create_app()에 넘길 수 있습니다.
+    """
+
+    def __init__(self):
+        self.audio_service = AudioService()
+        self.music_service = MusicService()
+        self.emotion_service = EmotionService()
+        self.inference_executor = create_inference_executor(
+            self.emotion_service,
+            INFERENCE_EXECUTOR,
+            max_workers=INFERENCE_WORKERS,
+            eager_load=YAMNET_EAGER_LOAD,
+            server_socket=INFERENCE_SERVER_SOCKET,
+            connect_timeout=INFERENCE_SERVER_CONNECT_TIMEOUT_SECONDS
+        )
+        self.inference_batcher = InferenceBatcher(
+            self.inference_executor,
+            max_batch_size=INFERENCE_BATCH_MAX_SIZE,
+            max_wait_ms=INFERENCE_BATCH_MAX_WAIT_MS
+        )
+        self.analysis_cache = create_cache_backend(
+            ANALYSIS_CACHE_BACKEND,
+            max_entries=ANALYSIS_CACHE_MAX_ENTRIES,
+            ttl_seconds=ANALYSIS_CACHE_TTL_SECONDS,
+            redis_url=ANALYSIS_CACHE_REDIS_URL,
+            namespace=ANALYSIS_CACHE_NAMESPACE
+        )
+        self.admission = AdmissionController(
+            max_concurrency=ADMISSION_MAX_CONCURRENCY,
+            max_queue=ADMISSION_MAX_QUEUE,
+            deadline_seconds=REQUEST_DEADLINE_SECONDS
+        )
+        # /api/emotions 응답은 바뀌지 않으므로 한 번만 직렬화합니다.
+        self.emotions_json = dumps({
+            "emotions": [
+                {"id": emotion_id, "description": description}
+                for emotion_id, description in self.emotion_service.emotion_descriptions.items()
+            ]
+        })
+        # 무음 게이트가 YAMNet 없이 처리한 요청 수 (캐시 적중은 제외)
+        self.silence_gate_stats = {'absorbed': 0}
+        self._preload_task: Optional[asyncio.Task] = None
+
+    async def startup(self):
+        # 게이지는 요청마다 갱신하지 않고 /metrics를 수집할 때 현재 상태를 읽습니다.
+        INFERENCE_IN_FLIGHT.set_function(lambda: self.inference_executor.stats()['active'])
+        INFERENCE_QUEUE_DEPTH.set_function(lambda: self.inference_executor.stats()['queue_depth'])
+        BATCHER_PENDING.set_function(lambda: self.inference_batcher.stats()['pending'])
+        ANTHROPIC_IN_FLIGHT.set_function(lambda: self.music_service.llm_in_flight)
+        LLM_CIRCUIT_STATE.set_function(lambda: CIRCUIT_STATE_VALUES[self.music_service.breaker.state])
+        ADMISSION_ACTIVE.set_function(lambda: self.admission.stats()['active'])
+        ADMISSION_WAITING.set_function(lambda: self.admission.stats()['waiting'])
+
+        self.music_service.start_catalog_watch(TRACK_CATALOG_RELOAD_INTERVAL_SECONDS)
+        # 모델 워밍업과 Claude SDK 로드는 요청을 받기 시작한 뒤 진행해, 추론이 필요 없는 라우트가 기다리지 않게 합니다.
+        self._preload_task = asyncio.create_task(self._preload())
+
+    async def _preload(self):
+        try:
+            await asyncio.to_thread(self.music_service.preload_client)
+            if YAMNET_EAGER_LOAD:
+                await self.inference_executor.warmup()
+        except Exception:
+            # 워밍업이 실패해도 추론은 첫 요청에서 모델을 다시 로드하며, 그동안 /ready는 503을 반환합니다.
+            logger.exception("Startup preload failed")
+
+    async def shutdown(self):
+        if self._preload_task is not None:
+            self._preload_task.cancel()
+        self.inference_executor.shutdown()
+        await self.music_service.aclose()
+
+    def is_ready(self) -> bool:
+        return self.inference_executor.is_ready or not YAMNET_EAGER_LOAD
+
+
+def get_services(request: Request) -> Services:
+    return request.app.state.services
@@ -0,0 +1,32 @@
+"""검증과 파이썬 객체 변환을 다시 거치지 않는 응답 직렬화.
+
+라우트가 Response를 직접 돌려주면 FastAPI는 response_model로 다시 검증하거나 직렬화하지 않으므로,
+response_model은 OpenAPI 스키마에만 쓰입니다. 카탈로그 트랙은 로드할 때 직렬화해 둔 바이트를 이어 붙이고,
+나머지 값은 orjson으로 씁니다.
+"""
+from typing import Any, Dict
+
+import orjson
+from fastapi import Response
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class RawJSON(bytes):
+    """이미 JSON으로 직렬화한 값. encode_object()가 다시 인코딩하지 않고 그대로 넣습니다."""
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=_OPTIONS)
+
+
+def encode_object(fields: Dict[str, Any]) -> bytes:
+    """fields를 순서대로 JSON 객체로 씁니다. RawJSON 값은 그대로 이어 붙입니다."""
+    return b'{' + b','.join(
+        dumps(key) + b':' + (value if isinstance(value, RawJSON) else dumps(value))
+        for key, value in fields.items()
+    ) + b'}'
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    return Response(content=body, status_code=status_code, media_type="application/json")
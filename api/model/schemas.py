@@ -15,6 +15,12 @@ class Track(BaseModel):
     audioUrl: str
     duration: int
 
+class TrackPage(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    tracks: List[Track]
+
 class MusicRecommendationResponse(BaseModel):
     category: str
     description: str
@@ -33,3 +39,22 @@ class EmotionMusicRecommendationResponse(BaseModel):
     recommendation_message: str
     recommendations: List[Track]
     emotion_details: Optional[Dict[str, Any]] = None
+
+class BatchClipResult(BaseModel):
+    id: str
+    emotion: Optional[str] = None
+    confidence: Optional[float] = None
+    emotion_description: Optional[str] = None
+    emotion_details: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+class BatchSummary(BaseModel):
+    emotion: str
+    confidence: float
+    emotion_description: str
+    recommendations: List[Track]
+    recommendation_message: Optional[str] = None
+
+class BatchAnalysisResponse(BaseModel):
+    results: List[BatchClipResult]
+    summary: Optional[BatchSummary] = None
@@ -0,0 +1,135 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from starlette.requests import Request
+
+from api.service.metrics import ADMISSION_REJECTED
+
+T = TypeVar("T")
+
+
+class Overloaded(RuntimeError):
+    """대기열이 가득 차 요청을 받지 않았습니다. retry_after는 클라이언트에 권할 재시도 간격(초)입니다."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Server is overloaded, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class DeadlineExceeded(RuntimeError):
+    pass
+
+
+class ClientDisconnected(RuntimeError):
+    pass
+
+
+class AdmissionController:
+    """분석 파이프라인 앞에서 동시 처리 수를 max_concurrency로, 자리를 기다리는 요청 수를 max_queue로 제한합니다.
+
+    대기열까지 가득 차면 기다리지 않고 바로 Overloaded를 던집니다. run()은 요청마다 대기와 처리를 합친
+    종단 간 기한을 두고, 기한이 지나거나 클라이언트 연결이 끊기면 대기 중이거나 실행 중인 작업을 취소합니다.
+    """
+
+    def __init__(self, max_concurrency: int = 32, max_queue: int = 64, deadline_seconds: float = 30.0):
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_queue = max(0, max_queue)
+        self.deadline_seconds = deadline_seconds
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._active = 0
+        self._waiting = 0
+        # 자리 하나를 차지하는 평균 시간(초)의 지수 이동 평균. Retry-After 추정에 씁니다.
+        self._hold_seconds = 1.0
+
+        self._admitted = 0
+        self._shed = 0
+        self._timed_out = 0
+        self._disconnected = 0
+
+    def retry_after(self) -> int:
+        # 앞선 대기열이 모두 빠지는 데 걸릴 시간을 어림합니다.
+        return max(1, math.ceil(self._hold_seconds * (self._waiting + 1) / self.max_concurrency))
+
+    @asynccontextmanager
+    async def slot(self):
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            self._shed += 1
+            ADMISSION_REJECTED.labels("shed").inc()
+            raise Overloaded(self.retry_after())
+
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        self._admitted += 1
+        self._active += 1
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._active -= 1
+            self._slots.release()
+            self._hold_seconds = 0.8 * self._hold_seconds + 0.2 * (time.monotonic() - started)
+
+    async def run(
+        self,
+        request: Optional[Request],
+        work: Callable[[], Awaitable[T]],
+        deadline_seconds: Optional[float] = None
+    ) -> T:
+        """자리를 얻은 뒤 work()를 실행합니다. 기한 초과는 DeadlineExceeded, 연결 끊김은 ClientDisconnected로 알립니다."""
+
+        async def admitted():
+            async with self.slot():
+                return await work()
+
+        task = asyncio.ensure_future(admitted())
+        watcher = asyncio.ensure_future(_wait_for_disconnect(request)) if request is not None else None
+        waiters = {task} if watcher is None else {task, watcher}
+        timeout = self.deadline_seconds if deadline_seconds is None else deadline_seconds
+        try:
+            done, _ = await asyncio.wait(waiters, timeout=timeout if timeout > 0 else None, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+            if not task.done():
+                task.cancel()
+                # 취소가 대기열과 워커 큐까지 전달되도록 작업이 정리될 때까지 기다립니다.
+                await asyncio.gather(task, return_exceptions=True)
+
+        if task in done:
+            return task.result()
+        if watcher is not None and watcher in done:
+            self._disconnected += 1
+            ADMISSION_REJECTED.labels("disconnected").inc()
+            raise ClientDisconnected("Client disconnected before the response was ready")
+        self._timed_out += 1
+        ADMISSION_REJECTED.labels("timeout").inc()
+        raise DeadlineExceeded(f"Request did not finish within {timeout:g}s")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_concurrency': self.max_concurrency,
+            'max_queue': self.max_queue,
+            'deadline_seconds': self.deadline_seconds,
+            'active': self._active,
+            'waiting': self._waiting,
+            'admitted': self._admitted,
+            'shed': self._shed,
+            'timed_out': self._timed_out,
+            'disconnected': self._disconnected,
+            'retry_after_seconds': self.retry_after(),
+        }
+
+
+async def _wait_for_disconnect(request: Request):
+    # 본문을 다 읽은 뒤의 receive()는 클라이언트가 연결을 끊을 때(또는 응답을 다 보낸 뒤) http.disconnect를 돌려줍니다.
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
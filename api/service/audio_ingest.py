@@ -0,0 +1,206 @@
+import base64
+import binascii
+import hashlib
+import struct
+from typing import Tuple, Union
+
+import numpy as np
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+_PCM_DTYPES = {
+    8: np.dtype('u1'),
+    16: np.dtype('<i2'),
+    32: np.dtype('<i4'),
+}
+_FLOAT_DTYPES = {
+    32: np.dtype('<f4'),
+    64: np.dtype('<f8'),
+}
+
+class InvalidAudioError(ValueError):
+    """클라이언트가 보낸 base64나 WAV를 해석할 수 없습니다. 컨트롤러는 이 오류만 400으로 돌려줍니다."""
+
+
+# 다운믹스/정규화를 처리하는 블록 크기 (float32 출력 기준 256KB로 L2 캐시에 들어갑니다)
+_BLOCK_FRAMES = 1 << 16
+
+
+def decode_base64_audio(audio_base64: str) -> bytes:
+    try:
+        return base64.b64decode(audio_base64)
+    except (binascii.Error, ValueError) as e:
+        raise InvalidAudioError(f"Invalid base64 audio: {e}") from e
+
+
+def read_wav(buffer: Buffer) -> Tuple[int, np.ndarray]:
+    """WAV 바이트에서 샘플레이트와 PCM 배열을 읽습니다.
+
+    반환되는 배열은 입력 버퍼를 복사하지 않는 뷰이며, scipy.io.wavfile.read와
+    같이 모노는 (frames,), 다채널은 (frames, channels) 모양입니다. 24비트 PCM만은
+    상위 3바이트에 값을 채운 int32 배열로 한 번 변환합니다.
+    """
+    view = memoryview(buffer).cast('B')
+    if len(view) < 12 or view[0:4] != b'RIFF' or view[8:12] != b'WAVE':
+        raise InvalidAudioError("Not a RIFF/WAVE file")
+
+    fmt = None
+    offset = 12
+    while offset + 8 <= len(view):
+        chunk_id = bytes(view[offset:offset + 4])
+        chunk_size = struct.unpack_from('<I', view, offset + 4)[0]
+        body_start = offset + 8
+
+        if chunk_id == b'fmt ':
+            fmt = _parse_fmt(view[body_start:body_start + chunk_size])
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise InvalidAudioError("WAV data chunk appears before fmt chunk")
+            # 스트리밍으로 기록된 파일은 data 크기가 0이거나 실제보다 클 수 있습니다.
+            body_end = len(view) if chunk_size == 0 else min(body_start + chunk_size, len(view))
+            return fmt[0], _view_samples(view[body_start:body_end], *fmt[1:])
+
+        offset = body_start + chunk_size + (chunk_size & 1)
+
+    raise InvalidAudioError("WAV file has no data chunk")
+
+
+def audio_fingerprint(sample_rate: int, samples: np.ndarray) -> str:
+    """디코딩된 PCM과 샘플레이트로 내용 기반 캐시 키를 만듭니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{sample_rate}:{samples.dtype.str}:{samples.shape[1:]}".encode())
+    digest.update(np.ascontiguousarray(samples).data)
+    return digest.hexdigest()
+
+
+def _parse_fmt(chunk: memoryview) -> Tuple[int, int, int, int]:
+    if len(chunk) < 16:
+        raise InvalidAudioError("WAV fmt chunk is too short")
+
+    format_tag, channels, sample_rate, _, block_align, bits_per_sample = struct.unpack_from('<HHIIHH', chunk)
+    if format_tag == WAVE_FORMAT_EXTENSIBLE and len(chunk) >= 26:
+        format_tag = struct.unpack_from('<H', chunk, 24)[0]
+
+    if channels == 0 or block_align == 0:
+        raise InvalidAudioError("WAV fmt chunk has no channels")
+    if sample_rate == 0:
+        raise InvalidAudioError("WAV fmt chunk has a zero sample rate")
+
+    return sample_rate, format_tag, channels, bits_per_sample
+
+
+def _view_samples(data: memoryview, format_tag: int, channels: int, bits_per_sample: int) -> np.ndarray:
+    if format_tag == WAVE_FORMAT_PCM and bits_per_sample == 24:
+        return _widen_int24(data, channels)
+
+    if format_tag == WAVE_FORMAT_PCM and bits_per_sample in _PCM_DTYPES:
+        dtype = _PCM_DTYPES[bits_per_sample]
+    elif format_tag == WAVE_FORMAT_IEEE_FLOAT and bits_per_sample in _FLOAT_DTYPES:
+        dtype = _FLOAT_DTYPES[bits_per_sample]
+    else:
+        raise InvalidAudioError(f"Unsupported WAV format: tag={format_tag}, bits={bits_per_sample}")
+
+    frame_bytes = np.dtype(dtype).itemsize * channels
+    usable = len(data) - len(data) % frame_bytes
+    samples = np.frombuffer(data[:usable], dtype=dtype)
+
+    if channels > 1:
+        return samples.reshape(-1, channels)
+    return samples
+
+
+def _widen_int24(data: memoryview, channels: int) -> np.ndarray:
+    frame_bytes = 3 * channels
+    usable = len(data) - len(data) % frame_bytes
+    packed = np.frombuffer(data[:usable], dtype=np.uint8).reshape(-1, 3)
+
+    widened = np.zeros((len(packed), 4), dtype=np.uint8)
+    widened[:, 1:] = packed
+    samples = widened.view('<i4').reshape(-1)
+
+    if channels > 1:
+        return samples.reshape(-1, channels)
+    return samples
+
+
+def decode_wav(buffer: Buffer) -> Tuple[int, np.ndarray, float]:
+    """WAV 바이트를 피크 정규화된 float32 모노 신호로 디코딩합니다.
+
+    반환값은 (샘플레이트, 신호, 원본 피크)이며, 원본 피크는 정규화 전 최대 진폭을
+    풀스케일 대비 0~1 값으로 나타냅니다.
+    """
+    sample_rate, samples = read_wav(buffer)
+    mono, peak = to_mono_float32(samples)
+    return sample_rate, mono, peak
+
+
+def to_mono_float32(samples: np.ndarray) -> Tuple[np.ndarray, float]:
+    """PCM 배열을 float32 변환, 모노 다운믹스, 피크 정규화까지 한 번에 처리합니다.
+
+    캐시에 들어가는 블록 단위로 변환과 채널 합산, 피크 계산을 함께 수행해 원본은 한 번만
+    읽고, 출력 버퍼 하나 외에는 신호 길이만큼의 중간 배열을 만들지 않습니다. 채널 평균 후
+    정규화하는 것과 채널 합산 후 정규화하는 것은 같은 결과이므로 평균 나눗셈은 생략합니다.
+    """
+    mono = np.empty(samples.shape[0], dtype=np.float32)
+
+    peak = 0.0
+    for start in range(0, samples.shape[0], _BLOCK_FRAMES):
+        out = mono[start:start + _BLOCK_FRAMES]
+        _downmix_into(samples[start:start + _BLOCK_FRAMES], out)
+        peak = max(peak, float(out.max()), -float(out.min()))
+
+    if peak > 0:
+        mono *= np.float32(1.0 / peak)
+
+    return mono, peak / full_scale(samples)
+
+
+def downmix_peak(samples: np.ndarray) -> float:
+    """to_mono_float32와 같은 단위(채널 합)의 피크를 신호 전체를 변환하지 않고 블록 단위로 계산합니다."""
+    block = np.empty(min(samples.shape[0], _BLOCK_FRAMES), dtype=np.float32)
+    peak = 0.0
+    for start in range(0, samples.shape[0], _BLOCK_FRAMES):
+        out = block[:min(_BLOCK_FRAMES, samples.shape[0] - start)]
+        _downmix_into(samples[start:start + _BLOCK_FRAMES], out)
+        peak = max(peak, float(out.max()), -float(out.min()))
+    return peak
+
+
+def downmix_float32(samples: np.ndarray, peak: float) -> np.ndarray:
+    """PCM 구간을 주어진 피크(downmix_peak 결과)로 정규화한 float32 모노 신호로 변환합니다."""
+    mono = np.empty(samples.shape[0], dtype=np.float32)
+    _downmix_into(samples, mono)
+    if peak > 0:
+        mono *= np.float32(1.0 / peak)
+    return mono
+
+
+def full_scale(samples: np.ndarray) -> float:
+    """downmix 결과 단위에서의 풀스케일 값 (샘플 형식의 최대 진폭 x 채널 수)."""
+    channels = 1 if samples.ndim == 1 else samples.shape[1]
+    return _full_scale(samples.dtype) * channels
+
+
+def _downmix_into(block: np.ndarray, out: np.ndarray):
+    if block.ndim == 1:
+        out[...] = block
+    else:
+        # 채널 축(길이 2~8)에 대한 reduce보다 채널별 strided add가 훨씬 빠릅니다.
+        out[...] = block[:, 0]
+        for channel in range(1, block.shape[1]):
+            np.add(out, block[:, channel], out=out, casting='unsafe')
+
+    if block.dtype == np.uint8:
+        out -= np.float32(128.0 * (1 if block.ndim == 1 else block.shape[1]))
+
+
+def _full_scale(dtype: np.dtype) -> float:
+    if dtype == np.uint8:
+        return 128.0
+    if dtype.kind == 'i':
+        return float(2 ** (dtype.itemsize * 8 - 1))
+    return 1.0
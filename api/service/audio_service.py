@@ -1,9 +1,22 @@
-import io
 import numpy as np
-from scipy.io import wavfile
-from scipy import signal
+import logging
+from functools import lru_cache
 from typing import Tuple, Dict, List
-import base64
+from api.service.audio_ingest import decode_base64_audio, decode_wav
+from api.service.metrics import stage_timer
+
+# 스펙트럼 중심은 전체 신호 FFT 대신 이 길이의 프레임별 rfft 크기를 평균해 계산합니다.
+SPECTRAL_FRAME_LENGTH = 1024
+_SPECTRAL_WINDOW = np.hanning(SPECTRAL_FRAME_LENGTH).astype(np.float32)
+# 배치를 이 샘플 수 단위로 나눠 처리해 중간 배열이 CPU 캐시를 크게 벗어나지 않게 합니다.
+_BATCH_BLOCK_SAMPLES = 1 << 18
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=16)
+def _frame_frequencies(sample_rate: int) -> np.ndarray:
+    return np.fft.rfftfreq(SPECTRAL_FRAME_LENGTH, 1 / sample_rate).astype(np.float32)
 
 class AudioService:
     def __init__(self):
@@ -36,47 +49,62 @@ class AudioService:
         }
 
     def analyze_audio_base64(self, audio_base64: str) -> Tuple[str, float]:
-        try:
-            audio_data = base64.b64decode(audio_base64)
-
-            audio_io = io.BytesIO(audio_data)
-            sample_rate, audio_array = wavfile.read(audio_io)
-
-            if len(audio_array.shape) > 1:
-                audio_array = np.mean(audio_array, axis=1)
-
-            audio_array = audio_array.astype(float)
-            if np.max(np.abs(audio_array)) > 0:
-                audio_array = audio_array / np.max(np.abs(audio_array))
-
-            return self._classify_sound(audio_array, sample_rate)
-        except Exception as e:
-            print(f"Error analyzing audio: {e}")
-            return "calm", 0.5
+        """해석할 수 없는 base64나 WAV면 InvalidAudioError를 냅니다."""
+        with stage_timer('base64_decode'):
+            audio_data = decode_base64_audio(audio_base64)
+        with stage_timer('wav_parse'):
+            sample_rate, audio_array, _ = decode_wav(audio_data)
+
+        return self._classify_sound(audio_array, sample_rate)
+
+    def classify_batch(self, audio_batch: np.ndarray, sample_rate: int) -> List[Tuple[str, float]]:
+        """같은 길이의 클립 여러 개를 (클립 수, 샘플 수) 2차원 배열 하나로 받아 한 번에 분류합니다."""
+        audio_batch = np.atleast_2d(np.asarray(audio_batch, dtype=np.float32))
+        rows_per_block = max(1, _BATCH_BLOCK_SAMPLES // max(audio_batch.shape[-1], 1))
+
+        results = []
+        for start in range(0, len(audio_batch), rows_per_block):
+            block = audio_batch[start:start + rows_per_block]
+            energies = self._calculate_energy(block)
+            zcrs = self._calculate_zcr(block)
+            spectral_centroids = self._calculate_spectral_centroid(block, sample_rate)
+            results.extend(
+                self._determine_category(float(energy), float(zcr), float(spectral_centroid))
+                for energy, zcr, spectral_centroid in zip(energies, zcrs, spectral_centroids)
+            )
+        return results
 
     def _classify_sound(self, audio_array: np.ndarray, sample_rate: int) -> Tuple[str, float]:
-        energy = self._calculate_energy(audio_array)
-        zcr = self._calculate_zcr(audio_array)
-        spectral_centroid = self._calculate_spectral_centroid(audio_array, sample_rate)
-        category, confidence = self._determine_category(energy, zcr, spectral_centroid)
-        return category, confidence
-
-    def _calculate_energy(self, audio: np.ndarray) -> float:
-        return float(np.sqrt(np.mean(audio ** 2)))
-
-    def _calculate_zcr(self, audio: np.ndarray) -> float:
-        zero_crossings = np.sum(np.abs(np.diff(np.sign(audio)))) / 2
-        return float(zero_crossings / len(audio))
-
-    def _calculate_spectral_centroid(self, audio: np.ndarray, sample_rate: int) -> float:
-        fft = np.fft.fft(audio)
-        magnitude = np.abs(fft[:len(fft)//2])
-        freqs = np.fft.fftfreq(len(audio), 1/sample_rate)[:len(fft)//2]
-        if np.sum(magnitude) > 0:
-            spectral_centroid = np.sum(freqs * magnitude) / np.sum(magnitude)
-        else:
-            spectral_centroid = 0
-        return float(spectral_centroid)
+        return self.classify_batch(audio_array[np.newaxis], sample_rate)[0]
+
+    def _calculate_energy(self, audio: np.ndarray) -> np.ndarray:
+        return np.sqrt(np.einsum('...i,...i->...', audio, audio) / max(audio.shape[-1], 1))
+
+    def _calculate_zcr(self, audio: np.ndarray) -> np.ndarray:
+        zero_crossings = np.abs(np.diff(np.sign(audio), axis=-1)).sum(axis=-1) / 2
+        return zero_crossings / max(audio.shape[-1], 1)
+
+    def _calculate_spectral_centroid(self, audio: np.ndarray, sample_rate: int) -> np.ndarray:
+        # scipy.fft는 /analyze-sound가 처음 호출될 때 불러와 앱 시작 시간을 줄입니다.
+        from scipy import fft
+
+        frames = self._frame(audio)
+        # 중심 주파수는 크기의 비율이므로 프레임 평균 대신 합을 써도 같습니다.
+        magnitude = np.abs(fft.rfft(frames * _SPECTRAL_WINDOW, axis=-1)).sum(axis=-2)
+        total = magnitude.sum(axis=-1)
+        return np.divide(magnitude @ _frame_frequencies(sample_rate), total, out=np.zeros_like(total), where=total > 0)
+
+    def _frame(self, audio: np.ndarray) -> np.ndarray:
+        # 프레임 길이보다 짧은 클립만 0으로 채우고, 긴 클립은 프레임에 못 미치는 꼬리를 버립니다.
+        length = audio.shape[-1]
+        if length < SPECTRAL_FRAME_LENGTH:
+            padding = [(0, 0)] * (audio.ndim - 1) + [(0, SPECTRAL_FRAME_LENGTH - length)]
+            audio = np.pad(audio, padding)
+            length = SPECTRAL_FRAME_LENGTH
+        num_frames = length // SPECTRAL_FRAME_LENGTH
+        return audio[..., :num_frames * SPECTRAL_FRAME_LENGTH].reshape(
+            audio.shape[:-1] + (num_frames, SPECTRAL_FRAME_LENGTH)
+        )
 
     def _determine_category(self, energy: float, zcr: float, spectral_centroid: float) -> Tuple[str, float]:
         scores = {}
@@ -0,0 +1,219 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """키-값 캐시 공통 인터페이스. 값은 JSON으로 직렬화할 수 있어야 합니다."""
+
+    name: str
+
+    def __init__(self):
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._errors = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        """없거나 만료된 키면 None을 돌려줍니다."""
+
+    @abstractmethod
+    def set(self, key: str, value: Any):
+        """캐시 저장에 실패해도 요청이 실패하지 않도록 예외 대신 오류 수만 셉니다."""
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            'backend': self.name,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'evictions': self._evictions,
+            'errors': self._errors,
+        }
+
+
+class NullCacheBackend(CacheBackend):
+    name = "none"
+
+    def get(self, key: str) -> Optional[Any]:
+        self._misses += 1
+        return None
+
+    def set(self, key: str, value: Any):
+        pass
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """프로세스 내부 LRU 캐시. 항목마다 TTL이 지나면 만료됩니다."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        super().__init__()
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._evictions += 1
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return value
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = len(self._entries)
+        return {**super().stats(), 'size': size, 'max_entries': self.max_entries, 'ttl_seconds': self.ttl_seconds}
+
+
+class RedisCacheBackend(CacheBackend):
+    """여러 워커가 적중 결과를 공유하도록 Redis에 저장합니다. 만료와 축출은 Redis가 처리합니다."""
+
+    name = "redis"
+
+    def __init__(self, url: str, ttl_seconds: float = 600.0, namespace: str = "vibe", timeout_seconds: float = 0.05):
+        super().__init__()
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("RedisCacheBackend requires the 'redis' package") from e
+
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self._client = redis.Redis.from_url(
+            url,
+            socket_timeout=timeout_seconds,
+            socket_connect_timeout=timeout_seconds
+        )
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(f"{self.namespace}:{key}")
+        except Exception as e:
+            logger.warning("Redis cache get failed: %s", e)
+            self._errors += 1
+            raw = None
+
+        if raw is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any):
+        try:
+            self._client.set(f"{self.namespace}:{key}", json.dumps(value), ex=max(1, int(self.ttl_seconds)))
+        except Exception as e:
+            logger.warning("Redis cache set failed: %s", e)
+            self._errors += 1
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """재시작 후에도 남도록 SQLite 파일에 저장하는 LRU+TTL 캐시."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl_seconds: float = 600.0):
+        super().__init__()
+        self.path = path
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)")
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self._misses += 1
+                return None
+
+            value, expires_at = row
+            if expires_at < now:
+                self._connection.execute("DELETE FROM cache WHERE key = ?", (key,))
+                self._evictions += 1
+                self._misses += 1
+                return None
+
+            self._connection.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._hits += 1
+            return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl_seconds, now)
+            )
+            cursor = self._connection.execute(
+                "DELETE FROM cache WHERE key IN ("
+                "SELECT key FROM cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            self._evictions += max(cursor.rowcount, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            size = self._connection.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        return {**super().stats(), 'size': size, 'max_entries': self.max_entries, 'ttl_seconds': self.ttl_seconds}
+
+
+def create_cache_backend(
+    kind: str,
+    max_entries: int = 1024,
+    ttl_seconds: float = 600.0,
+    redis_url: str = "",
+    namespace: str = "vibe",
+    sqlite_path: str = ""
+) -> CacheBackend:
+    if kind == "memory":
+        return InMemoryCacheBackend(max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if kind == "redis":
+        return RedisCacheBackend(redis_url, ttl_seconds=ttl_seconds, namespace=namespace)
+    if kind == "sqlite":
+        return SQLiteCacheBackend(sqlite_path, max_entries=max_entries, ttl_seconds=ttl_seconds)
+    if kind == "none":
+        return NullCacheBackend()
+    raise ValueError(f"Unknown cache backend: {kind}")
@@ -0,0 +1,93 @@
+import logging
+import time
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+# 메트릭 게이지로 내보낼 때의 값
+CIRCUIT_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """연속 실패가 failure_threshold번 쌓이면 cooldown_seconds 동안 호출을 막는 회로 차단기.
+
+    쿨다운이 지나면 시험 호출 하나만 통과시키고(half_open), 성공하면 다시 닫고 실패하면 다시 엽니다.
+    호출하는 쪽이 allow()로 허용 여부를 묻고, 결과를 record_success()/record_failure()로 알려야 합니다.
+    결과를 알 수 없게 끝난 호출(요청 취소 등)은 abandon()으로 시험 호출 자리만 돌려줍니다.
+    failure_threshold가 0이면 항상 허용합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        cooldown_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self._clock = clock
+        self.state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+        self._opened = 0
+        self._short_circuited = 0
+
+    def allow(self) -> bool:
+        if self.failure_threshold <= 0:
+            return True
+        if self.state == OPEN:
+            if self._clock() - self._opened_at < self.cooldown_seconds:
+                self._short_circuited += 1
+                return False
+            self.state = HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == HALF_OPEN:
+            if self._trial_in_flight:
+                self._short_circuited += 1
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record_success(self):
+        self._consecutive_failures = 0
+        if self.state != CLOSED:
+            logger.info("Circuit %s closed", self.name)
+        self.state = CLOSED
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self._consecutive_failures += 1
+        if self.failure_threshold <= 0:
+            return
+        if self.state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logger.warning(
+                    "Circuit %s opened after %d consecutive failures, skipping calls for %gs",
+                    self.name, self._consecutive_failures, self.cooldown_seconds
+                )
+                self._opened += 1
+            self.state = OPEN
+            self._opened_at = self._clock()
+            self._trial_in_flight = False
+
+    def abandon(self):
+        self._trial_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        remaining = self.cooldown_seconds - (self._clock() - self._opened_at) if self.state == OPEN else 0.0
+        return {
+            'state': self.state,
+            'failure_threshold': self.failure_threshold,
+            'cooldown_seconds': self.cooldown_seconds,
+            'consecutive_failures': self._consecutive_failures,
+            'opened': self._opened,
+            'short_circuited': self._short_circuited,
+            'cooldown_remaining_seconds': max(0.0, remaining),
+        }
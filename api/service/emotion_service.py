@@ -1,28 +1,103 @@
-import io
 import numpy as np
-import ssl
+import logging
 import os
-import urllib.request
-import tensorflow as tf
-import tensorflow_hub as hub
-from scipy.io import wavfile
-import base64
-import resampy
-from typing import Tuple, Dict
-
-_original_urlopen = urllib.request.urlopen
-
-def _patched_urlopen(url, data=None, timeout=None, **kwargs):
-    kwargs['context'] = ssl._create_unverified_context()
-    return _original_urlopen(url, data, timeout, **kwargs)
-
-urllib.request.urlopen = _patched_urlopen
-ssl._create_default_https_context = ssl._create_unverified_context
+import threading
+import time
+from math import gcd
+from typing import Any, Tuple, Dict, List, Optional
+
+from api.service.audio_ingest import (
+    Buffer,
+    InvalidAudioError,
+    audio_fingerprint,
+    decode_base64_audio,
+    downmix_float32,
+    downmix_peak,
+    full_scale,
+    read_wav,
+    to_mono_float32,
+)
+from api.service.audio_service import AudioService
+from api.service.embedding_index import EmbeddingIndex
+from api.service.metrics import collect_stages, observe_stage, stage_timer
+from api.service.resampler import resample
+from api.config.inferenceConfig import (
+    YAMNET_BACKEND,
+    YAMNET_MODEL_HANDLE,
+    YAMNET_MODEL_PATH,
+    YAMNET_CLASS_MAP_PATH,
+    YAMNET_BACKEND_THREADS,
+    EMOTION_SCORE_TOP_K,
+    EMOTION_WINDOW_PATCHES,
+    SILENCE_GATE_ENABLED,
+    SILENCE_GATE_RMS_DBFS,
+    SILENCE_GATE_PEAK_DBFS,
+)
+from api.config.catalogConfig import TRACK_EMBEDDING_INDEX_PATH, TRACK_EMBEDDING_TOP_K, TRACK_EMBEDDING_NPROBE
+
+logger = logging.getLogger(__name__)
+
+YAMNET_SAMPLE_RATE = 16000
+# YAMNet은 0.96초 패치를 0.48초 간격으로 자르며, 첫 패치에는 STFT 여유분을 포함해 0.975초가 필요합니다.
+YAMNET_PATCH_HOP_SAMPLES = 7680
+YAMNET_MIN_SAMPLES = 15600
+
+
+def _to_dbfs(level: float) -> float:
+    # 완전한 무음도 JSON으로 직렬화할 수 있도록 -120dBFS에서 자릅니다.
+    return 20 * float(np.log10(max(level, 1e-6)))
+
+
+def count_patches(num_samples: int) -> int:
+    samples_after_first_patch = max(num_samples - YAMNET_MIN_SAMPLES, 0)
+    return 1 + -(-samples_after_first_patch // YAMNET_PATCH_HOP_SAMPLES)
+
+
+def pack_waveforms(waveforms: List[np.ndarray]) -> Tuple[np.ndarray, List[Tuple[int, int]]]:
+    """여러 16kHz 파형을 한 번의 YAMNet 호출로 처리할 수 있도록 하나로 이어 붙입니다.
+
+    각 클립은 패치 간격에 정렬된 위치에서 시작하고, 뒤에 단독 실행 시와 같은 길이의
+    0 패딩이 붙습니다. 따라서 반환된 (시작, 끝) 패치 구간의 점수는 클립을 단독으로
+    모델에 넣었을 때와 동일합니다.
+    """
+    offsets = []
+    spans = []
+    offset = 0
+    padded_length = 0
+    for waveform in waveforms:
+        num_patches = count_patches(len(waveform))
+        first_patch = offset // YAMNET_PATCH_HOP_SAMPLES
+        offsets.append(offset)
+        spans.append((first_patch, first_patch + num_patches))
+
+        padded_length = offset + YAMNET_MIN_SAMPLES + (num_patches - 1) * YAMNET_PATCH_HOP_SAMPLES
+        offset = -(-padded_length // YAMNET_PATCH_HOP_SAMPLES) * YAMNET_PATCH_HOP_SAMPLES
+
+    packed = np.zeros(padded_length, dtype=np.float32)
+    for waveform, start in zip(waveforms, offsets):
+        packed[start:start + len(waveform)] = waveform
+
+    return packed, spans
 
 class EmotionService:
-    def __init__(self):
+    def __init__(
+        self,
+        model_handle: str = YAMNET_MODEL_HANDLE,
+        backend: str = YAMNET_BACKEND,
+        model_path: str = YAMNET_MODEL_PATH
+    ):
+        self.model_handle = model_handle
+        self.backend = backend
+        self.model_path = model_path
         self.model = None
         self.class_names = None
+        self.emotion_matrix = None
+        self._model_lock = threading.Lock()
+        self.is_ready = False
+        self.audio_service = AudioService()
+        self.track_index = self._load_track_index()
+
+        self.emotions = ['happy', 'sad', 'angry', 'calm', 'energetic', 'anxious']
 
         self.emotion_mapping = {
 
@@ -98,101 +173,293 @@ class EmotionService:
             'anxious': '불안하거나 긴장된 상태입니다',
         }
 
-    def _ensure_model_loaded(self):
-        if self.model is None:
-            print("Loading YAMNet model...")
-            self.model = hub.load('https://tfhub.dev/google/yamnet/1')
-            self.class_names = self._load_class_names()
-            print("YAMNet model loaded successfully!")
-
-    def _load_class_names(self):
-        class_map_path = self.model.class_map_path().numpy()
-        class_names = []
-
-        with tf.io.gfile.GFile(class_map_path) as f:
-            for line in f:
-                parts = line.strip().split(',')
-                if len(parts) >= 3:
-                    class_names.append(parts[2])
-
-        return class_names
-
-    def analyze_emotion_from_base64(self, audio_base64: str) -> Tuple[str, float, Dict]:
-        self._ensure_model_loaded()
-
+    def _load_track_index(self) -> Optional[EmbeddingIndex]:
+        if not os.path.isdir(TRACK_EMBEDDING_INDEX_PATH):
+            return None
         try:
-            audio_data = base64.b64decode(audio_base64)
-
-            audio_io = io.BytesIO(audio_data)
-            sample_rate, audio_array = wavfile.read(audio_io)
-
-            if len(audio_array.shape) > 1:
-                audio_array = np.mean(audio_array, axis=1)
-
-            audio_array = audio_array.astype(np.float32)
-            if np.max(np.abs(audio_array)) > 0:
-                audio_array = audio_array / np.max(np.abs(audio_array))
-
-            if sample_rate != 16000:
-                audio_array = resampy.resample(audio_array, sample_rate, 16000)
+            return EmbeddingIndex.load(TRACK_EMBEDDING_INDEX_PATH, nprobe=TRACK_EMBEDDING_NPROBE)
+        except Exception as e:
+            logger.warning("Failed to load track embedding index from %s: %s", TRACK_EMBEDDING_INDEX_PATH, e)
+            return None
 
-            scores, embeddings, spectrogram = self.model(audio_array)
+    def _ensure_model_loaded(self):
+        # 백그라운드 워밍업과 첫 요청들이 동시에 들어올 수 있으므로 한 스레드만 모델을 올립니다.
+        if self.model is not None:
+            return
+        with self._model_lock:
+            if self.model is not None:
+                return
+            # 백엔드 모듈과 런타임은 모델을 실제로 올리는 프로세스에서만 불러옵니다.
+            from api.service.inference_backend import create_inference_backend
+
+            logger.info("Loading YAMNet model with the %s backend", self.backend)
+            model = create_inference_backend(
+                self.backend,
+                model_handle=self.model_handle,
+                model_path=self.model_path,
+                class_map_path=YAMNET_CLASS_MAP_PATH,
+                num_threads=YAMNET_BACKEND_THREADS
+            )
+            self.class_names = model.class_names
+            self.emotion_matrix = self._compile_emotion_matrix()
+            # 잠금 없이 self.model만 확인하는 스레드가 있으므로 클래스 이름과 감정 행렬을 채운 뒤 마지막에 공개합니다.
+            self.model = model
+            logger.info("YAMNet model loaded: %s", model.describe())
+
+    def warmup(self) -> bool:
+        if not self.is_ready:
+            self._ensure_model_loaded()
+            # 합성 클립을 한 번 통과시켜 그래프 트레이싱을 첫 요청 전에 끝냅니다. 이때 걸린 시간은 지표에 넣지 않습니다.
+            collect_stages(self.analyze_waveforms, [np.zeros(YAMNET_MIN_SAMPLES, dtype=np.float32)])
+            self.is_ready = True
+            logger.info("YAMNet model warmed up")
+        return self.is_ready
+
+    def run_each(self, method_name: str, items: List) -> List[Tuple[Any, Optional[str]]]:
+        """항목마다 같은 메서드를 실행하고 (결과, None) 또는 (None, 오류 메시지)를 돌려줍니다.
+
+        배치 요청에서 워커를 한 번만 거치면서도 클립 하나의 실패가 나머지에 영향을 주지 않게 합니다.
+        """
+        method = getattr(self, method_name)
+        results = []
+        for item in items:
+            try:
+                results.append((method(item), None))
+            except Exception as e:
+                results.append((None, str(e)))
+        return results
+
+    def fingerprint_audio_base64(self, audio_base64: str) -> Tuple[bytes, str, float]:
+        with stage_timer('base64_decode'):
+            audio_data = decode_base64_audio(audio_base64)
+        return self.fingerprint_audio_bytes(audio_data)
+
+    def fingerprint_audio_bytes(self, audio_data: Buffer) -> Tuple[Buffer, str, float]:
+        with stage_timer('wav_parse'):
+            sample_rate, audio_array = read_wav(audio_data)
+        duration = len(audio_array) / sample_rate if sample_rate else 0.0
+        with stage_timer('fingerprint'):
+            fingerprint = audio_fingerprint(sample_rate, audio_array)
+        return audio_data, fingerprint, duration
+
+    def decode_audio_bytes_gated(self, audio_data: Buffer) -> Tuple[Optional[np.ndarray], Optional[Tuple[str, float, Dict]]]:
+        """디코딩한 클립이 무음 게이트에 걸리면 (None, 결과)를, 아니면 16kHz로 리샘플링한 (파형, None)을 돌려줍니다."""
+        with stage_timer('wav_parse'):
+            sample_rate, samples = read_wav(audio_data)
+            audio_array, peak = to_mono_float32(samples)
+
+        gated = self._gate_silence(audio_array, peak)
+        if gated is not None:
+            return None, gated
+
+        if sample_rate != YAMNET_SAMPLE_RATE:
+            with stage_timer('resample'):
+                audio_array = resample(audio_array, sample_rate, YAMNET_SAMPLE_RATE)
+
+        return audio_array, None
+
+    def _gate_silence(self, audio_array: np.ndarray, peak: float) -> Optional[Tuple[str, float, Dict]]:
+        # audio_array는 피크 정규화된 신호이므로 peak를 곱해 풀스케일 기준 RMS로 되돌립니다.
+        if not SILENCE_GATE_ENABLED:
+            return None
+
+        rms_dbfs = _to_dbfs(float(self.audio_service._calculate_energy(audio_array)) * peak)
+        peak_dbfs = _to_dbfs(peak)
+        if rms_dbfs > SILENCE_GATE_RMS_DBFS or peak_dbfs > SILENCE_GATE_PEAK_DBFS:
+            return None
+
+        return self._silence_result(rms_dbfs, {
+            'rms_dbfs': rms_dbfs,
+            'peak_dbfs': peak_dbfs,
+            'zcr': float(self.audio_service._calculate_zcr(audio_array)),
+        })
+
+    def _silence_result(self, rms_dbfs: float, features: Dict) -> Tuple[str, float, Dict]:
+        # 기준보다 20dB 이상 조용하면 신뢰도 1.0, 기준에 가까울수록 0.5에 가까워집니다.
+        confidence = 0.5 + 0.5 * min(1.0, (SILENCE_GATE_RMS_DBFS - rms_dbfs) / 20)
+        return 'calm', confidence, {
+            'top_classes': [{'name': 'Silence', 'score': confidence}],
+            'all_emotion_scores': {'calm': confidence},
+            'silence_gate': features,
+        }
 
-            class_scores = tf.reduce_mean(scores, axis=0)
-            top_class_indices = tf.argsort(class_scores, direction='DESCENDING')[:10]
+    def analyze_windowed(self, audio_data: Buffer, include_timeline: bool = False) -> Tuple[str, float, Dict]:
+        """긴 녹음을 겹치는 창 단위로 디코딩·리샘플링·추론하며 클래스 점수 합을 누적합니다.
+
+        창은 YAMNet 패치 격자에 맞춰 잘리고 리샘플링 여유 구간을 포함하므로, 한 번에 처리한
+        결과와 허용 오차 안에서 같습니다. 메모리 사용량은 녹음 길이와 관계없이 창 크기로 제한됩니다.
+        """
+        with stage_timer('wav_parse'):
+            sample_rate, samples = read_wav(audio_data)
+            peak = downmix_peak(samples)
+        # 아래에서 sample_rate로 나누고 창 간격만큼 전진하므로, 둘 다 0이 되지 않게 미리 막습니다.
+        if sample_rate <= 0:
+            raise InvalidAudioError(f"Invalid WAV sample rate: {sample_rate}")
+        window_patches = max(1, EMOTION_WINDOW_PATCHES)
+
+        # RMS는 피크를 넘을 수 없으므로, 피크가 두 기준 모두보다 낮으면 신호 전체를 보지 않고 게이트에 걸 수 있습니다.
+        peak_dbfs = _to_dbfs(peak / full_scale(samples))
+        if SILENCE_GATE_ENABLED and peak_dbfs <= min(SILENCE_GATE_RMS_DBFS, SILENCE_GATE_PEAK_DBFS):
+            emotion, confidence, details = self._silence_result(peak_dbfs, {'peak_dbfs': peak_dbfs})
+            if include_timeline:
+                details['timeline'] = [{
+                    'start': 0.0,
+                    'end': len(samples) / sample_rate,
+                    'emotion': emotion,
+                    'confidence': confidence,
+                }]
+            return emotion, confidence, details
 
-            emotion_scores = self._calculate_emotion_scores(class_scores, top_class_indices)
+        self._ensure_model_loaded()
 
-            if emotion_scores:
-                best_emotion = max(emotion_scores.items(), key=lambda x: x[1])
-                emotion = best_emotion[0]
-                confidence = float(best_emotion[1])
-            else:
-                emotion = 'calm'
-                confidence = 0.5
+        divisor = gcd(sample_rate, YAMNET_SAMPLE_RATE)
+        up, down = YAMNET_SAMPLE_RATE // divisor, sample_rate // divisor
+        total_length = -(-len(samples) * up // down)
+        total_patches = count_patches(total_length)
+        margin = YAMNET_PATCH_HOP_SAMPLES
+
+        score_sum = None
+        embedding_sum = None
+        timeline = []
+        # 창마다 기록하면 요청 하나가 히스토그램에 여러 번 잡히므로, 단계별 시간을 합쳐 요청당 한 번 기록합니다.
+        resample_seconds = 0.0
+        inference_seconds = 0.0
+        for first_patch in range(0, total_patches, window_patches):
+            num_patches = min(window_patches, total_patches - first_patch)
+            window_start = first_patch * YAMNET_PATCH_HOP_SAMPLES
+            window_end = window_start + YAMNET_MIN_SAMPLES + (num_patches - 1) * YAMNET_PATCH_HOP_SAMPLES
+
+            # 창 앞뒤로 여유 구간을 붙여 리샘플링 필터의 경계 효과가 창 안에 들어오지 않게 합니다.
+            source_start = max(0, window_start - margin) * down // up
+            source_end = min(len(samples), -(-(window_end + margin) * down // up))
+            started = time.perf_counter()
+            chunk = downmix_float32(samples[source_start:source_end], peak)
+            if sample_rate != YAMNET_SAMPLE_RATE:
+                chunk = resample(chunk, sample_rate, YAMNET_SAMPLE_RATE)
+            resample_seconds += time.perf_counter() - started
+
+            offset = window_start - source_start * up // down
+            waveform = np.zeros(window_end - window_start, dtype=np.float32)
+            segment = chunk[offset:offset + len(waveform)]
+            segment = segment[:max(0, total_length - window_start)]
+            waveform[:len(segment)] = segment
+
+            started = time.perf_counter()
+            scores, embeddings = self.model(waveform)
+            inference_seconds += time.perf_counter() - started
+            window_sum = scores.sum(axis=0)
+            score_sum = window_sum if score_sum is None else score_sum + window_sum
+            if self.track_index is not None and embeddings is not None:
+                window_embedding = embeddings.sum(axis=0)
+                embedding_sum = window_embedding if embedding_sum is None else embedding_sum + window_embedding
+
+            if include_timeline:
+                window_emotion, window_confidence, _ = self._build_result(window_sum / len(scores))
+                timeline.append({
+                    'start': window_start / YAMNET_SAMPLE_RATE,
+                    'end': min(window_end, total_length) / YAMNET_SAMPLE_RATE,
+                    'emotion': window_emotion,
+                    'confidence': window_confidence,
+                })
+
+        observe_stage('resample', resample_seconds)
+        observe_stage('inference', inference_seconds)
+
+        with stage_timer('emotion_scoring'):
+            emotion, confidence, details = self._build_result(score_sum / total_patches)
+        if embedding_sum is not None:
+            self._add_similar_tracks(details, embedding_sum / total_patches)
+        if include_timeline:
+            details['timeline'] = timeline
+        return emotion, confidence, details
+
+    def analyze_waveforms(self, waveforms: List[np.ndarray]) -> List[Tuple[str, float, Dict]]:
+        self._ensure_model_loaded()
 
-            details = {
-                'top_classes': [
-                    {
-                        'name': self.class_names[i.numpy()],
-                        'score': float(class_scores[i].numpy())
-                    }
-                    for i in top_class_indices[:5]
-                ],
-                'all_emotion_scores': emotion_scores
-            }
+        packed, spans = pack_waveforms(waveforms)
+        with stage_timer('inference'):
+            scores, embeddings = self.model(packed)
 
-            return emotion, confidence, details
+        with stage_timer('emotion_scoring'):
+            results = [self._build_result(scores[start:end].mean(axis=0)) for start, end in spans]
+        if self.track_index is not None and embeddings is not None:
+            for (start, end), result in zip(spans, results):
+                self._add_similar_tracks(result[2], embeddings[start:end].mean(axis=0))
+        return results
 
-        except Exception as e:
-            print(f"Error in emotion analysis: {e}")
-            import traceback
-            traceback.print_exc()
-            return 'calm', 0.5, {'error': str(e)}
-
-    def _calculate_emotion_scores(self, class_scores, top_class_indices) -> Dict[str, float]:
-        emotion_scores = {
-            'happy': 0.0,
-            'sad': 0.0,
-            'angry': 0.0,
-            'calm': 0.0,
-            'energetic': 0.0,
-            'anxious': 0.0,
+    def embed_waveform(self, waveform: np.ndarray) -> np.ndarray:
+        """16kHz 파형의 패치별 YAMNet 임베딩 평균(1024차원)을 돌려줍니다."""
+        self._ensure_model_loaded()
+        scores, embeddings = self.model(waveform)
+        if embeddings is None:
+            raise RuntimeError(f"The {self.backend} YAMNet model does not output embeddings")
+        return embeddings.mean(axis=0)
+
+    def _add_similar_tracks(self, details: Dict, embedding: np.ndarray):
+        # 임베딩 자체는 워커 밖으로 보내지 않고, 인덱스에서 찾은 트랙 id와 유사도만 결과에 담습니다.
+        with stage_timer('embedding_search'):
+            details['similar_tracks'] = self.track_index.search(embedding, TRACK_EMBEDDING_TOP_K)
+
+    def _build_result(self, class_scores: np.ndarray) -> Tuple[str, float, Dict]:
+        top_class_indices = self._top_class_indices(class_scores, max(EMOTION_SCORE_TOP_K, 5))
+
+        emotion_scores = self._calculate_emotion_scores(class_scores, top_class_indices[:EMOTION_SCORE_TOP_K])
+
+        if emotion_scores:
+            best_emotion = max(emotion_scores.items(), key=lambda x: x[1])
+            emotion = best_emotion[0]
+            confidence = float(best_emotion[1])
+        else:
+            emotion = 'calm'
+            confidence = 0.5
+
+        details = {
+            'top_classes': [
+                {
+                    'name': self.class_names[i],
+                    'score': float(class_scores[i])
+                }
+                for i in top_class_indices[:5].tolist()
+            ],
+            'all_emotion_scores': emotion_scores
         }
 
-        for idx in top_class_indices:
-            class_name = self.class_names[idx.numpy()]
-            score = float(class_scores[idx].numpy())
-
-            if class_name in self.emotion_mapping:
-                emotion = self.emotion_mapping[class_name]
-                emotion_scores[emotion] += score
-
-        total = sum(emotion_scores.values())
+        return emotion, confidence, details
+
+    def _top_class_indices(self, class_scores: np.ndarray, k: int) -> np.ndarray:
+        k = min(k, len(class_scores))
+        top = np.argpartition(class_scores, -k)[-k:]
+        return top[np.argsort(-class_scores[top], kind='stable')]
+
+    def _compile_emotion_matrix(self) -> np.ndarray:
+        # emotion_mapping 값은 감정 이름 하나 또는 {감정: 가중치} 딕셔너리입니다.
+        emotion_index = {emotion: i for i, emotion in enumerate(self.emotions)}
+        class_index = {name: i for i, name in enumerate(self.class_names)}
+        matrix = np.zeros((len(self.class_names), len(self.emotions)), dtype=np.float32)
+
+        for class_name, target in self.emotion_mapping.items():
+            if class_name not in class_index:
+                continue
+            weights = {target: 1.0} if isinstance(target, str) else target
+            for emotion, weight in weights.items():
+                matrix[class_index[class_name], emotion_index[emotion]] += weight
+
+        return matrix
+
+    def _calculate_emotion_scores(self, class_scores: np.ndarray, top_class_indices: Optional[np.ndarray] = None) -> Dict[str, float]:
+        # top_class_indices가 비어 있으면 전체 클래스 점수 벡터를 사용합니다.
+        if top_class_indices is not None and len(top_class_indices) > 0:
+            masked_scores = np.zeros_like(class_scores)
+            masked_scores[top_class_indices] = class_scores[top_class_indices]
+        else:
+            masked_scores = class_scores
+
+        totals = masked_scores @ self.emotion_matrix
+        total = totals.sum()
         if total > 0:
-            emotion_scores = {k: v / total for k, v in emotion_scores.items()}
+            totals = totals / total
 
-        return emotion_scores
+        return dict(zip(self.emotions, totals.tolist()))
 
     def get_emotion_description(self, emotion: str) -> str:
         return self.emotion_descriptions.get(emotion, '알 수 없는 감정 상태입니다')
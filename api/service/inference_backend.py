@@ -0,0 +1,427 @@
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import shutil
+import ssl
+import tarfile
+import tempfile
+import threading
+import urllib.request
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from api.service.embedding_index import EMBEDDING_DIM
+from api.service.emotion_service import YAMNET_MIN_SAMPLES, YAMNET_PATCH_HOP_SAMPLES, YAMNET_SAMPLE_RATE, count_patches
+
+logger = logging.getLogger(__name__)
+
+NUM_CLASSES = 521
+CLASS_MAP_FILENAME = "yamnet_class_map.csv"
+
+HUB_DOWNLOAD_TIMEOUT_SECONDS = 300
+
+
+def download_hub_model(handle: str) -> str:
+    """TF Hub 핸들을 압축 형식으로 내려받아 풀고, SavedModel 디렉터리 경로를 돌려줍니다.
+
+    인증서 검증을 끈 컨텍스트는 이 요청에만 넘기므로 같은 프로세스의 다른 HTTPS 연결(Claude 클라이언트 등)은
+    그대로 검증합니다. tensorflow_hub와 같은 TFHUB_CACHE_DIR에 두고, 이미 받았으면 다시 받지 않습니다.
+    """
+    cache_dir = os.getenv("TFHUB_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "tfhub_modules")
+    target = os.path.join(cache_dir, hashlib.sha1(handle.encode()).hexdigest())
+    if os.path.isfile(os.path.join(target, "saved_model.pb")):
+        return target
+
+    os.makedirs(cache_dir, exist_ok=True)
+    url = f"{handle}{'&' if '?' in handle else '?'}tf-hub-format=compressed"
+    logger.info("Downloading %s to %s", url, target)
+    # 다른 프로세스가 같은 모델을 받는 중일 수 있으므로 임시 디렉터리에 풀고 마지막에 옮깁니다.
+    staging = tempfile.mkdtemp(dir=cache_dir)
+    try:
+        context = ssl._create_unverified_context()
+        with urllib.request.urlopen(url, context=context, timeout=HUB_DOWNLOAD_TIMEOUT_SECONDS) as response:
+            with tarfile.open(fileobj=response, mode="r|gz") as archive:
+                archive.extractall(staging, filter="data")
+        os.replace(staging, target)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if os.path.isfile(os.path.join(target, "saved_model.pb")):
+            return target
+        raise
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return target
+
+
+def parse_class_map(lines: Iterable[str]) -> List[str]:
+    """yamnet_class_map.csv(index,mid,display_name)에서 표시 이름 목록을 읽습니다.
+
+    "Chuckle, chortle"처럼 쉼표가 든 이름은 따옴표로 감싸여 있으므로 csv 모듈로 읽습니다.
+    """
+    rows = csv.reader(lines)
+    next(rows, None)
+    return [row[2] for row in rows if len(row) >= 3]
+
+
+def frame_patches(waveform: np.ndarray) -> np.ndarray:
+    """파형을 YAMNet과 같은 방식으로 0 패딩한 뒤 (패치 수, 15600) 모양의 패치로 자릅니다.
+
+    고정 길이 입력을 받는 모델도 패치마다 전체 모델과 같은 로그 멜 프레임을 보게 됩니다.
+    """
+    num_patches = count_patches(len(waveform))
+    padded = np.zeros(YAMNET_MIN_SAMPLES + (num_patches - 1) * YAMNET_PATCH_HOP_SAMPLES, dtype=np.float32)
+    padded[:len(waveform)] = waveform[:len(padded)]
+    return np.lib.stride_tricks.sliding_window_view(padded, YAMNET_MIN_SAMPLES)[::YAMNET_PATCH_HOP_SAMPLES]
+
+
+def _pick_outputs(outputs: List[np.ndarray]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # 출력 이름은 변환 도구마다 다르므로 마지막 차원으로 점수(521)와 임베딩(1024)을 찾습니다. 스펙트로그램(64)은 버립니다.
+    scores = embeddings = None
+    for output in outputs:
+        if output.shape[-1] == NUM_CLASSES and scores is None:
+            scores = output.reshape(-1, NUM_CLASSES)
+        elif output.shape[-1] == EMBEDDING_DIM and embeddings is None:
+            embeddings = output.reshape(-1, EMBEDDING_DIM)
+    if scores is None:
+        raise RuntimeError(f"Model has no output with {NUM_CLASSES} class scores")
+    return scores, embeddings
+
+
+def _concat_patch_outputs(outputs: List[Tuple[np.ndarray, Optional[np.ndarray]]]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    scores = np.concatenate([scores for scores, _ in outputs])
+    embeddings = None if outputs[0][1] is None else np.concatenate([embeddings for _, embeddings in outputs])
+    return scores, embeddings
+
+
+class InferenceBackend(ABC):
+    """16kHz 모노 float32 파형을 받아 패치별 (점수, 임베딩) numpy 배열을 돌려주는 YAMNet 실행기.
+
+    점수는 (패치 수, 521), 임베딩은 (패치 수, 1024) 모양입니다. 임베딩을 내보내지 않는 모델이면 임베딩은 None입니다.
+    여러 추론 스레드에서 동시에 호출될 수 있습니다.
+    """
+
+    name = "base"
+
+    def __init__(self):
+        self.class_names: List[str] = []
+
+    @abstractmethod
+    def __call__(self, waveform: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """파형 하나의 패치별 (점수, 임베딩)을 돌려줍니다."""
+
+    def describe(self) -> dict:
+        return {'name': self.name}
+
+
+def _read_local_class_map(model_path: str, class_map_path: str) -> List[str]:
+    path = class_map_path or os.path.join(os.path.dirname(os.path.abspath(model_path)), CLASS_MAP_FILENAME)
+    with open(path, encoding="utf-8", newline="") as f:
+        return parse_class_map(f)
+
+
+class TensorFlowBackend(InferenceBackend):
+    """TF Hub 핸들이나 로컬 SavedModel 디렉터리를 tensorflow_hub로 불러옵니다."""
+
+    name = "tensorflow"
+
+    def __init__(self, model_handle: str):
+        super().__init__()
+        # TensorFlow는 모델을 실제로 올리는 프로세스에서만 불러옵니다. 공유 추론 서버를 쓰는 HTTP 워커는 TF 런타임을 올리지 않습니다.
+        import tensorflow as tf
+        import tensorflow_hub as hub
+
+        self.model_handle = model_handle
+        if model_handle.startswith(('http://', 'https://')):
+            model_handle = download_hub_model(model_handle)
+        self.model = hub.load(model_handle)
+        with tf.io.gfile.GFile(self.model.class_map_path().numpy()) as f:
+            self.class_names = parse_class_map(f)
+
+    def __call__(self, waveform: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        scores, embeddings, spectrogram = self.model(waveform)
+        return scores.numpy(), embeddings.numpy()
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'model': self.model_handle}
+
+
+def _load_tflite_interpreter():
+    # 가벼운 런타임부터 찾고, 없으면 TensorFlow에 포함된 인터프리터를 씁니다.
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        from tflite_runtime.interpreter import Interpreter
+        return Interpreter
+    except ImportError:
+        pass
+    try:
+        import tensorflow as tf
+    except ImportError:
+        raise RuntimeError("The tflite backend requires ai-edge-litert, tflite-runtime or tensorflow") from None
+    return tf.lite.Interpreter
+
+
+def _quantize(values: np.ndarray, detail: dict) -> np.ndarray:
+    scale, zero_point = detail['quantization']
+    if not scale:
+        return values.astype(detail['dtype'])
+    info = np.iinfo(detail['dtype'])
+    return np.clip(np.round(values / scale + zero_point), info.min, info.max).astype(detail['dtype'])
+
+
+def _dequantize(values: np.ndarray, detail: dict) -> np.ndarray:
+    scale, zero_point = detail['quantization']
+    if not scale or values.dtype.kind == 'f':
+        return values.astype(np.float32, copy=False)
+    return (values.astype(np.float32) - zero_point) * scale
+
+
+class TFLiteBackend(InferenceBackend):
+    """로컬 .tflite 파일을 TFLite 인터프리터로 실행합니다.
+
+    float16 가중치 모델과 입출력까지 int8로 양자화한 모델 모두 같은 방식으로 불러오며, 정수 입출력은 모델에 기록된
+    scale/zero_point로 변환합니다. 입력 길이가 가변이면 파형 전체를 한 번에, 패치 하나(15600샘플) 고정이면
+    패치마다 실행합니다. 인터프리터는 스레드 간에 공유할 수 없으므로 추론 스레드마다 하나씩 만듭니다.
+    """
+
+    name = "tflite"
+
+    def __init__(self, model_path: str, class_map_path: str = "", num_threads: int = 0):
+        super().__init__()
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self._interpreter_class = _load_tflite_interpreter()
+        with open(model_path, "rb") as f:
+            self._model_content = f.read()
+        self._local = threading.local()
+        self.class_names = _read_local_class_map(model_path, class_map_path)
+
+        interpreter = self._interpreter()
+        detail = interpreter.get_input_details()[0]
+        signature = list(detail.get('shape_signature', detail['shape']))
+        self.input_dtype = np.dtype(detail['dtype'])
+        self.dynamic_length = signature[-1] == -1
+        self.batched = not self.dynamic_length and len(signature) == 2 and signature[0] == -1
+        if not self.dynamic_length and signature[-1] != YAMNET_MIN_SAMPLES:
+            raise RuntimeError(f"Unsupported TFLite input shape {signature}; expected [-1] or [{YAMNET_MIN_SAMPLES}]")
+        logger.info("TFLite YAMNet input %s %s from %s", signature, self.input_dtype, model_path)
+
+    def _interpreter(self):
+        interpreter = getattr(self._local, 'interpreter', None)
+        if interpreter is None:
+            interpreter = self._interpreter_class(
+                model_content=self._model_content,
+                num_threads=self.num_threads or None
+            )
+            interpreter.allocate_tensors()
+            self._local.interpreter = interpreter
+            self._local.input_shape = None
+        return interpreter
+
+    def _invoke(self, interpreter, values: np.ndarray) -> List[np.ndarray]:
+        detail = interpreter.get_input_details()[0]
+        if self._local.input_shape != values.shape:
+            interpreter.resize_tensor_input(detail['index'], list(values.shape))
+            interpreter.allocate_tensors()
+            self._local.input_shape = values.shape
+        interpreter.set_tensor(detail['index'], _quantize(values, detail))
+        interpreter.invoke()
+        return [_dequantize(interpreter.get_tensor(output['index']), output) for output in interpreter.get_output_details()]
+
+    def __call__(self, waveform: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        interpreter = self._interpreter()
+        if self.dynamic_length:
+            return _pick_outputs(self._invoke(interpreter, np.asarray(waveform, dtype=np.float32)))
+
+        patches = frame_patches(waveform)
+        if self.batched:
+            return _pick_outputs(self._invoke(interpreter, np.ascontiguousarray(patches)))
+        shape = tuple(interpreter.get_input_details()[0]['shape'])
+        return _concat_patch_outputs([_pick_outputs(self._invoke(interpreter, patch.reshape(shape))) for patch in patches])
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'model': self.model_path, 'input_dtype': str(self.input_dtype), 'num_threads': self.num_threads}
+
+
+class OnnxBackend(InferenceBackend):
+    """로컬 .onnx 파일을 ONNX Runtime CPU 세션으로 실행합니다.
+
+    tf2onnx로 변환한 SavedModel처럼 입력 길이가 가변이면 파형 전체를, (N, 15600) 입력이면 패치 묶음을 한 번에 넣습니다.
+    세션의 run()은 스레드 안전하므로 모든 추론 스레드가 세션 하나를 공유합니다.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model_path: str, class_map_path: str = "", num_threads: int = 0):
+        super().__init__()
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise RuntimeError("The onnx backend requires onnxruntime") from None
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self.class_names = _read_local_class_map(model_path, class_map_path)
+
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_shape = list(model_input.shape)
+        fixed = [isinstance(dim, int) and dim > 0 for dim in self.input_shape]
+        self.dynamic_length = not fixed[-1]
+        self.batched = not self.dynamic_length and len(fixed) == 2 and not fixed[0]
+        if not self.dynamic_length and self.input_shape[-1] != YAMNET_MIN_SAMPLES:
+            raise RuntimeError(f"Unsupported ONNX input shape {self.input_shape}; expected [N] or [N, {YAMNET_MIN_SAMPLES}]")
+        logger.info("ONNX YAMNet input %s from %s", self.input_shape, model_path)
+
+    def _run(self, values: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        return _pick_outputs(self.session.run(None, {self.input_name: np.ascontiguousarray(values)}))
+
+    def __call__(self, waveform: np.ndarray) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dynamic_length:
+            values = np.asarray(waveform, dtype=np.float32)
+            return self._run(values[None, :] if len(self.input_shape) == 2 else values)
+
+        patches = frame_patches(waveform)
+        if self.batched:
+            return self._run(patches)
+        return _concat_patch_outputs([self._run(patch.reshape(self.input_shape)) for patch in patches])
+
+    def describe(self) -> dict:
+        return {'name': self.name, 'model': self.model_path, 'num_threads': self.num_threads}
+
+
+def create_inference_backend(
+    kind: str,
+    model_handle: str = "",
+    model_path: str = "",
+    class_map_path: str = "",
+    num_threads: int = 0
+) -> InferenceBackend:
+    if kind == "tensorflow":
+        return TensorFlowBackend(model_handle)
+    if kind in ("tflite", "onnx") and not model_path:
+        raise ValueError(f"YAMNET_MODEL_PATH is required for the {kind} backend")
+    if kind == "tflite":
+        return TFLiteBackend(model_path, class_map_path=class_map_path, num_threads=num_threads)
+    if kind == "onnx":
+        return OnnxBackend(model_path, class_map_path=class_map_path, num_threads=num_threads)
+    raise ValueError(f"Unknown inference backend: {kind}")
+
+
+def _calibration_patches(calibration_dir: str, limit: int, seed: int = 0):
+    from api.service.audio_ingest import decode_wav
+    from api.service.resampler import resample
+
+    count = 0
+    for name in sorted(os.listdir(calibration_dir)) if calibration_dir else []:
+        if not name.lower().endswith(".wav"):
+            continue
+        with open(os.path.join(calibration_dir, name), "rb") as f:
+            sample_rate, audio, _ = decode_wav(f.read())
+        if sample_rate != YAMNET_SAMPLE_RATE:
+            audio = resample(audio, sample_rate, YAMNET_SAMPLE_RATE)
+        for patch in frame_patches(audio):
+            yield patch
+            count += 1
+            if count >= limit:
+                return
+    if count == 0:
+        # 보정용 녹음이 없으면 음량을 달리한 잡음으로 대신합니다. 실제 입력과 분포가 달라 정확도가 떨어질 수 있습니다.
+        logger.warning("No calibration WAV files; using synthetic noise for int8 calibration")
+        rng = np.random.default_rng(seed)
+        for _ in range(limit):
+            yield (rng.standard_normal(YAMNET_MIN_SAMPLES) * rng.uniform(0.001, 0.5)).astype(np.float32)
+
+
+def export_tflite(
+    model_handle: str,
+    output_path: str,
+    quantize: str = "none",
+    calibration_dir: str = "",
+    calibration_patches: int = 200
+):
+    """YAMNet SavedModel을 패치 하나(15600샘플)를 받는 .tflite 파일로 변환하고 클래스 이름 CSV를 옆에 복사합니다.
+
+    quantize는 "none", "float16"(가중치 float16), "dynamic"(가중치 int8), "int8"(가중치와 활성값 int8,
+    calibration_dir의 WAV로 보정) 중 하나입니다. 변환은 TensorFlow가 설치된 환경에서 한 번만 하면 됩니다.
+    """
+    import tensorflow as tf
+
+    backend = TensorFlowBackend(model_handle)
+
+    @tf.function(input_signature=[tf.TensorSpec([YAMNET_MIN_SAMPLES], tf.float32)])
+    def patch_model(waveform):
+        scores, embeddings, spectrogram = backend.model(waveform)
+        return {'scores': scores, 'embeddings': embeddings}
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([patch_model.get_concrete_function()], backend.model)
+    if quantize != "none":
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantize == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantize == "int8":
+        converter.representative_dataset = lambda: ([patch] for patch in _calibration_patches(calibration_dir, calibration_patches))
+    elif quantize not in ("none", "dynamic"):
+        raise ValueError(f"Unknown quantization: {quantize}")
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+    class_map_path = os.path.join(os.path.dirname(os.path.abspath(output_path)), CLASS_MAP_FILENAME)
+    tf.io.gfile.copy(backend.model.class_map_path().numpy(), class_map_path, overwrite=True)
+
+
+def export_onnx(model_handle: str, output_path: str, opset: int = 17):
+    """YAMNet SavedModel을 길이가 가변인 파형을 받는 .onnx 파일로 변환하고 클래스 이름 CSV를 옆에 복사합니다. tf2onnx가 필요합니다."""
+    import tensorflow as tf
+    import tf2onnx
+
+    backend = TensorFlowBackend(model_handle)
+    signature = [tf.TensorSpec([None], tf.float32, name="waveform")]
+
+    @tf.function(input_signature=signature)
+    def waveform_model(waveform):
+        scores, embeddings, spectrogram = backend.model(waveform)
+        return {'scores': scores, 'embeddings': embeddings}
+
+    tf2onnx.convert.from_function(waveform_model, input_signature=signature, opset=opset, output_path=output_path)
+    class_map_path = os.path.join(os.path.dirname(os.path.abspath(output_path)), CLASS_MAP_FILENAME)
+    tf.io.gfile.copy(backend.model.class_map_path().numpy(), class_map_path, overwrite=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m api.service.inference_backend")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    export = subparsers.add_parser("export-tflite", help="YAMNet SavedModel을 tflite 백엔드용 파일로 변환합니다")
+    export.add_argument("--model-handle", required=True, help="로컬 SavedModel 디렉터리 또는 TF Hub 핸들")
+    export.add_argument("--out", required=True)
+    export.add_argument("--quantize", choices=("none", "float16", "dynamic", "int8"), default="none")
+    export.add_argument("--calibration-dir", default="", help="int8 보정에 쓸 WAV 파일 디렉터리")
+    export.add_argument("--calibration-patches", type=int, default=200)
+    export_onnx_parser = subparsers.add_parser("export-onnx", help="YAMNet SavedModel을 onnx 백엔드용 파일로 변환합니다")
+    export_onnx_parser.add_argument("--model-handle", required=True, help="로컬 SavedModel 디렉터리 또는 TF Hub 핸들")
+    export_onnx_parser.add_argument("--out", required=True)
+    export_onnx_parser.add_argument("--opset", type=int, default=17)
+    args = parser.parse_args()
+
+    if args.command == "export-tflite":
+        export_tflite(args.model_handle, args.out, args.quantize, args.calibration_dir, args.calibration_patches)
+        description = f"{args.quantize} TFLite"
+    else:
+        export_onnx(args.model_handle, args.out, args.opset)
+        description = "ONNX"
+    print(f"Wrote {description} model ({os.path.getsize(args.out) / (1 << 20):.1f} MB) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
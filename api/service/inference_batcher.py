@@ -0,0 +1,101 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from api.service.inference_executor import InferenceExecutor
+
+
+class InferenceBatcher:
+    """대기 중인 파형을 최대 max_wait_ms 동안 또는 max_batch_size개까지 모아 한 번에 추론합니다.
+
+    워커가 모두 바쁠 때는 배치를 내보내지 않고 계속 모으므로, 부하가 높을수록 배치가 커집니다.
+    """
+
+    def __init__(self, executor: InferenceExecutor, max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_inflight_batches = executor.max_workers
+
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._inflight_batches = 0
+        # 이벤트 루프는 태스크를 약하게만 참조하므로, 실행 중인 배치가 GC로 사라지지 않도록 붙잡아 둡니다.
+        self._tasks: Set[asyncio.Task] = set()
+
+        self._batches = 0
+        self._clips = 0
+        self._largest_batch = 0
+        self._dropped = 0
+
+    async def analyze(self, waveform: np.ndarray) -> Tuple[str, float, Dict]:
+        if self.max_batch_size == 1:
+            return (await self._run_batch_direct([waveform]))[0]
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((waveform, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._on_timer)
+
+        return await future
+
+    def _on_timer(self):
+        self._timer = None
+        self._flush()
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        # 기한 초과나 연결 끊김으로 취소된 요청의 클립은 추론하지 않고 버립니다.
+        pending = [(waveform, future) for waveform, future in self._pending if not future.done()]
+        self._dropped += len(self._pending) - len(pending)
+        self._pending = pending
+
+        while self._pending and self._inflight_batches < self.max_inflight_batches:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            self._inflight_batches += 1
+            task = asyncio.create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        try:
+            results = await self._run_batch_direct([waveform for waveform, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        finally:
+            self._inflight_batches -= 1
+            if self._pending:
+                self._flush()
+
+    async def _run_batch_direct(self, waveforms: List[np.ndarray]) -> List[Tuple[str, float, Dict]]:
+        self._batches += 1
+        self._clips += len(waveforms)
+        self._largest_batch = max(self._largest_batch, len(waveforms))
+        return await self.executor.run('analyze_waveforms', waveforms)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait * 1000,
+            'pending': len(self._pending),
+            'batches': self._batches,
+            'clips': self._clips,
+            'average_batch_size': self._clips / self._batches if self._batches else 0.0,
+            'largest_batch': self._largest_batch,
+            'dropped': self._dropped,
+        }
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List
+
+from api.service.emotion_service import EmotionService
+from api.service.inference_executor import InferenceExecutor
+from api.service.inference_ipc import SharedArena, check_peer, read_message, write_message
+from api.service.inference_server import REMOTE_METHODS
+
+logger = logging.getLogger(__name__)
+
+
+class RemoteInferenceError(RuntimeError):
+    pass
+
+
+class _Connection:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.arena = SharedArena()
+
+    async def call(self, method_name: str, args: tuple) -> Any:
+        packed = self.arena.pack(args)
+        write_message(self.writer, (method_name, self.arena.name, packed))
+        await self.writer.drain()
+        ok, result = await read_message(self.reader)
+        if not ok:
+            raise RemoteInferenceError(result)
+        return result
+
+    def close(self):
+        self.writer.close()
+        self.arena.close()
+
+
+class RemoteInferenceExecutor:
+    """모델 호출은 공유 추론 서버로 보내고, 디코딩 같은 나머지 호출은 이 프로세스의 스레드 풀에서 실행합니다.
+
+    InferenceExecutor와 같은 run()/warmup()/stats()/shutdown()을 제공하므로 컨트롤러는 모드를 구분하지 않습니다.
+    서버 연결은 최대 max_workers개를 만들어 재사용하며, 연결마다 공유 메모리 영역이 하나씩 붙습니다.
+    """
+
+    kind = "remote"
+
+    def __init__(
+        self,
+        emotion_service: EmotionService,
+        socket_path: str,
+        max_workers: int = 2,
+        connect_timeout: float = 60.0
+    ):
+        self.socket_path = socket_path
+        self.max_workers = max(1, max_workers)
+        self.connect_timeout = connect_timeout
+        self.local = InferenceExecutor(emotion_service, kind="thread", max_workers=self.max_workers, eager_load=False)
+        self.is_ready = False
+
+        self._idle: List[_Connection] = []
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._waiting = 0
+        self._in_flight = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    async def run(self, method_name: str, *args) -> Any:
+        if method_name not in REMOTE_METHODS:
+            return await self.local.run(method_name, *args)
+
+        self._submitted += 1
+        # 슬롯을 기다리다 취소(요청 마감, 연결 끊김)되어도 대기 수가 남지 않게 finally에서 줄입니다.
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        try:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            self._in_flight += 1
+            try:
+                result = await connection.call(method_name, args)
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                # 응답 도중 끊긴 연결은 다시 쓰지 않고, 다음 요청이 새로 연결합니다.
+                self._failed += 1
+                connection.close()
+                raise RemoteInferenceError(f"Lost connection to inference server: {e}") from e
+            except RemoteInferenceError:
+                # 서버가 보낸 오류 응답이므로 연결은 그대로 재사용할 수 있습니다.
+                self._failed += 1
+                self._idle.append(connection)
+                raise
+            except BaseException:
+                # 요청 취소 등으로 응답을 다 읽지 못한 연결은 다음 요청의 응답과 섞이지 않도록 닫습니다.
+                self._failed += 1
+                connection.close()
+                raise
+            finally:
+                self._in_flight -= 1
+
+            self._completed += 1
+            self._idle.append(connection)
+            return result
+        finally:
+            self._slots.release()
+
+    async def _connect(self) -> _Connection:
+        try:
+            reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        except OSError as e:
+            raise RemoteInferenceError(f"Cannot connect to inference server at {self.socket_path}: {e}") from e
+        try:
+            # 다른 사용자가 같은 경로에 띄운 프로세스라면 응답을 pickle로 읽기 전에 끊습니다.
+            check_peer(writer)
+        except PermissionError as e:
+            writer.close()
+            raise RemoteInferenceError(str(e)) from e
+        return _Connection(reader, writer)
+
+    async def warmup(self):
+        # 추론 서버가 HTTP 워커보다 늦게 뜰 수 있으므로 connect_timeout 동안 다시 시도합니다.
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                await self.run('warmup')
+                break
+            except RemoteInferenceError as e:
+                if time.monotonic() >= deadline:
+                    raise
+                logger.info("Waiting for inference server: %s", e)
+                await asyncio.sleep(0.5)
+        self.is_ready = True
+
+    def stats(self) -> Dict[str, Any]:
+        local = self.local.stats()
+        active = local['active'] + self._in_flight
+        return {
+            'kind': self.kind,
+            'ready': self.is_ready,
+            'max_workers': self.max_workers,
+            'active': active,
+            'queue_depth': local['queue_depth'] + self._waiting,
+            'utilization': self._in_flight / self.max_workers,
+            'submitted': local['submitted'] + self._submitted,
+            'completed': local['completed'] + self._completed,
+            'failed': local['failed'] + self._failed,
+            'remote': {
+                'socket': self.socket_path,
+                'connections': len(self._idle) + self._in_flight,
+                'in_flight': self._in_flight,
+                'shared_memory_bytes': sum(connection.arena.size for connection in self._idle),
+            },
+        }
+
+    def shutdown(self, wait: bool = True):
+        for connection in self._idle:
+            connection.close()
+        self._idle = []
+        self.local.shutdown(wait=wait)
@@ -0,0 +1,143 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from api.config.loggingConfig import setup_logging
+from api.service.emotion_service import EmotionService
+from api.service.metrics import collect_stages, record_stages
+
+_worker_service: Optional[EmotionService] = None
+
+
+def _init_worker(eager_load: bool):
+    global _worker_service
+    setup_logging()
+    _worker_service = EmotionService()
+    if eager_load:
+        _worker_service.warmup()
+
+
+def _run_in_worker(method_name: str, *args):
+    # 워커 프로세스의 단계별 측정값은 결과와 함께 돌려보내 메인 프로세스의 /metrics에 기록합니다.
+    return collect_stages(getattr(_worker_service, method_name), *args)
+
+
+class InferenceExecutor:
+    """EmotionService 호출을 이벤트 루프 밖의 제한된 워커 풀에서 실행합니다.
+
+    thread 모드는 컨트롤러와 같은 EmotionService 인스턴스를 공유하고,
+    process 모드는 워커 프로세스마다 자체 EmotionService를 생성합니다.
+    """
+
+    def __init__(
+        self,
+        emotion_service: EmotionService,
+        kind: str = "thread",
+        max_workers: int = 2,
+        eager_load: bool = True
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown inference executor kind: {kind}")
+
+        self.emotion_service = emotion_service
+        self.kind = kind
+        self.max_workers = max(1, max_workers)
+        self.eager_load = eager_load
+        self.is_ready = False
+        self._executor: Optional[Executor] = None
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_init_worker,
+                    initargs=(self.eager_load,)
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="inference"
+                )
+        return self._executor
+
+    async def run(self, method_name: str, *args) -> Any:
+        executor = self._get_executor()
+        if self.kind == "process":
+            future = executor.submit(_run_in_worker, method_name, *args)
+        else:
+            future = executor.submit(getattr(self.emotion_service, method_name), *args)
+
+        with self._lock:
+            self._pending += 1
+            self._submitted += 1
+        future.add_done_callback(self._on_done)
+
+        if self.kind == "process":
+            result, stages = await asyncio.wrap_future(future)
+            record_stages(stages)
+            return result
+        return await asyncio.wrap_future(future)
+
+    async def warmup(self):
+        if self.kind == "process":
+            # 워커 수만큼 동시에 제출해 모든 프로세스가 뜨고 모델을 로드하도록 합니다.
+            await asyncio.gather(*[self.run('warmup') for _ in range(self.max_workers)])
+        else:
+            await self.run('warmup')
+        self.is_ready = True
+
+    def _on_done(self, future):
+        with self._lock:
+            self._pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                self._failed += 1
+            else:
+                self._completed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = self._pending
+            active = min(pending, self.max_workers)
+            return {
+                'kind': self.kind,
+                'ready': self.is_ready,
+                'max_workers': self.max_workers,
+                'active': active,
+                'queue_depth': pending - active,
+                'utilization': active / self.max_workers,
+                'submitted': self._submitted,
+                'completed': self._completed,
+                'failed': self._failed,
+            }
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+def create_inference_executor(
+    emotion_service: EmotionService,
+    kind: str,
+    max_workers: int = 2,
+    eager_load: bool = True,
+    server_socket: str = "",
+    connect_timeout: float = 60.0
+):
+    if kind == "remote":
+        from api.service.inference_client import RemoteInferenceExecutor
+        return RemoteInferenceExecutor(
+            emotion_service,
+            server_socket,
+            max_workers=max_workers,
+            connect_timeout=connect_timeout
+        )
+    return InferenceExecutor(emotion_service, kind=kind, max_workers=max_workers, eager_load=eager_load)
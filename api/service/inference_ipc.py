@@ -0,0 +1,176 @@
+"""HTTP 워커와 공유 추론 서버 사이의 유닉스 소켓 프로토콜.
+
+메시지는 4바이트 길이 뒤에 pickle 본문이 붙는 형식입니다. 오디오 배열과 WAV 바이트는 메시지에 담지 않고
+연결마다 하나씩 둔 공유 메모리 영역(arena)에 한 번 복사한 뒤 위치(ShmRef)만 보내며, 서버는 그 영역을
+복사 없이 numpy 배열로 읽습니다. 한 연결에서는 요청과 응답이 번갈아 오가므로 클라이언트는 응답을 받기
+전까지 영역을 다시 쓰지 않습니다.
+
+pickle을 쓰므로 같은 사용자끼리만 주고받아야 합니다. 서버는 소켓을 다른 사용자가 쓸 수 없는 0700 디렉터리에
+0600으로 만들고(prepare_socket_dir), 양쪽 모두 연결 직후 상대 프로세스의 uid를 확인합니다(check_peer).
+"""
+import asyncio
+import os
+import pickle
+import socket
+import stat
+import struct
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+_HEADER = struct.Struct("!I")
+_PEERCRED = struct.Struct("3i")
+_ALIGNMENT = 64
+MIN_ARENA_BYTES = 1 << 20
+
+
+class ShmRef(NamedTuple):
+    offset: int
+    nbytes: int
+    # None이면 numpy 배열이 아닌 바이트 버퍼(WAV 등)입니다.
+    dtype: Optional[str]
+    shape: Tuple[int, ...]
+
+
+async def read_message(reader: asyncio.StreamReader) -> Any:
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return pickle.loads(await reader.readexactly(length))
+
+
+def write_message(writer: asyncio.StreamWriter, message: Any):
+    body = pickle.dumps(message, protocol=pickle.HIGHEST_PROTOCOL)
+    writer.writelines((_HEADER.pack(len(body)), body))
+
+
+def prepare_socket_dir(path: str):
+    """소켓을 둘 디렉터리를 0700으로 만들고, 이미 있으면 이 사용자만 쓸 수 있는 디렉터리인지 확인합니다."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o022:
+        raise PermissionError(
+            f"Inference socket directory {directory} must be a directory owned by uid {os.getuid()} "
+            f"and not writable by group or others"
+        )
+
+
+def peer_uid(sock: socket.socket) -> Optional[int]:
+    """유닉스 소켓 상대 프로세스의 uid. SO_PEERCRED가 없는 플랫폼이면 None입니다."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    _, uid, _ = _PEERCRED.unpack(sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEERCRED.size))
+    return uid
+
+
+def check_peer(writer: asyncio.StreamWriter):
+    """상대 프로세스가 같은 사용자가 아니면 pickle 메시지를 읽기 전에 PermissionError를 냅니다."""
+    uid = peer_uid(writer.get_extra_info("socket"))
+    if uid is not None and uid != os.getuid():
+        raise PermissionError(f"Inference socket peer runs as uid {uid}, expected {os.getuid()}")
+
+
+class SharedArena:
+    """클라이언트 쪽 공유 메모리 영역. 요청 인자의 배열과 바이트를 여기에 옮기고 ShmRef로 바꿉니다."""
+
+    def __init__(self):
+        self._shm: Optional[shared_memory.SharedMemory] = None
+
+    @property
+    def name(self) -> Optional[str]:
+        return self._shm.name if self._shm is not None else None
+
+    @property
+    def size(self) -> int:
+        return self._shm.size if self._shm is not None else 0
+
+    def pack(self, args: Tuple) -> Tuple:
+        copies: List[Tuple[int, memoryview]] = []
+        end = 0
+
+        def place(value):
+            nonlocal end
+            if isinstance(value, np.ndarray):
+                array = np.ascontiguousarray(value)
+                ref = ShmRef(end, array.nbytes, array.dtype.str, array.shape)
+                source = memoryview(array.reshape(-1).view(np.uint8))
+            elif isinstance(value, (bytes, bytearray, memoryview)):
+                source = memoryview(value).cast("B")
+                ref = ShmRef(end, source.nbytes, None, (source.nbytes,))
+            elif isinstance(value, (list, tuple)):
+                return type(value)(place(item) for item in value)
+            else:
+                return value
+            copies.append((end, source))
+            end += -(-source.nbytes // _ALIGNMENT) * _ALIGNMENT
+            return ref
+
+        packed = place(tuple(args))
+        if copies:
+            self._reserve(end)
+            buffer = self._shm.buf
+            for offset, source in copies:
+                buffer[offset:offset + source.nbytes] = source
+        return packed
+
+    def _reserve(self, size: int):
+        if self._shm is not None and self._shm.size >= size:
+            return
+        # 이전 영역은 이름만 지우면 되고, 서버는 다음 요청에서 새 이름을 보고 옮겨 갑니다.
+        new_size = max(size, 2 * self.size, MIN_ARENA_BYTES)
+        self.close()
+        self._shm = shared_memory.SharedMemory(create=True, size=new_size)
+
+    def close(self):
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+class ArenaReader:
+    """서버 쪽에서 클라이언트의 공유 메모리 영역을 열어 ShmRef를 배열 뷰로 바꿉니다."""
+
+    def __init__(self):
+        self._shm: Optional[shared_memory.SharedMemory] = None
+        # 배열 뷰가 아직 남아 있어 닫지 못한 이전 영역들. 다음에 영역을 바꿀 때 다시 닫아 봅니다.
+        self._retired: List[shared_memory.SharedMemory] = []
+
+    def unpack(self, name: Optional[str], args: Tuple) -> Tuple:
+        if name is not None and (self._shm is None or self._shm.name != name):
+            self.close()
+            self._shm = _attach(name)
+
+        def resolve(value):
+            if isinstance(value, ShmRef):
+                if value.dtype is None:
+                    return self._shm.buf[value.offset:value.offset + value.nbytes]
+                return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=self._shm.buf, offset=value.offset)
+            if isinstance(value, (list, tuple)):
+                return type(value)(resolve(item) for item in value)
+            return value
+
+        return resolve(args)
+
+    def close(self):
+        if self._shm is not None:
+            self._retired.append(self._shm)
+            self._shm = None
+
+        still_exported = []
+        for shm in self._retired:
+            try:
+                shm.close()
+            except BufferError:
+                still_exported.append(shm)
+        self._retired = still_exported
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    # 영역의 수명은 만든 쪽(HTTP 워커)이 관리하므로, 서버가 종료하면서 지우지 않도록 추적에서 뺍니다.
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
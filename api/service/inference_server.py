@@ -0,0 +1,133 @@
+"""YAMNet을 한 번만 올려 여러 HTTP 워커가 함께 쓰는 공유 추론 서버.
+
+    python -m api.service.inference_server
+    INFERENCE_EXECUTOR=remote uvicorn main:app --workers 4
+
+HTTP 워커는 WAV 디코딩과 리샘플링을 직접 하고, 모델이 필요한 호출만 유닉스 소켓으로 보냅니다
+(프로토콜은 inference_ipc 참고). 서버는 여러 워커에서 온 파형을 하나의 마이크로 배처로 모아 추론하므로
+워커 수가 늘어도 모델 사본과 TF 런타임은 하나이고, 배치는 오히려 커집니다.
+"""
+import argparse
+import asyncio
+import logging
+import os
+from typing import Any
+
+from api.config.inferenceConfig import (
+    INFERENCE_BATCH_MAX_SIZE,
+    INFERENCE_BATCH_MAX_WAIT_MS,
+    INFERENCE_SERVER_METRICS_PORT,
+    INFERENCE_SERVER_SOCKET,
+    INFERENCE_WORKERS,
+    YAMNET_EAGER_LOAD,
+)
+from api.config.loggingConfig import setup_logging
+from api.service.emotion_service import EmotionService
+from api.service.inference_batcher import InferenceBatcher
+from api.service.inference_executor import InferenceExecutor
+from api.service.inference_ipc import ArenaReader, check_peer, prepare_socket_dir, read_message, write_message
+
+logger = logging.getLogger(__name__)
+
+# 모델을 쓰는 메서드만 서버에서 실행합니다. 디코딩처럼 모델이 필요 없는 작업은 HTTP 워커에서 처리합니다.
+REMOTE_METHODS = frozenset({'analyze_waveforms', 'analyze_windowed', 'embed_waveform', 'warmup'})
+
+
+class InferenceServer:
+    def __init__(self, emotion_service: EmotionService, workers: int, eager_load: bool = True):
+        self.emotion_service = emotion_service
+        self.executor = InferenceExecutor(emotion_service, kind="thread", max_workers=workers, eager_load=eager_load)
+        self.batcher = InferenceBatcher(
+            self.executor,
+            max_batch_size=INFERENCE_BATCH_MAX_SIZE,
+            max_wait_ms=INFERENCE_BATCH_MAX_WAIT_MS
+        )
+        self.eager_load = eager_load
+        self.connections = 0
+
+    async def call(self, method_name: str, args: tuple) -> Any:
+        if method_name == 'analyze_waveforms':
+            # 클립 단위로 배처에 넣어 다른 워커에서 온 요청과 한 번의 YAMNet 호출로 묶습니다.
+            return list(await asyncio.gather(*[self.batcher.analyze(waveform) for waveform in args[0]]))
+        if method_name not in REMOTE_METHODS:
+            raise ValueError(f"Method not served by the inference server: {method_name}")
+        return await self.executor.run(method_name, *args)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            check_peer(writer)
+        except PermissionError as e:
+            logger.warning("Rejected inference connection: %s", e)
+            writer.close()
+            return
+
+        arena = ArenaReader()
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    method_name, arena_name, packed_args = await read_message(reader)
+                except asyncio.IncompleteReadError:
+                    break
+
+                try:
+                    result = await self.call(method_name, arena.unpack(arena_name, packed_args))
+                    response = (True, result)
+                except Exception as e:
+                    logger.exception("Inference call %s failed", method_name)
+                    response = (False, f"{e.__class__.__name__}: {e}")
+
+                write_message(writer, response)
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            arena.close()
+            writer.close()
+
+    async def serve(self, path: str):
+        if self.eager_load:
+            await self.executor.warmup()
+
+        prepare_socket_dir(path)
+        if os.path.exists(path):
+            os.unlink(path)
+        # bind가 만드는 소켓 파일이 처음부터 0600이 되도록 umask를 잠시 좁힙니다.
+        umask = os.umask(0o177)
+        try:
+            server = await asyncio.start_unix_server(self.handle, path=path)
+        finally:
+            os.umask(umask)
+        logger.info("Inference server listening on %s", path)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m api.service.inference_server")
+    parser.add_argument("--socket", default=INFERENCE_SERVER_SOCKET)
+    parser.add_argument("--workers", type=int, default=INFERENCE_WORKERS, help="추론 스레드 수")
+    parser.add_argument("--metrics-port", type=int, default=INFERENCE_SERVER_METRICS_PORT)
+    args = parser.parse_args()
+
+    setup_logging()
+    if args.metrics_port:
+        # 모델 추론 단계 지표는 이 프로세스에서 기록되므로 따로 노출합니다.
+        from prometheus_client import start_http_server
+        start_http_server(args.metrics_port)
+
+    server = InferenceServer(EmotionService(), workers=args.workers, eager_load=YAMNET_EAGER_LOAD)
+    try:
+        asyncio.run(server.serve(args.socket))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""요청 처리 단계별 지연 시간과 진행 중인 작업 수를 Prometheus 형식으로 내보냅니다.
+
+단계 타이머는 thread 모드에서는 바로 히스토그램에 기록합니다. process 모드의 워커 프로세스는
+메인 프로세스의 레지스트리에 직접 쓸 수 없으므로, collect_stages()로 측정값을 모아 결과와 함께
+돌려보내고 메인 프로세스가 record_stages()로 기록합니다.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, List, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# 1ms 미만의 디코딩부터 수 초 걸리는 Claude 호출까지 담을 수 있는 구간
+_LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+STAGE_SECONDS = Histogram(
+    "vibe_stage_duration_seconds",
+    "Time spent in each request processing stage",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "vibe_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge("vibe_http_requests_in_flight", "HTTP requests currently being handled")
+
+INFERENCE_IN_FLIGHT = Gauge("vibe_inference_in_flight", "Inference calls currently running on a worker")
+INFERENCE_QUEUE_DEPTH = Gauge("vibe_inference_queue_depth", "Inference calls waiting for a free worker")
+BATCHER_PENDING = Gauge("vibe_batcher_pending_clips", "Clips waiting to be packed into an inference batch")
+ANTHROPIC_IN_FLIGHT = Gauge("vibe_anthropic_in_flight", "Claude API calls currently in progress")
+LLM_FALLBACKS = Counter(
+    "vibe_llm_fallbacks",
+    "Recommendation messages answered with the default message instead of Claude",
+    ["reason"],
+)
+LLM_CIRCUIT_STATE = Gauge("vibe_llm_circuit_state", "Claude circuit breaker state (0 closed, 1 half-open, 2 open)")
+ADMISSION_ACTIVE = Gauge("vibe_admission_active", "Analysis requests currently admitted past admission control")
+ADMISSION_WAITING = Gauge("vibe_admission_waiting", "Analysis requests waiting for an admission slot")
+ADMISSION_REJECTED = Counter(
+    "vibe_admission_rejected",
+    "Analysis requests dropped by admission control",
+    ["reason"],
+)
+
+_collector = threading.local()
+
+
+def observe_stage(stage: str, seconds: float):
+    collected = getattr(_collector, "stages", None)
+    if collected is not None:
+        collected.append((stage, seconds))
+    else:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def collect_stages(fn: Callable, *args) -> Tuple[Any, List[Tuple[str, float]]]:
+    """fn을 실행하는 동안 측정한 단계 시간을 히스토그램 대신 목록에 모아 결과와 함께 돌려줍니다."""
+    previous = getattr(_collector, "stages", None)
+    stages = _collector.stages = []
+    try:
+        return fn(*args), stages
+    finally:
+        _collector.stages = previous
+
+
+def record_stages(stages: List[Tuple[str, float]]):
+    for stage, seconds in stages:
+        STAGE_SECONDS.labels(stage).observe(seconds)
+
+
+def render() -> Tuple[bytes, str]:
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+class MetricsMiddleware:
+    """라우트 템플릿별 요청 지연 시간과 처리 중인 요청 수를 기록하는 ASGI 미들웨어.
+
+    응답 본문을 감싸지 않으므로 SSE 스트리밍 응답도 그대로 흘려보냅니다. 스트리밍 요청의 지연 시간은 마지막 청크까지입니다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # 경로 그대로 쓰면 /tracks/{track_id}처럼 라벨이 무한히 늘어나므로 라우트 템플릿을 씁니다.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_SECONDS.labels(scope["method"], route, str(status)).observe(time.perf_counter() - started)
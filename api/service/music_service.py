@@ -1,238 +1,278 @@
-from typing import List, Dict
+from typing import AsyncIterator, List, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import json
+import logging
 import random
 import os
-from anthropic import Anthropic
+import threading
+import time
 from dotenv import load_dotenv
 from api.model.schemas import Track
+from api.config.llmConfig import (
+    ANTHROPIC_MODEL,
+    ANTHROPIC_BASE_URL,
+    ANTHROPIC_CONNECT_TIMEOUT_SECONDS,
+    ANTHROPIC_READ_TIMEOUT_SECONDS,
+    ANTHROPIC_MAX_RETRIES,
+    ANTHROPIC_RETRY_BASE_DELAY_SECONDS,
+    ANTHROPIC_RETRY_MAX_DELAY_SECONDS,
+    ANTHROPIC_MAX_CONCURRENCY,
+    ANTHROPIC_MAX_CONNECTIONS,
+    ANTHROPIC_LATENCY_BUDGET_MS,
+    ANTHROPIC_BREAKER_FAILURE_THRESHOLD,
+    ANTHROPIC_BREAKER_COOLDOWN_SECONDS,
+    MESSAGE_CACHE_BACKEND,
+    MESSAGE_CACHE_MAX_ENTRIES,
+    MESSAGE_CACHE_TTL_SECONDS,
+    MESSAGE_CACHE_SQLITE_PATH,
+)
+from api.config.catalogConfig import TRACK_CATALOG_PATH
+from api.service.cache_backend import create_cache_backend
+from api.service.circuit_breaker import CircuitBreaker
+from api.service.metrics import LLM_FALLBACKS, observe_stage, stage_timer
+from api.service.track_catalog import TrackCatalog
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 class MusicService:
     def __init__(self):
-        api_key = os.getenv('ANTHROPIC_API_KEY')
-        if api_key:
-            self.client = Anthropic(api_key=api_key)
-        else:
-            print("Warning: ANTHROPIC_API_KEY not found in environment")
-            self.client = None
-
-        self.music_database = {
-            "calm": [
-                Track(
-                    id="calm_1",
-                    title="입춘",
-                    artist="한로로",
-                    album="입춘",
-                    coverUrl="/images/hanroro.jpg",
-                    audioUrl="/music/한로로-입춘.mp3",
-                    duration=372
-                ),
-                Track(
-                    id="calm_2",
-                    title="처음 마주쳤을 때처럼",
-                    artist="TOIL",
-                    album="TOIL 1집",
-                    coverUrl="/images/toil.jpg",
-                    audioUrl="/music/TOIL-처음마주쳤을때처럼.mp3",
-                    duration=245
-                ),
-                Track(
-                    id="calm_3",
-                    title="Autumn Leaves",
-                    artist="Various Artists",
-                    album="Calm Piano",
-                    coverUrl="/images/calm-piano.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-1.mp3",
-                    duration=360
-                ),
-                Track(
-                    id="calm_4",
-                    title="Peaceful Morning",
-                    artist="한로로",
-                    album="Peaceful Collection",
-                    coverUrl="/images/peaceful.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-4.mp3",
-                    duration=320
-                ),
-                Track(
-                    id="calm_5",
-                    title="Moonlight Sonata",
-                    artist="TOIL",
-                    album="Classical Moods",
-                    coverUrl="/images/moonlight.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-5.mp3",
-                    duration=295
-                ),
-                Track(
-                    id="calm_6",
-                    title="Serenity",
-                    artist="Various Artists",
-                    album="Meditation Music",
-                    coverUrl="/images/serenity.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-6.mp3",
-                    duration=340
-                ),
-                Track(
-                    id="calm_7",
-                    title="Gentle Breeze",
-                    artist="한로로",
-                    album="Nature Sounds",
-                    coverUrl="/images/breeze.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-7.mp3",
-                    duration=310
-                ),
-                Track(
-                    id="calm_8",
-                    title="Starlight",
-                    artist="TOIL",
-                    album="Night Sky",
-                    coverUrl="/images/starlight.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-8.mp3",
-                    duration=285
-                ),
-            ],
-            "energetic": [
-                Track(
-                    id="energetic_1",
-                    title="에너지 부스트",
-                    artist="김하온",
-                    album="Energy Vol.1",
-                    coverUrl="/images/energy.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-2.mp3",
-                    duration=215
-                ),
-                Track(
-                    id="energetic_2",
-                    title="Run Run Run",
-                    artist="릴러말즈",
-                    album="Run",
-                    coverUrl="/images/run.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-3.mp3",
-                    duration=198
-                ),
-                Track(
-                    id="energetic_3",
-                    title="Party Time",
-                    artist="폴블랑코",
-                    album="Party",
-                    coverUrl="/images/party.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-4.mp3",
-                    duration=207
-                ),
-            ],
-            "urban": [
-                Track(
-                    id="urban_1",
-                    title="City Lights",
-                    artist="비오",
-                    album="Urban Beats",
-                    coverUrl="/images/city.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-5.mp3",
-                    duration=234
-                ),
-                Track(
-                    id="urban_2",
-                    title="Seoul Vibes",
-                    artist="김하온",
-                    album="Seoul",
-                    coverUrl="/images/seoul.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-6.mp3",
-                    duration=256
-                ),
-                Track(
-                    id="urban_3",
-                    title="Night Drive",
-                    artist="폴블랑코",
-                    album="Drive",
-                    coverUrl="/images/drive.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-7.mp3",
-                    duration=289
-                ),
-            ],
-            "nature": [
-                Track(
-                    id="nature_1",
-                    title="Forest Walk",
-                    artist="한로로",
-                    album="Nature Sounds",
-                    coverUrl="/images/forest.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-8.mp3",
-                    duration=312
-                ),
-                Track(
-                    id="nature_2",
-                    title="Ocean Waves",
-                    artist="TOIL",
-                    album="Seaside",
-                    coverUrl="/images/ocean.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-9.mp3",
-                    duration=278
-                ),
-                Track(
-                    id="nature_3",
-                    title="Mountain Breeze",
-                    artist="Various Artists",
-                    album="Nature Collection",
-                    coverUrl="/images/mountain.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-10.mp3",
-                    duration=301
-                ),
-            ],
-            "indoor": [
-                Track(
-                    id="indoor_1",
-                    title="Study Time",
-                    artist="릴러말즈",
-                    album="Focus",
-                    coverUrl="/images/study.jpg",
-                    audioUrl="/music/한로로-입춘.mp3",
-                    duration=372
-                ),
-                Track(
-                    id="indoor_2",
-                    title="Coffee Shop",
-                    artist="TOIL",
-                    album="Cafe Vibes",
-                    coverUrl="/images/coffee.jpg",
-                    audioUrl="/music/TOIL-처음마주쳤을때처럼.mp3",
-                    duration=245
-                ),
-                Track(
-                    id="indoor_3",
-                    title="Work Mode",
-                    artist="Various Artists",
-                    album="Productivity",
-                    coverUrl="/images/work.jpg",
-                    audioUrl="https://www.soundhelix.com/examples/mp3/SoundHelix-Song-11.mp3",
-                    duration=267
-                ),
-            ],
+        self._api_key = os.getenv('ANTHROPIC_API_KEY')
+        if not self._api_key:
+            logger.warning("ANTHROPIC_API_KEY not found in environment")
+        # anthropic SDK는 불러오는 데만 수백 ms가 걸리므로 클라이언트는 처음 필요할 때 만듭니다.
+        self._client = None
+        self._client_lock = threading.Lock()
+        self._retryable_errors: Tuple[type, ...] = ()
+
+        self._llm_semaphore = asyncio.Semaphore(max(1, ANTHROPIC_MAX_CONCURRENCY))
+        self.llm_in_flight = 0
+
+        self.latency_budget_seconds = ANTHROPIC_LATENCY_BUDGET_MS / 1000
+        self.breaker = CircuitBreaker(
+            "anthropic",
+            failure_threshold=ANTHROPIC_BREAKER_FAILURE_THRESHOLD,
+            cooldown_seconds=ANTHROPIC_BREAKER_COOLDOWN_SECONDS
+        )
+        # 예산을 넘겨 응답과 분리된 호출. 끝나면 메시지 캐시를 채웁니다.
+        self._late_calls = set()
+        self._llm_requests = 0
+        self._late_completions = 0
+        self._fallbacks = {'budget': 0, 'error': 0, 'circuit_open': 0}
+
+        self.message_cache = create_cache_backend(
+            MESSAGE_CACHE_BACKEND,
+            max_entries=MESSAGE_CACHE_MAX_ENTRIES,
+            ttl_seconds=MESSAGE_CACHE_TTL_SECONDS,
+            sqlite_path=MESSAGE_CACHE_SQLITE_PATH
+        )
+        self._message_cache_saved_seconds = 0.0
+
+        self.claude_emotion_to_category = {
+            'happy': 'energetic',
+            'sad': 'calm',
+            'angry': 'energetic',
+            'calm': 'nature',
+            'energetic': 'urban',
+            'anxious': 'indoor',
+        }
+
+        self.default_emotion_to_category = {
+            'happy': 'energetic',
+            'sad': 'calm',
+            'angry': 'calm',
+            'calm': 'calm',
+            'energetic': 'energetic',
+            'anxious': 'calm',
+        }
+
+        self.default_messages = {
+            'happy': '행복한 기분이시군요! 이 즐거운 순간을 더욱 특별하게 만들어줄 신나는 음악을 추천합니다.',
+            'sad': '힘든 시간을 보내고 계시는군요. 이 차분한 음악들이 마음을 위로해줄 거예요.',
+            'angry': '감정이 격해져 있으시네요. 이 음악들이 마음을 진정시키는데 도움이 될 거예요.',
+            'calm': '평온한 상태시군요. 이 분위기를 유지할 수 있는 음악을 추천합니다.',
+            'energetic': '활기찬 에너지가 느껴집니다! 이 기세를 이어갈 음악을 준비했어요.',
+            'anxious': '불안하신 것 같네요. 이 음악들이 긴장을 풀어주는데 도움이 될 거예요.',
         }
 
+        self.catalog = TrackCatalog(TRACK_CATALOG_PATH)
+        # 빈 카탈로그로 추천 없이 응답하는 대신 시작을 멈춥니다. 핫 리로드 실패는 이전 카탈로그를 유지합니다.
+        if not self.catalog.reload() or not self.catalog.snapshot.tracks:
+            error = self.catalog.stats()['last_error'] or "no tracks"
+            raise RuntimeError(f"Cannot load track catalog from {TRACK_CATALOG_PATH}: {error}")
+        self._catalog_watcher: Optional[asyncio.Task] = None
+
+    @property
+    def llm_enabled(self) -> bool:
+        return bool(self._api_key)
+
+    @property
+    def client(self):
+        if self._client is None and self._api_key:
+            # 시작 시 백그라운드 스레드(preload_client)와 첫 요청이 동시에 만들지 않도록 잠급니다.
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    def preload_client(self):
+        """시작 후 스레드에서 호출해 첫 Claude 요청이 SDK import 비용을 치르지 않게 합니다."""
+        _ = self.client
+
+    def _create_client(self):
+        import httpx
+        from anthropic import (
+            AsyncAnthropic,
+            DefaultAsyncHttpxClient,
+            APIConnectionError,
+            InternalServerError,
+            RateLimitError,
+        )
+
+        self._retryable_errors = (APIConnectionError, InternalServerError, RateLimitError)
+        # 재시도는 _create_message에서 지터를 섞어 직접 제한하므로 SDK 재시도는 끕니다.
+        return AsyncAnthropic(
+            api_key=self._api_key,
+            base_url=ANTHROPIC_BASE_URL,
+            max_retries=0,
+            timeout=httpx.Timeout(ANTHROPIC_READ_TIMEOUT_SECONDS, connect=ANTHROPIC_CONNECT_TIMEOUT_SECONDS),
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=ANTHROPIC_MAX_CONNECTIONS
+                )
+            )
+        )
+
     def get_recommendations_by_category(self, category: str, limit: int = 1) -> List[Track]:
-        tracks = self.music_database.get(category, self.music_database["calm"])
-        if len(tracks) <= limit:
-            return tracks
-        return random.sample(tracks, limit)
+        if not self.catalog.has_category(category):
+            category = "calm"
+        return self.catalog.sample_category(category, limit)
+
+    def start_catalog_watch(self, interval_seconds: float):
+        if interval_seconds > 0 and self._catalog_watcher is None:
+            self._catalog_watcher = asyncio.create_task(self.catalog.watch(interval_seconds))
+
+    async def aclose(self):
+        if self._catalog_watcher is not None:
+            self._catalog_watcher.cancel()
+            self._catalog_watcher = None
+        for task in list(self._late_calls):
+            task.cancel()
+        if self._client is not None:
+            await self._client.close()
 
-    def get_recommendations_by_emotion_with_claude(self, emotion: str, emotion_details: Dict) -> Dict:
-        if not self.client:
-            return self._get_default_recommendation(emotion)
+    async def _create_message(self, prompt: str):
+        for attempt in range(ANTHROPIC_MAX_RETRIES + 1):
+            try:
+                async with self._llm_semaphore:
+                    self.llm_in_flight += 1
+                    try:
+                        return await self.client.messages.create(
+                            model=ANTHROPIC_MODEL,
+                            max_tokens=1024,
+                            messages=[
+                                {"role": "user", "content": prompt}
+                            ]
+                        )
+                    finally:
+                        self.llm_in_flight -= 1
+            except self._retryable_errors as e:
+                if attempt == ANTHROPIC_MAX_RETRIES:
+                    raise
+                # full jitter: 0과 지수 백오프 상한 사이에서 무작위로 기다립니다.
+                delay = random.uniform(0, min(
+                    ANTHROPIC_RETRY_MAX_DELAY_SECONDS,
+                    ANTHROPIC_RETRY_BASE_DELAY_SECONDS * 2 ** attempt
+                ))
+                logger.warning("Claude API call failed (%s), retrying in %.2fs", e.__class__.__name__, delay)
+                await asyncio.sleep(delay)
 
+    async def _fetch_message(self, cache_key: str, prompt: str) -> str:
+        started = time.perf_counter()
+        message = await self._create_message(prompt)
+        recommendation_text = message.content[0].text
+        latency = time.perf_counter() - started
+        # 재시도와 세마포어 대기를 포함한 시간입니다.
+        observe_stage('anthropic', latency)
+        self._store_message(cache_key, recommendation_text, latency)
+        return recommendation_text
+
+    async def _message_within_budget(self, cache_key: str, prompt: str) -> Optional[str]:
+        """예산 안에 Claude 답을 받으면 돌려주고, 회로가 열려 있거나 예산을 넘기거나 실패하면 None을 돌려줍니다."""
+        self._llm_requests += 1
+        if not self.breaker.allow():
+            self._record_fallback('circuit_open')
+            return None
+
+        task = asyncio.ensure_future(self._fetch_message(cache_key, prompt))
         try:
-            emotion_to_category = {
-                'happy': 'energetic',
-                'sad': 'calm',
-                'angry': 'energetic',
-                'calm': 'nature',
-                'energetic': 'urban',
-                'anxious': 'indoor',
+            # shield: 예산이 지나도 호출은 취소하지 않고 끝까지 받아 캐시에 넣습니다.
+            recommendation_text = await asyncio.wait_for(asyncio.shield(task), self.latency_budget_seconds or None)
+        except asyncio.TimeoutError:
+            self._late_calls.add(task)
+            task.add_done_callback(self._on_late_call_done)
+            self.breaker.record_failure()
+            self._record_fallback('budget')
+            return None
+        except asyncio.CancelledError:
+            # 요청 자체가 취소되었으므로 호출도 멈추고, Claude 상태는 알 수 없으니 회로에는 기록하지 않습니다.
+            task.cancel()
+            self.breaker.abandon()
+            raise
+        except Exception:
+            logger.exception("Error calling Claude API")
+            self.breaker.record_failure()
+            self._record_fallback('error')
+            return None
+
+        self.breaker.record_success()
+        return recommendation_text
+
+    def _on_late_call_done(self, task: asyncio.Future):
+        self._late_calls.discard(task)
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            logger.warning("Claude call abandoned after the latency budget failed: %r", task.exception())
+        else:
+            self._late_completions += 1
+
+    def _record_fallback(self, reason: str):
+        self._fallbacks[reason] += 1
+        LLM_FALLBACKS.labels(reason).inc()
+
+    async def get_recommendations_by_emotion_with_claude(self, emotion: str, emotion_details: Dict) -> Dict:
+        if not self.llm_enabled:
+            return self._get_default_recommendation(emotion, emotion_details)
+
+        try:
+            recommended_tracks = self.select_recommended_tracks(emotion, emotion_details)
+
+            cache_key = self._message_cache_key(emotion, emotion_details, recommended_tracks)
+            recommendation_text = self._get_cached_message(cache_key)
+
+            if recommendation_text is None:
+                prompt = self._build_prompt(emotion, emotion_details, recommended_tracks)
+                recommendation_text = await self._message_within_budget(cache_key, prompt)
+                if recommendation_text is None:
+                    recommendation_text = self._get_default_message(emotion)
+
+            return {
+                'emotion': emotion,
+                'tracks': recommended_tracks,
+                'recommendation_message': recommendation_text,
+                'emotion_details': emotion_details
             }
 
-            category = emotion_to_category.get(emotion, 'calm')
-            recommended_tracks = self.get_recommendations_by_category(category, limit=1)
+        except Exception:
+            logger.exception("Error calling Claude API")
+            return self._get_default_recommendation(emotion, emotion_details)
 
-            prompt = f"""
+    def _build_prompt(self, emotion: str, emotion_details: Dict, recommended_tracks: List[Track]) -> str:
+        return f"""
 사용자의 현재 감정 상태: {emotion}
 감정 분석 상세 정보:
 - 주요 감지된 소리: {', '.join([c['name'] for c in emotion_details.get('top_classes', [])][:3])}
@@ -247,54 +287,172 @@ class MusicService:
 응답은 한국어로 작성해주세요. 각 섹션을 명확히 구분하되, 자연스럽게 연결해주세요.
 """
 
-            message = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+    def _message_cache_key(self, emotion: str, emotion_details: Dict, recommended_tracks: List[Track]) -> str:
+        # 프롬프트에 들어가는 값만 정규화해 키로 씁니다. 순서와 대소문자 차이는 같은 키가 됩니다.
+        sounds = sorted(c['name'].strip().lower() for c in emotion_details.get('top_classes', [])[:3])
+        tracks = sorted(f"{t.title.strip().lower()}|{t.artist.strip().lower()}" for t in recommended_tracks)
+        normalized = json.dumps([emotion.strip().lower(), sounds, tracks], ensure_ascii=False)
+        return hashlib.sha256(normalized.encode()).hexdigest()
+
+    def _get_cached_message(self, cache_key: str) -> Optional[str]:
+        cached = self.message_cache.get(cache_key)
+        if cached is None:
+            return None
+        self._message_cache_saved_seconds += cached['latency']
+        return cached['message']
+
+    def _store_message(self, cache_key: str, message: str, latency: float):
+        self.message_cache.set(cache_key, {'message': message, 'latency': latency})
+
+    def llm_stats(self) -> Dict:
+        fallbacks = sum(self._fallbacks.values())
+        return {
+            'enabled': self.llm_enabled,
+            'latency_budget_ms': self.latency_budget_seconds * 1000,
+            'requests': self._llm_requests,
+            'fallbacks': dict(self._fallbacks),
+            'fallback_rate': fallbacks / self._llm_requests if self._llm_requests else 0.0,
+            'late_in_flight': len(self._late_calls),
+            'late_completions': self._late_completions,
+            'breaker': self.breaker.stats(),
+        }
+
+    def stats(self) -> Dict:
+        return {
+            'llm': self.llm_stats(),
+            'message_cache': {
+                **self.message_cache.stats(),
+                'saved_latency_seconds': self._message_cache_saved_seconds,
+            },
+            'catalog': self.catalog.stats(),
+        }
+
+    def select_recommended_tracks(self, emotion: str, emotion_details: Optional[Dict] = None) -> List[Track]:
+        with stage_timer('catalog_selection'):
+            similar_tracks = self._similar_tracks(emotion_details, limit=1)
+            if similar_tracks:
+                return similar_tracks
+
+            if self.llm_enabled:
+                category = self.claude_emotion_to_category.get(emotion, 'calm')
+            else:
+                category = self.default_emotion_to_category.get(emotion, 'calm')
+            return self.get_recommendations_by_category(category, limit=1)
+
+    async def stream_recommendation_message(
+        self,
+        emotion: str,
+        emotion_details: Dict,
+        recommended_tracks: List[Track]
+    ) -> AsyncIterator[str]:
+        if not self.llm_enabled:
+            yield self._get_default_message(emotion)
+            return
+
+        cache_key = self._message_cache_key(emotion, emotion_details, recommended_tracks)
+        cached_message = self._get_cached_message(cache_key)
+        if cached_message is not None:
+            yield cached_message
+            return
+
+        self._llm_requests += 1
+        if not self.breaker.allow():
+            self._record_fallback('circuit_open')
+            yield self._get_default_message(emotion)
+            return
+
+        started = time.perf_counter()
+        prompt = self._build_prompt(emotion, emotion_details, recommended_tracks)
+        try:
+            # 예산은 첫 토큰까지의 시간에 적용합니다. 스트리밍은 응답과 묶여 있어 늦은 답을 따로 받아 두지 않습니다.
+            stream, texts, first = await asyncio.wait_for(self._open_stream(prompt), self.latency_budget_seconds or None)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            self._record_fallback('budget')
+            yield self._get_default_message(emotion)
+            return
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception:
+            logger.exception("Error streaming from Claude API")
+            self.breaker.record_failure()
+            self._record_fallback('error')
+            yield self._get_default_message(emotion)
+            return
+
+        self.breaker.record_success()
+        parts = [first]
+        try:
+            yield first
+            async for text in texts:
+                parts.append(text)
+                yield text
+            latency = time.perf_counter() - started
+            observe_stage('anthropic', latency)
+            self._store_message(cache_key, ''.join(parts), latency)
+
+        except Exception:
+            # 이미 일부 문장을 보냈으므로 기본 메시지를 덧붙이지 않고 스트림을 끝냅니다.
+            logger.exception("Error streaming from Claude API")
+        finally:
+            await self._close_stream(stream)
+
+    async def _open_stream(self, prompt: str):
+        """세마포어를 얻고 스트림을 열어 첫 토큰까지 받습니다. 성공하면 _close_stream()으로 정리해야 합니다."""
+        await self._llm_semaphore.acquire()
+        self.llm_in_flight += 1
+        stream = None
+        try:
+            stream = self.client.messages.stream(
+                model=ANTHROPIC_MODEL,
                 max_tokens=1024,
                 messages=[
                     {"role": "user", "content": prompt}
                 ]
             )
+            texts = (await stream.__aenter__()).text_stream.__aiter__()
+            try:
+                first = await texts.__anext__()
+            except StopAsyncIteration:
+                first = ''
+            return stream, texts, first
+        except BaseException:
+            await self._close_stream(stream)
+            raise
 
-            recommendation_text = message.content[0].text
+    async def _close_stream(self, stream):
+        try:
+            if stream is not None:
+                await stream.__aexit__(None, None, None)
+        finally:
+            self.llm_in_flight -= 1
+            self._llm_semaphore.release()
 
-            return {
-                'emotion': emotion,
-                'tracks': recommended_tracks,
-                'recommendation_message': recommendation_text,
-                'emotion_details': emotion_details
-            }
+    def _get_default_message(self, emotion: str) -> str:
+        return self.default_messages.get(emotion, '음악을 추천합니다.')
 
-        except Exception as e:
-            print(f"Error calling Claude API: {e}")
-            import traceback
-            traceback.print_exc()
-            return self._get_default_recommendation(emotion)
+    def _similar_tracks(self, emotion_details: Optional[Dict], limit: int) -> List[Track]:
+        # 임베딩 인덱스가 찾은 트랙 중 현재 카탈로그에 남아 있는 것만 유사도 순으로 사용합니다.
+        tracks = []
+        for match in (emotion_details or {}).get('similar_tracks', []):
+            track = self.catalog.get(match['id'])
+            if track is not None:
+                tracks.append(track)
+                if len(tracks) == limit:
+                    break
+        return tracks
 
-    def _get_default_recommendation(self, emotion: str) -> Dict:
-        emotion_to_category = {
-            'happy': 'energetic',
-            'sad': 'calm',
-            'angry': 'calm',
-            'calm': 'calm',
-            'energetic': 'energetic',
-            'anxious': 'calm',
-        }
-
-        category = emotion_to_category.get(emotion, 'calm')
-        recommended_tracks = self.get_recommendations_by_category(category, limit=1)
-
-        default_messages = {
-            'happy': '행복한 기분이시군요! 이 즐거운 순간을 더욱 특별하게 만들어줄 신나는 음악을 추천합니다.',
-            'sad': '힘든 시간을 보내고 계시는군요. 이 차분한 음악들이 마음을 위로해줄 거예요.',
-            'angry': '감정이 격해져 있으시네요. 이 음악들이 마음을 진정시키는데 도움이 될 거예요.',
-            'calm': '평온한 상태시군요. 이 분위기를 유지할 수 있는 음악을 추천합니다.',
-            'energetic': '활기찬 에너지가 느껴집니다! 이 기세를 이어갈 음악을 준비했어요.',
-            'anxious': '불안하신 것 같네요. 이 음악들이 긴장을 풀어주는데 도움이 될 거예요.',
-        }
+    def _get_default_recommendation(self, emotion: str, emotion_details: Optional[Dict] = None) -> Dict:
+        with stage_timer('catalog_selection'):
+            recommended_tracks = self._similar_tracks(emotion_details, limit=1)
+            if not recommended_tracks:
+                category = self.default_emotion_to_category.get(emotion, 'calm')
+                recommended_tracks = self.get_recommendations_by_category(category, limit=1)
 
         return {
             'emotion': emotion,
             'tracks': recommended_tracks,
-            'recommendation_message': default_messages.get(emotion, '음악을 추천합니다.'),
+            'recommendation_message': self._get_default_message(emotion),
             'emotion_details': {}
         }
@@ -0,0 +1,51 @@
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+
+# 필터 길이(원본 기준 zero crossing 수), 통과 대역 비율, Kaiser 창 beta
+FILTER_ZERO_CROSSINGS = 16
+FILTER_ROLLOFF = 0.945
+FILTER_KAISER_BETA = 8.6
+# up/down 비율이 이보다 크면 필터가 지나치게 길어지므로 resampy로 처리합니다.
+MAX_POLYPHASE_FACTOR = 1000
+
+
+@lru_cache(maxsize=32)
+def polyphase_filter(up: int, down: int) -> np.ndarray:
+    # scipy.signal은 불러오는 데 수백 ms가 걸리므로 리샘플링이 처음 필요할 때 불러옵니다.
+    from scipy import signal
+
+    max_rate = max(up, down)
+    half_length = FILTER_ZERO_CROSSINGS * max_rate
+    taps = signal.firwin(
+        2 * half_length + 1,
+        FILTER_ROLLOFF / max_rate,
+        window=('kaiser', FILTER_KAISER_BETA)
+    ).astype(np.float32)
+    taps.setflags(write=False)
+    return taps
+
+
+def resample(audio: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """float32 모노 신호를 dst_rate로 변환합니다.
+
+    (src_rate, dst_rate) 조합마다 설계한 폴리페이즈 필터를 캐시해 재사용하고,
+    비율이 너무 복잡한 경우에만 resampy로 처리합니다.
+    """
+    if src_rate == dst_rate:
+        return audio
+
+    divisor = gcd(src_rate, dst_rate)
+    up, down = dst_rate // divisor, src_rate // divisor
+    if max(up, down) > MAX_POLYPHASE_FACTOR:
+        import resampy
+        return resampy.resample(audio, src_rate, dst_rate).astype(np.float32, copy=False)
+
+    from scipy import signal
+    return signal.resample_poly(
+        audio.astype(np.float32, copy=False),
+        up,
+        down,
+        window=polyphase_filter(up, down)
+    )
@@ -0,0 +1,215 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pydantic import TypeAdapter
+
+from api.model.schemas import Track
+
+TRACK_FIELDS = ("id", "title", "artist", "album", "coverUrl", "audioUrl", "duration")
+_TRACK_LIST = TypeAdapter(List[Track])
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogSnapshot:
+    """한 번 로드한 카탈로그와 인덱스. 만든 뒤에는 바꾸지 않으므로 핫 리로드 중에도 잠금 없이 읽습니다."""
+
+    def __init__(self, records: Sequence[Tuple[str, Track]], version: Tuple[float, int] = (0.0, 0)):
+        self.version = version
+        self.tracks: List[Track] = []
+        self.categories: List[str] = []
+        self.encoded: List[bytes] = []
+        self.by_id: Dict[str, int] = {}
+        self.by_category: Dict[str, List[int]] = {}
+        self.by_artist: Dict[str, List[int]] = {}
+
+        for category, track in records:
+            if track.id in self.by_id:
+                raise ValueError(f"Duplicate track id: {track.id}")
+
+            position = len(self.tracks)
+            self.tracks.append(track)
+            self.categories.append(category)
+            # 목록 응답은 이 바이트를 이어 붙여 만들므로 트랙마다 한 번만 직렬화합니다.
+            self.encoded.append(track.model_dump_json().encode())
+            self.by_id[track.id] = position
+            self.by_category.setdefault(category, []).append(position)
+            self.by_artist.setdefault(_artist_key(track.artist), []).append(position)
+
+    def positions(self, category: Optional[str] = None, artist: Optional[str] = None) -> Sequence[int]:
+        if category is None and artist is None:
+            return range(len(self.tracks))
+
+        if artist is None:
+            return self.by_category.get(category, [])
+
+        by_artist = self.by_artist.get(_artist_key(artist), [])
+        if category is None:
+            return by_artist
+        # 아티스트별 목록은 카테고리별 목록보다 훨씬 짧으므로 아티스트 쪽을 훑으며 카테고리를 확인합니다.
+        return [position for position in by_artist if self.categories[position] == category]
+
+
+class TrackCatalog:
+    """JSON, CSV 또는 SQLite 파일에서 읽어 오는 트랙 카탈로그.
+
+    파일이 바뀌면 watch()가 새 스냅샷을 만들어 통째로 교체하므로, 재시작 없이 곡을 추가하거나 뺄 수 있습니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._snapshot = CatalogSnapshot([])
+        self._reload_lock = threading.Lock()
+        self._reloads = 0
+        self._loaded_at: Optional[float] = None
+        self._last_error: Optional[str] = None
+        self._failed_version: Optional[Tuple[float, int]] = None
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """파일이 바뀌었으면 다시 읽어 스냅샷을 교체합니다. 읽기에 실패하면 이전 스냅샷을 유지합니다."""
+        with self._reload_lock:
+            version = None
+            try:
+                stat = os.stat(self.path)
+                version = (stat.st_mtime, stat.st_size)
+                # 이미 읽었거나 읽다가 실패한 버전이면 파일이 다시 바뀔 때까지 건너뜁니다.
+                if not force and version in (self._snapshot.version, self._failed_version):
+                    return False
+
+                snapshot = CatalogSnapshot(load_track_records(self.path), version)
+            except Exception as e:
+                logger.error("Failed to load track catalog from %s: %s", self.path, e)
+                self._last_error = str(e)
+                self._failed_version = version
+                return False
+
+            self._snapshot = snapshot
+            self._reloads += 1
+            self._loaded_at = time.time()
+            self._last_error = None
+            logger.info("Loaded %d tracks from %s", len(snapshot.tracks), self.path)
+            return True
+
+    async def watch(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            await asyncio.to_thread(self.reload)
+
+    def get(self, track_id: str) -> Optional[Track]:
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(track_id)
+        return snapshot.tracks[position] if position is not None else None
+
+    def get_encoded(self, track_id: str) -> Optional[bytes]:
+        snapshot = self._snapshot
+        position = snapshot.by_id.get(track_id)
+        return snapshot.encoded[position] if position is not None else None
+
+    def encode_tracks(self, tracks: Sequence[Track]) -> bytes:
+        """트랙 목록을 JSON 배열 바이트로 만듭니다. 현재 스냅샷의 트랙이면 미리 직렬화한 바이트를 씁니다."""
+        snapshot = self._snapshot
+        parts = []
+        for track in tracks:
+            position = snapshot.by_id.get(track.id)
+            if position is not None and snapshot.tracks[position] is track:
+                parts.append(snapshot.encoded[position])
+            else:
+                # 리로드 전 스냅샷에서 고른 트랙처럼 현재 스냅샷에 없는 객체입니다.
+                parts.append(track.model_dump_json().encode())
+        return b'[' + b','.join(parts) + b']'
+
+    def sample_category(self, category: str, limit: int) -> List[Track]:
+        snapshot = self._snapshot
+        positions = snapshot.by_category.get(category, [])
+        if len(positions) <= limit:
+            return [snapshot.tracks[position] for position in positions]
+        return [snapshot.tracks[position] for position in random.sample(positions, limit)]
+
+    def has_category(self, category: str) -> bool:
+        return category in self._snapshot.by_category
+
+    def page_json(
+        self,
+        offset: int = 0,
+        limit: int = 50,
+        category: Optional[str] = None,
+        artist: Optional[str] = None
+    ) -> bytes:
+        """미리 직렬화한 트랙 JSON을 이어 붙여 목록 응답 본문을 만듭니다."""
+        snapshot = self._snapshot
+        positions = snapshot.positions(category, artist)
+        page = positions[offset:offset + limit]
+        return b''.join((
+            b'{"total":', str(len(positions)).encode(),
+            b',"offset":', str(offset).encode(),
+            b',"limit":', str(limit).encode(),
+            b',"tracks":[', b','.join(snapshot.encoded[position] for position in page), b']}',
+        ))
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'path': self.path,
+            'tracks': len(snapshot.tracks),
+            'categories': {category: len(positions) for category, positions in snapshot.by_category.items()},
+            'artists': len(snapshot.by_artist),
+            'reloads': self._reloads,
+            'loaded_at': self._loaded_at,
+            'last_error': self._last_error,
+        }
+
+
+def load_track_records(path: str) -> List[Tuple[str, Track]]:
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        rows = _read_json(path)
+    elif extension == ".csv":
+        rows = _read_csv(path)
+    elif extension in (".sqlite", ".sqlite3", ".db"):
+        rows = _read_sqlite(path)
+    else:
+        raise ValueError(f"Unsupported track catalog format: {extension or path}")
+
+    # 트랙마다 model_validate를 부르는 대신 목록 전체를 한 번에 검증합니다. category 같은 추가 필드는 무시됩니다.
+    return list(zip((row["category"] for row in rows), _TRACK_LIST.validate_python(rows)))
+
+
+def _read_json(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+
+    # [{..., "category": ...}] 목록과 {"카테고리": [...]} 형태를 모두 받습니다.
+    if isinstance(data, dict):
+        return [{**track, "category": category} for category, tracks in data.items() for track in tracks]
+    return data
+
+
+def _read_csv(path: str) -> List[Dict]:
+    with open(path, encoding="utf-8", newline="") as f:
+        return list(csv.DictReader(f))
+
+
+def _read_sqlite(path: str) -> List[Dict]:
+    connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        connection.row_factory = sqlite3.Row
+        columns = ", ".join(TRACK_FIELDS + ("category",))
+        return [dict(row) for row in connection.execute(f"SELECT {columns} FROM tracks ORDER BY rowid")]
+    finally:
+        connection.close()
+
+
+def _artist_key(artist: str) -> str:
+    return artist.strip().casefold()
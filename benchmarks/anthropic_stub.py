@@ -0,0 +1,163 @@
+"""Anthropic Messages API를 흉내 내는 로컬 스텁 서버.
+
+지정한 지연 시간 뒤에 고정된 메시지를 돌려주며, 오프라인 벤치마크에서
+ANTHROPIC_BASE_URL을 이 서버로 지정해 사용합니다. 요청에 "stream": true가 있으면
+첫 토큰까지 latency_seconds, 이후 토큰마다 token_interval_seconds 간격으로 SSE를 보냅니다.
+
+장애 주입: 요청의 slow_rate 비율은 slow_latency_seconds만큼 더 기다리고, error_rate 비율은 지연 뒤에
+error_status 오류 응답을 돌려줍니다. 속성은 실행 중에 바꿀 수 있어 벤치마크에서 단계별로 장애를 바꿔 씁니다.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STUB_TEXT = "오늘의 분위기에 어울리는 음악을 골라봤어요. 편하게 들어보세요."
+
+
+class AnthropicStub:
+    def __init__(
+        self,
+        latency_seconds: float = 1.0,
+        token_interval_seconds: float = 0.05,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        slow_rate: float = 0.0,
+        slow_latency_seconds: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        seed: int = 0
+    ):
+        self.latency_seconds = latency_seconds
+        self.token_interval_seconds = token_interval_seconds
+        self.slow_rate = slow_rate
+        self.slow_latency_seconds = slow_latency_seconds
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self.requests = 0
+        self.errors = 0
+        self.slow = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("content-length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                delay, fail = stub._enter()
+                try:
+                    time.sleep(delay)
+                    if fail:
+                        self._error()
+                        return
+                    if request.get("stream"):
+                        self._stream()
+                        return
+                    body = json.dumps(stub.message_body()).encode()
+                    self.send_response(200)
+                    self.send_header("content-type", "application/json")
+                    self.send_header("content-length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    stub._exit()
+
+            def _error(self):
+                body = json.dumps({"type": "error", "error": {"type": "api_error", "message": "Injected stub error"}}).encode()
+                self.send_response(stub.error_status)
+                self.send_header("content-type", "application/json")
+                self.send_header("content-length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self):
+                self.send_response(200)
+                self.send_header("content-type", "text/event-stream")
+                self.send_header("connection", "close")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    for event in stub.stream_events():
+                        if event[0] == "content_block_delta":
+                            time.sleep(stub.token_interval_seconds)
+                        self.wfile.write(f"event: {event[0]}\ndata: {json.dumps(event[1])}\n\n".encode())
+                        self.wfile.flush()
+                except (BrokenPipeError, ConnectionResetError):
+                    # 클라이언트가 예산을 넘겨 스트림을 버린 경우입니다.
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def message_body(self) -> dict:
+        return {
+            "id": "msg_stub",
+            "type": "message",
+            "role": "assistant",
+            "model": "stub",
+            "content": [{"type": "text", "text": STUB_TEXT}],
+            "stop_reason": "end_turn",
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+
+    def stream_events(self):
+        message = {**self.message_body(), "content": [], "stop_reason": None}
+        yield "message_start", {"type": "message_start", "message": message}
+        yield "content_block_start", {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}}
+        for token in STUB_TEXT.split(" "):
+            yield "content_block_delta", {
+                "type": "content_block_delta",
+                "index": 0,
+                "delta": {"type": "text_delta", "text": token + " "},
+            }
+        yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+        yield "message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+            "usage": {"output_tokens": 1},
+        }
+        yield "message_stop", {"type": "message_stop"}
+
+    def _enter(self):
+        """요청을 세고, 이번 요청의 지연 시간(초)과 오류 주입 여부를 돌려줍니다."""
+        with self._lock:
+            self.requests += 1
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+            delay = self.latency_seconds
+            if self._random.random() < self.slow_rate:
+                self.slow += 1
+                delay += self.slow_latency_seconds
+            fail = self._random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return delay, fail
+
+    def _exit(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def start(self) -> "AnthropicStub":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
@@ -0,0 +1,148 @@
+"""기존 WAV 디코딩 경로와 audio_ingest.decode_wav의 디코딩 시간과 메모리 사용량을 비교합니다.
+
+    python -m benchmarks.audio_ingest --seconds 60 --sample-rate 48000 --channels 2
+
+각 경로는 별도 프로세스에서 실행해 최대 RSS 증가량을 측정하고, tracemalloc으로
+디코딩 중 numpy 할당 최대치를 함께 기록합니다.
+"""
+import argparse
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from scipy.io import wavfile
+
+from api.service.audio_ingest import decode_wav
+
+
+def make_wav(seconds: float, sample_rate: int, channels: int, bits: int) -> bytes:
+    rng = np.random.default_rng(0)
+    audio = 0.3 * rng.standard_normal((int(seconds * sample_rate), channels))
+    buffer = io.BytesIO()
+    if bits == 16:
+        wavfile.write(buffer, sample_rate, (audio * 32767).clip(-32768, 32767).astype(np.int16))
+    elif bits == 32:
+        wavfile.write(buffer, sample_rate, (audio * 2 ** 31).clip(-2 ** 31, 2 ** 31 - 1).astype(np.int32))
+    else:
+        wavfile.write(buffer, sample_rate, audio.astype(np.float32))
+    return buffer.getvalue()
+
+
+def legacy_decode(data: bytes):
+    audio_io = io.BytesIO(data)
+    sample_rate, audio_array = wavfile.read(audio_io)
+
+    if len(audio_array.shape) > 1:
+        audio_array = np.mean(audio_array, axis=1)
+
+    audio_array = audio_array.astype(np.float32)
+    if np.max(np.abs(audio_array)) > 0:
+        audio_array = audio_array / np.max(np.abs(audio_array))
+    return sample_rate, audio_array
+
+
+def ingest_decode(data: bytes):
+    sample_rate, audio_array, _ = decode_wav(data)
+    return sample_rate, audio_array
+
+
+VARIANTS = {"legacy": legacy_decode, "ingest": ingest_decode}
+
+
+def measure(variant: str, data: bytes, repeat: int) -> dict:
+    decode = VARIANTS[variant]
+    decode(data)
+
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(data)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    decode(data)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"decode_ms": best * 1000, "traced_peak_mb": traced_peak / 2 ** 20}
+
+
+def peak_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def reset_peak_rss():
+    # Linux에서는 clear_refs에 5를 쓰면 VmHWM이 현재 RSS로 초기화되어 import 중 피크를 제외할 수 있습니다.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def child(args):
+    with open(args.input, "rb") as f:
+        data = f.read()
+    reset_peak_rss()
+    before = peak_rss_kb()
+    VARIANTS[args.variant](data)
+    rss_growth = (peak_rss_kb() - before) / 1024
+    print(json.dumps({"rss_growth_mb": rss_growth}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=60)
+    parser.add_argument("--sample-rate", type=int, default=48000)
+    parser.add_argument("--channels", type=int, default=2)
+    parser.add_argument("--bits", type=int, choices=[16, 32, -32], default=16, help="-32는 float32 WAV")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--variant", choices=list(VARIANTS))
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        child(args)
+        return
+
+    data = make_wav(args.seconds, args.sample_rate, args.channels, args.bits)
+    legacy = legacy_decode(data)[1]
+    ingest = ingest_decode(data)[1]
+    assert np.allclose(legacy, ingest, atol=1e-5)
+
+    input_file = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
+    with input_file:
+        input_file.write(data)
+
+    print(f"{args.seconds:g}s {args.channels}ch {args.sample_rate}Hz {args.bits}-bit WAV ({len(data) / 2 ** 20:.1f} MB)")
+    for variant in VARIANTS:
+        result = measure(variant, data, args.repeat)
+        child_output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.audio_ingest", "--variant", variant, "--input", input_file.name],
+            capture_output=True, text=True, check=True
+        ).stdout
+        result.update(json.loads(child_output))
+        print(
+            f"{variant:>7}: decode {result['decode_ms']:7.1f} ms  "
+            f"traced peak {result['traced_peak_mb']:6.1f} MB  "
+            f"peak RSS growth {result['rss_growth_mb']:6.1f} MB"
+        )
+    os.unlink(input_file.name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""YAMNet 추론 백엔드(tensorflow, tflite, onnx)의 지연 시간, 처리량, 메모리, 상위 클래스 일치율을 비교합니다.
+
+    python -m benchmarks.backends --backends tensorflow tflite:models/yamnet_fp16.tflite onnx:models/yamnet.onnx
+    python -m benchmarks.backends --backends tensorflow:models/yamnet tflite:models/yamnet_int8.tflite --clips-dir samples -o backends.json
+
+백엔드는 `종류[:경로]`로 지정합니다. tensorflow의 경로는 YAMNET_MODEL_HANDLE, tflite/onnx의 경로는 YAMNET_MODEL_PATH로
+쓰이며, 생략하면 환경 변수 값을 씁니다. `fake`는 실제 런타임 없이 측정 절차를 확인하기 위한 가짜 YAMNet입니다.
+
+백엔드마다 새 프로세스에서 EmotionService로 모델을 불러오므로 RSS에는 런타임과 모델이 차지하는 메모리만 들어갑니다.
+모든 백엔드가 같은 고정 클립 집합(시드로 만든 합성 클립과 --clips-dir의 WAV 파일)을 처리하고, 첫 번째 백엔드를 기준으로
+클립별 평균 점수의 top-1/top-5 클래스, 판정한 감정, 점수 차이를 비교합니다. 불러올 수 없는 백엔드는 오류를 기록하고 건너뜁니다.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.report import add_baseline_arguments, build_report, finish, latency_summary
+
+SAMPLE_RATE = 16000
+_WORKER_OPTIONS = ("clips", "seconds", "seed", "clips_dir", "repeats", "batch_size", "threads")
+
+
+def make_clips(count: int, seconds: List[float], seed: int = 0) -> List[np.ndarray]:
+    """톤, 화음, 잡음, 처프, 클릭, 진폭 변조 잡음을 돌아가며 만든 결정적 16kHz 클립 목록."""
+    rng = np.random.default_rng(seed)
+    clips = []
+    for i in range(count):
+        length = int(seconds[i % len(seconds)] * SAMPLE_RATE)
+        t = np.arange(length) / SAMPLE_RATE
+        kind = i % 6
+        if kind == 0:
+            audio = np.sin(2 * np.pi * rng.uniform(100, 4000) * t)
+        elif kind == 1:
+            audio = sum(np.sin(2 * np.pi * f * t) for f in rng.uniform(150, 1200, size=3)) / 3
+        elif kind == 2:
+            audio = np.cumsum(rng.standard_normal(length)) if rng.random() < 0.5 else rng.standard_normal(length)
+            audio = audio / (np.abs(audio).max() + 1e-9)
+        elif kind == 3:
+            start, end = rng.uniform(100, 500), rng.uniform(2000, 7000)
+            audio = np.sin(2 * np.pi * (start + (end - start) * t / (2 * t[-1])) * t)
+        elif kind == 4:
+            audio = np.zeros(length)
+            audio[rng.integers(0, length, size=int(length / SAMPLE_RATE * rng.uniform(2, 20)))] = 1.0
+        else:
+            audio = rng.standard_normal(length) * (0.5 + 0.5 * np.sin(2 * np.pi * rng.uniform(2, 8) * t))
+            audio = audio / (np.abs(audio).max() + 1e-9)
+        clips.append((rng.uniform(0.1, 0.6) * audio).astype(np.float32))
+    return clips
+
+
+def load_clips(args) -> List[np.ndarray]:
+    clips = make_clips(args.clips, args.seconds, args.seed)
+    if args.clips_dir:
+        from api.service.audio_ingest import decode_wav
+        from api.service.resampler import resample
+
+        for name in sorted(os.listdir(args.clips_dir)):
+            if name.lower().endswith(".wav"):
+                with open(os.path.join(args.clips_dir, name), "rb") as f:
+                    sample_rate, audio, _ = decode_wav(f.read())
+                clips.append(resample(audio, sample_rate, SAMPLE_RATE) if sample_rate != SAMPLE_RATE else audio)
+    return clips
+
+
+def _parse_spec(spec: str) -> Tuple[str, str]:
+    kind, _, path = spec.partition(":")
+    return kind, path
+
+
+def _status_mb(field: str) -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(field + ":"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_worker(spec: str, args) -> Dict:
+    """이 프로세스에서 백엔드 하나를 불러와 측정합니다. 부모 프로세스가 --worker로 실행합니다."""
+    from api.config.inferenceConfig import YAMNET_MODEL_HANDLE, YAMNET_MODEL_PATH
+    from api.service.emotion_service import EmotionService
+
+    kind, path = _parse_spec(spec)
+    clips = load_clips(args)
+    service = EmotionService(
+        model_handle=path if kind == "tensorflow" and path else YAMNET_MODEL_HANDLE,
+        backend=kind,
+        model_path=path or YAMNET_MODEL_PATH
+    )
+    rss_before = _status_mb("VmRSS")
+
+    started = time.perf_counter()
+    if kind == "fake":
+        from benchmarks.fake_yamnet import FakeYamnet, install_fake_yamnet
+
+        install_fake_yamnet(service, FakeYamnet(seconds_per_call=0.0, seconds_per_patch=0.0))
+    else:
+        service._ensure_model_loaded()
+    load_seconds = time.perf_counter() - started
+    # 그래프 트레이싱, 텐서 할당 같은 첫 호출 비용은 측정에서 뺍니다.
+    service.model(clips[0])
+
+    timings = []
+    mean_scores = []
+    for repeat in range(args.repeats):
+        for clip in clips:
+            started = time.perf_counter()
+            scores, _ = service.model(clip)
+            timings.append(time.perf_counter() - started)
+            if repeat == 0:
+                mean_scores.append(scores.mean(axis=0))
+
+    started = time.perf_counter()
+    for repeat in range(args.repeats):
+        for i in range(0, len(clips), args.batch_size):
+            service.analyze_waveforms(clips[i:i + args.batch_size])
+    batch_seconds = time.perf_counter() - started
+
+    return {
+        "load_ms": load_seconds * 1e3,
+        **latency_summary(timings),
+        "clips_per_sec": len(timings) / sum(timings),
+        "batch_clips_per_sec": len(clips) * args.repeats / batch_seconds,
+        "rss_mb": _status_mb("VmHWM"),
+        "model_rss_mb": _status_mb("VmHWM") - rss_before,
+        "mean_scores": np.stack(mean_scores).tolist(),
+        "emotions": [service._build_result(scores)[0] for scores in mean_scores],
+    }
+
+
+def measure(spec: str, args) -> Dict:
+    command = [sys.executable, "-m", "benchmarks.backends", "--worker", spec]
+    for option in _WORKER_OPTIONS:
+        value = getattr(args, option)
+        if value is None:
+            continue
+        flag = "--" + option.replace("_", "-")
+        command += [flag, *map(str, value)] if isinstance(value, list) else [flag, str(value)]
+    env = {**os.environ, "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"), "YAMNET_BACKEND_THREADS": str(args.threads)}
+    completed = subprocess.run(command, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def agreement(result: Dict, reference: Dict) -> Dict[str, float]:
+    scores = np.asarray(result["mean_scores"])
+    expected = np.asarray(reference["mean_scores"])
+    top5 = np.argsort(-scores, axis=1)[:, :5]
+    expected_top5 = np.argsort(-expected, axis=1)[:, :5]
+    return {
+        "top1_agreement": float(np.mean(top5[:, 0] == expected_top5[:, 0])),
+        "top5_overlap": float(np.mean([len(set(a) & set(b)) / 5 for a, b in zip(top5, expected_top5)])),
+        "emotion_agreement": float(np.mean([a == b for a, b in zip(result["emotions"], reference["emotions"])])),
+        "max_abs_score_diff": float(np.abs(scores - expected).max()),
+    }
+
+
+def run(args, log) -> Dict[str, Dict]:
+    results: Dict[str, Dict] = {}
+    reference: Optional[Dict] = None
+    for spec in args.backends:
+        kind, path = _parse_spec(spec)
+        label = f"{kind}:{os.path.basename(path.rstrip('/'))}" if path else kind
+        if label in results:
+            label = f"{label}#{sum(name.split('#')[0] == label for name in results) + 1}"
+        result = measure(spec, args)
+        if "error" in result:
+            print(f"{label:<32} skipped: {result['error']}", flush=True, file=log)
+            results[label] = result
+            continue
+
+        if reference is None:
+            reference = result
+        result.update(agreement(result, reference))
+        print(
+            f"{label:<32} load {result['load_ms']:8.1f} ms  p50 {result['p50_ms']:7.2f} ms  p99 {result['p99_ms']:7.2f} ms  "
+            f"{result['clips_per_sec']:7.1f} clips/s (batched {result['batch_clips_per_sec']:7.1f})  "
+            f"RSS {result['rss_mb']:7.1f} MB  top1 {result['top1_agreement']:.2f}  top5 {result['top5_overlap']:.2f}  "
+            f"emotion {result['emotion_agreement']:.2f}",
+            flush=True,
+            file=log
+        )
+        results[label] = result
+
+    for result in results.values():
+        result.pop("mean_scores", None)
+        result.pop("emotions", None)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.backends")
+    parser.add_argument("--backends", nargs="+", default=["tensorflow"], help="`종류[:경로]` 목록. 첫 번째가 일치율의 기준입니다")
+    parser.add_argument("--clips", type=int, default=24, help="합성 클립 수")
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 2.5, 5], help="합성 클립 길이를 돌아가며 사용")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--clips-dir", help="함께 처리할 WAV 파일 디렉터리")
+    parser.add_argument("--repeats", type=int, default=3, help="클립 집합을 반복 측정할 횟수")
+    parser.add_argument("--batch-size", type=int, default=8, help="batch_clips_per_sec를 잴 때 한 번에 묶을 클립 수")
+    parser.add_argument("--threads", type=int, default=0, help="tflite/onnx 런타임 스레드 수 (YAMNET_BACKEND_THREADS)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    add_baseline_arguments(parser, "backends")
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args)))
+        return
+
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+    results = run(args, log)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline", "worker")}
+    finish(build_report("backends", results, options), args, "backends")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""배치 크기별 YAMNet 처리량(clips/sec)을 측정하고, 배치 결과가 단독 추론과 같은지 확인합니다.
+
+    python benchmarks/batching_throughput.py --clips 64 --batch-sizes 1 2 4 8 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+from api.service.emotion_service import EmotionService, YAMNET_SAMPLE_RATE
+
+
+def make_waveforms(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    waveforms = []
+    for _ in range(count):
+        seconds = rng.uniform(1.0, 6.0)
+        waveforms.append((0.1 * rng.standard_normal(int(seconds * YAMNET_SAMPLE_RATE))).astype(np.float32))
+    return waveforms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clips", type=int, default=64)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    service = EmotionService()
+    waveforms = make_waveforms(args.clips)
+    service.analyze_waveforms(waveforms[:1])
+
+    single = [service.analyze_waveforms([w])[0] for w in waveforms[:8]]
+    batched = service.analyze_waveforms(waveforms[:8])
+    for (emotion_a, confidence_a, _), (emotion_b, confidence_b, _) in zip(single, batched):
+        assert emotion_a == emotion_b and abs(confidence_a - confidence_b) < 1e-4
+
+    for batch_size in args.batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(waveforms), batch_size):
+            service.analyze_waveforms(waveforms[i:i + batch_size])
+        elapsed = time.perf_counter() - start
+        print(f"batch_size={batch_size:>3}: {len(waveforms) / elapsed:8.1f} clips/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""앱의 import 시간 예산과 프로세스 시작부터 첫 응답까지의 시간을 측정합니다.
+
+    python -m benchmarks.cold_start -o cold_start.json
+    python -m benchmarks.cold_start --import-budget-ms 800 --runs 10 --baseline
+
+import: 새 인터프리터에서 `python -X importtime -c "import main"`을 실행해 전체 시간과 최상위 패키지별
+시간을 기록합니다. 전체 시간이 --import-budget-ms를 넘거나 HEAVY_MODULES 중 하나라도 import 시점에
+불러오면 종료 코드 1로 끝납니다 (무거운 모듈은 첫 사용 시점이나 lifespan 이후 백그라운드에서 불러와야 합니다).
+
+first_response: 라우트마다 `uvicorn main:app`을 새로 띄우고, 프로세스를 만든 순간부터 그 라우트가 처음 200을
+돌려줄 때까지의 시간을 잽니다. 모두 추론이 필요 없는 라우트이므로 모델 워밍업을 기다리지 않아야 합니다.
+"""
+import argparse
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.report import add_baseline_arguments, build_report, finish, latency_summary
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ROUTES = ("/", "/api/emotions", "/api/tracks", "/api/recommendation/stats")
+# `import main`만으로 불러오면 안 되는 모듈
+HEAVY_MODULES = (
+    "tensorflow", "tensorflow_hub", "ai_edge_litert", "tflite_runtime", "onnxruntime",
+    "anthropic", "resampy", "scipy.signal", "scipy.fft",
+)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def _env() -> Dict[str, str]:
+    return {**os.environ, "LOG_LEVEL": "WARNING", "PYTHONDONTWRITEBYTECODE": "1"}
+
+
+def measure_import() -> Tuple[float, Dict[str, float], List[str]]:
+    """`import main`의 전체 시간(초), 최상위 패키지별 자체 시간 합(초), 불러온 무거운 모듈 목록을 돌려줍니다."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    )
+    total = 0.0
+    packages: Dict[str, float] = {}
+    loaded = set()
+    for line in completed.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        loaded.add(name)
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0.0) + int(self_us) / 1e6
+        if name == "main" and not indent:
+            total = int(cumulative_us) / 1e6
+    heavy = [module for module in HEAVY_MODULES if module in loaded]
+    return total, packages, heavy
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def measure_first_response(route: str, timeout: float) -> Tuple[float, float]:
+    """새 서버 프로세스를 띄워 route가 처음 200을 돌려줄 때까지의 시간(초)과 그 시점의 RSS(MB)를 돌려줍니다."""
+    port = _free_port()
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=timeout) as client:
+            while time.perf_counter() - started < timeout:
+                if process.poll() is not None:
+                    raise RuntimeError(f"Server exited with code {process.returncode} before serving {route}")
+                try:
+                    if client.get(route).status_code == 200:
+                        elapsed = time.perf_counter() - started
+                        rss = _rss_mb(process.pid) if sys.platform.startswith("linux") else 0.0
+                        return elapsed, rss
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.005)
+        raise RuntimeError(f"{route} did not respond within {timeout:.0f}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def run(args, log) -> Tuple[Dict[str, Dict], List[str]]:
+    results: Dict[str, Dict] = {}
+    import_times = []
+    package_times: Dict[str, List[float]] = {}
+    heavy = set()
+    for _ in range(args.runs):
+        total, packages, loaded_heavy = measure_import()
+        import_times.append(total)
+        heavy.update(loaded_heavy)
+        for package, seconds in packages.items():
+            package_times.setdefault(package, []).append(seconds)
+
+    results["import/main"] = {**latency_summary(import_times), "heavy_modules": sorted(heavy)}
+    top_packages = sorted(package_times, key=lambda package: -sum(package_times[package]))[:args.top_packages]
+    for package in top_packages:
+        results[f"import_package/{package}"] = latency_summary(package_times[package])
+    print(f"import main: p50 {results['import/main']['p50_ms']:.1f} ms (budget {args.import_budget_ms:.0f} ms)", file=log)
+    for package in top_packages:
+        print(f"  {package:<24} p50 {results[f'import_package/{package}']['p50_ms']:8.1f} ms", file=log)
+
+    for route in args.routes:
+        timings, rss = [], []
+        for _ in range(args.runs):
+            elapsed, memory = measure_first_response(route, args.timeout)
+            timings.append(elapsed)
+            rss.append(memory)
+        results[f"first_response{route}"] = {**latency_summary(timings), "rss_mb": max(rss)}
+        result = results[f"first_response{route}"]
+        print(f"first response {route:<28} p50 {result['p50_ms']:8.1f} ms  rss {result['rss_mb']:6.1f} MB", flush=True, file=log)
+
+    violations = []
+    if results["import/main"]["p50_ms"] > args.import_budget_ms:
+        violations.append(f"import main took {results['import/main']['p50_ms']:.1f} ms, budget is {args.import_budget_ms:.0f} ms")
+    if heavy:
+        violations.append(f"import main loaded heavy modules: {', '.join(sorted(heavy))}")
+    return results, violations
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start")
+    parser.add_argument("--runs", type=int, default=5, help="항목마다 새 프로세스로 반복할 횟수")
+    parser.add_argument("--routes", nargs="+", default=list(ROUTES))
+    parser.add_argument("--import-budget-ms", type=float, default=1000, help="`import main` 시간 예산(p50)")
+    parser.add_argument("--top-packages", type=int, default=8, help="보고서에 따로 기록할 import 시간 상위 패키지 수")
+    parser.add_argument("--timeout", type=float, default=60, help="서버 하나가 첫 응답을 보낼 때까지 기다릴 최대 시간(초)")
+    add_baseline_arguments(parser, "cold_start")
+    args = parser.parse_args()
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+
+    results, violations = run(args, log)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline")}
+    finish(build_report("cold_start", results, options), args, "cold_start")
+    if violations:
+        for violation in violations:
+            print(violation, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
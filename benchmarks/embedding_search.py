@@ -0,0 +1,85 @@
+"""임베딩 인덱스의 검색 지연 시간과 정확도(전체 비교 대비 recall@k)를 측정합니다.
+
+    python -m benchmarks.embedding_search --tracks 100000 --nprobe 8 16 32
+
+실제 YAMNet 임베딩처럼 군집 구조가 있도록, 무작위 중심 주변에 잡음을 더한 합성 임베딩을 사용합니다.
+인덱스는 임시 디렉터리에 만든 뒤 서버와 같이 메모리 매핑으로 다시 엽니다.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from api.service.embedding_index import EMBEDDING_DIM, EmbeddingIndex, build_index
+
+
+def make_embeddings(count: int, clusters: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, EMBEDDING_DIM)).astype(np.float32)
+    labels = rng.integers(clusters, size=count)
+    # YAMNet 임베딩은 ReLU 출력이라 음수가 없으므로 절댓값을 씁니다.
+    return np.abs(centers[labels] + 0.6 * rng.standard_normal((count, EMBEDDING_DIM)).astype(np.float32))
+
+
+def percentile_us(samples, q: float) -> float:
+    return float(np.percentile(samples, q) * 1e6)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=100000)
+    parser.add_argument("--clusters", type=int, default=2000, help="합성 데이터의 군집 수")
+    parser.add_argument("--nlist", type=int, help="인덱스 클러스터 수 (기본값: 자동)")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[8, 16, 32])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    embeddings = make_embeddings(args.tracks, args.clusters)
+    ids = [f"track_{i}" for i in range(args.tracks)]
+    queries = make_embeddings(args.queries, args.clusters, seed=0)[::-1] + np.abs(
+        np.random.default_rng(1).standard_normal((args.queries, EMBEDDING_DIM)).astype(np.float32) * 0.3
+    )
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        build_index(ids, embeddings, directory, nlist=args.nlist)
+        build_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        index = EmbeddingIndex.load(directory)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        exact_vectors = np.asarray(index.vectors)
+        print(f"{args.tracks} tracks, nlist={len(index.centroids)}, build {build_seconds:.1f}s, mmap load {load_ms:.1f} ms")
+
+        truth = []
+        timings = []
+        for query in queries:
+            start = time.perf_counter()
+            scores = exact_vectors @ (query / np.linalg.norm(query))
+            truth.append({index.ids[i] for i in np.argpartition(-scores, args.k - 1)[:args.k]})
+            timings.append(time.perf_counter() - start)
+        print(f"  brute force: p50 {percentile_us(timings, 50):8.1f} us  p99 {percentile_us(timings, 99):8.1f} us")
+
+        for nprobe in args.nprobe:
+            index.nprobe = min(nprobe, len(index.centroids))
+            for query in queries[:20]:
+                index.search(query, args.k)
+
+            timings = []
+            hits = 0
+            for query, expected in zip(queries, truth):
+                start = time.perf_counter()
+                found = index.search(query, args.k)
+                timings.append(time.perf_counter() - start)
+                hits += len(expected & {match['id'] for match in found})
+            print(
+                f"  nprobe={nprobe:<4}: p50 {percentile_us(timings, 50):8.1f} us  p99 {percentile_us(timings, 99):8.1f} us  "
+                f"recall@{args.k} {hits / (len(queries) * args.k):.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
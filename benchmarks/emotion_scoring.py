@@ -0,0 +1,80 @@
+"""기존 텐서 인덱스 루프 방식과 행렬곱 방식의 감정 점수 계산을 비교합니다.
+
+    python benchmarks/emotion_scoring.py --iterations 2000
+"""
+import argparse
+import time
+
+import numpy as np
+import tensorflow as tf
+
+from api.service.emotion_service import EmotionService
+
+NUM_CLASSES = 521
+
+
+def legacy_scores(service: EmotionService, class_scores):
+    top_class_indices = tf.argsort(class_scores, direction='DESCENDING')[:10]
+    emotion_scores = {emotion: 0.0 for emotion in service.emotions}
+
+    for idx in top_class_indices:
+        class_name = service.class_names[idx.numpy()]
+        score = float(class_scores[idx].numpy())
+        if class_name in service.emotion_mapping:
+            emotion_scores[service.emotion_mapping[class_name]] += score
+
+    total = sum(emotion_scores.values())
+    if total > 0:
+        emotion_scores = {k: v / total for k, v in emotion_scores.items()}
+
+    top_classes = [
+        {'name': service.class_names[i.numpy()], 'score': float(class_scores[i].numpy())}
+        for i in top_class_indices[:5]
+    ]
+    return emotion_scores, top_classes
+
+
+def vectorized_scores(service: EmotionService, class_scores: np.ndarray):
+    _, _, details = service._build_result(class_scores)
+    return details['all_emotion_scores'], details['top_classes']
+
+
+def make_service(seed: int = 0) -> EmotionService:
+    service = EmotionService()
+    names = list(service.emotion_mapping)
+    names += [f"class_{i}" for i in range(NUM_CLASSES - len(names))]
+    np.random.default_rng(seed).shuffle(names)
+    service.class_names = names
+    service.emotion_matrix = service._compile_emotion_matrix()
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    service = make_service()
+    rng = np.random.default_rng(1)
+    samples = [rng.random(NUM_CLASSES, dtype=np.float32) ** 4 for _ in range(64)]
+    tensors = [tf.constant(sample) for sample in samples]
+
+    for sample, tensor in zip(samples, tensors):
+        legacy, legacy_top = legacy_scores(service, tensor)
+        vectorized, vectorized_top = vectorized_scores(service, sample)
+        assert all(abs(legacy[k] - vectorized[k]) < 1e-5 for k in legacy)
+        assert [c['name'] for c in legacy_top] == [c['name'] for c in vectorized_top]
+
+    for name, fn, inputs in (
+        ("legacy", legacy_scores, tensors),
+        ("vectorized", vectorized_scores, samples),
+    ):
+        start = time.perf_counter()
+        for i in range(args.iterations):
+            fn(service, inputs[i % len(inputs)])
+        elapsed = time.perf_counter() - start
+        print(f"{name:>10}: {elapsed / args.iterations * 1e6:8.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
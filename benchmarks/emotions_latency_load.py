@@ -0,0 +1,100 @@
+"""/analyze-emotion 추론이 포화된 상태에서 /emotions 지연 시간을 측정합니다.
+
+서버를 먼저 실행한 뒤 사용합니다:
+
+    uvicorn main:app --port 8000
+    python benchmarks/emotions_latency_load.py --url http://localhost:8000 --concurrency 16
+
+분석 결과 캐시에 걸리면 추론이 포화되지 않으므로, 요청마다 PCM 끝 샘플 두 개에 일련번호를 써 넣어 서로 다른 클립을 보냅니다.
+"""
+import argparse
+import asyncio
+import base64
+import io
+import itertools
+import statistics
+import struct
+import time
+
+import httpx
+import numpy as np
+from scipy.io import wavfile
+
+
+def make_clip(seconds: float, sample_rate: int = 44100) -> bytes:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    audio = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(t.shape)
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, (audio * 32767).astype(np.int16))
+    return buffer.getvalue()
+
+
+def unique_payloads(wav: bytes):
+    """같은 클립에서 마지막 4바이트(int16 샘플 두 개)만 바꾼 요청 본문을 끝없이 만듭니다."""
+    clip = bytearray(wav)
+    for n in itertools.count():
+        struct.pack_into("<I", clip, len(clip) - 4, n)
+        yield {"audioData": base64.b64encode(clip).decode()}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def probe_emotions(client: httpx.AsyncClient, duration: float, interval: float = 0.05):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/emotions")
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def saturate(client: httpx.AsyncClient, payloads, stop: asyncio.Event):
+    while not stop.is_set():
+        await client.post("/api/analyze-emotion", json=next(payloads), timeout=120)
+
+
+def summarize(name: str, latencies):
+    print(
+        f"{name:>10}: n={len(latencies)} "
+        f"p50={statistics.median(latencies):.1f}ms "
+        f"p99={percentile(latencies, 99):.1f}ms "
+        f"max={max(latencies):.1f}ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    payloads = unique_payloads(make_clip(args.clip_seconds))
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=30) as client:
+        idle = await probe_emotions(client, args.duration)
+
+        stop = asyncio.Event()
+        workers = [asyncio.create_task(saturate(client, payloads, stop)) for _ in range(args.concurrency)]
+        await asyncio.sleep(1.0)
+        loaded = await probe_emotions(client, args.duration)
+        stats = (await client.get("/api/inference/stats")).json()
+        stop.set()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    summarize("idle", idle)
+    summarize("saturated", loaded)
+    print(f"inference stats under load: {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,66 @@
+"""오프라인 벤치마크용 결정적 가짜 YAMNet.
+
+실제 모델과 같은 패치 격자(0.96초 패치, 0.48초 간격)로 파형을 나누고, 패치마다 구간별
+에너지를 고정된 난수 행렬로 사영해 521개 클래스 점수와 1024차원 임베딩을 만듭니다.
+같은 입력에는 항상 같은 출력을 내며, 패치 수에 비례하는 지연 시간을 흉내 낼 수 있습니다.
+TensorFlow처럼 호출 중에는 GIL을 놓고 기다리므로 워커 풀과 배칭의 동작도 실제와 비슷합니다.
+"""
+import time
+from typing import List
+
+import numpy as np
+
+from api.service.emotion_service import YAMNET_MIN_SAMPLES, YAMNET_PATCH_HOP_SAMPLES, count_patches
+
+NUM_CLASSES = 521
+EMBEDDING_DIM = 1024
+_BANDS = 16
+
+
+class FakeYamnet:
+    """InferenceBackend와 같이 파형을 받아 패치별 (점수, 임베딩) numpy 배열을 돌려줍니다."""
+
+    name = "fake"
+
+    def __init__(self, seconds_per_call: float = 0.002, seconds_per_patch: float = 0.0005, seed: int = 0):
+        self.seconds_per_call = seconds_per_call
+        self.seconds_per_patch = seconds_per_patch
+        rng = np.random.default_rng(seed)
+        self._class_projection = rng.standard_normal((_BANDS, NUM_CLASSES)).astype(np.float32)
+        self._embedding_projection = rng.standard_normal((_BANDS, EMBEDDING_DIM)).astype(np.float32)
+        self.calls = 0
+
+    def __call__(self, waveform: np.ndarray):
+        waveform = np.asarray(waveform, dtype=np.float32)
+        num_patches = count_patches(len(waveform))
+        padded = np.zeros(YAMNET_MIN_SAMPLES + (num_patches - 1) * YAMNET_PATCH_HOP_SAMPLES, dtype=np.float32)
+        padded[:len(waveform)] = waveform[:len(padded)]
+
+        starts = np.arange(num_patches) * YAMNET_PATCH_HOP_SAMPLES
+        band_length = YAMNET_MIN_SAMPLES // _BANDS
+        patches = padded[starts[:, None] + np.arange(band_length * _BANDS)].reshape(num_patches, _BANDS, band_length)
+        features = np.log1p(np.abs(patches).mean(axis=-1) * 100)
+
+        scores = 1 / (1 + np.exp(-(features @ self._class_projection - 4)))
+        embeddings = np.maximum(features @ self._embedding_projection, 0)
+
+        self.calls += 1
+        delay = self.seconds_per_call + self.seconds_per_patch * num_patches
+        if delay > 0:
+            time.sleep(delay)
+        return scores.astype(np.float32), embeddings.astype(np.float32)
+
+
+def class_names(emotion_mapping) -> List[str]:
+    names = list(emotion_mapping)
+    return names + [f"Class {i}" for i in range(NUM_CLASSES - len(names))]
+
+
+def install_fake_yamnet(service, model: FakeYamnet = None) -> FakeYamnet:
+    """EmotionService가 TF Hub 대신 가짜 모델을 쓰도록 모델, 클래스 이름, 감정 행렬을 채웁니다."""
+    model = model or FakeYamnet()
+    service.model = model
+    service.class_names = class_names(service.emotion_mapping)
+    service.emotion_matrix = service._compile_emotion_matrix()
+    service.is_ready = True
+    return model
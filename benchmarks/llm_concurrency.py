@@ -0,0 +1,68 @@
+"""로컬 스텁 서버를 상대로 여러 Claude 호출이 대기 시간을 겹쳐 처리하는지 확인합니다.
+
+    python -m benchmarks.llm_concurrency --requests 32 --latency 1.0 --max-concurrency 8
+
+스텁이 동시에 받은 요청 수가 ANTHROPIC_MAX_CONCURRENCY를 넘거나, 한도가 1보다 큰데 호출이 겹치지 않으면 실패합니다.
+요청마다 감지된 소리를 바꿔 메시지 캐시에 걸리지 않게 합니다.
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from benchmarks.anthropic_stub import AnthropicStub, STUB_TEXT
+
+
+async def run(requests: int):
+    from api.service.music_service import MusicService
+
+    service = MusicService()
+    try:
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            service.get_recommendations_by_emotion_with_claude('happy', {'top_classes': [{'name': f"Sound {i}", 'score': 0.9}]})
+            for i in range(requests)
+        ])
+        elapsed = time.perf_counter() - start
+    finally:
+        await service.aclose()
+
+    if not all(r['recommendation_message'] == STUB_TEXT for r in results):
+        raise AssertionError("some calls fell back to the default message")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_concurrency")
+    parser.add_argument("--requests", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="ANTHROPIC_MAX_CONCURRENCY")
+    args = parser.parse_args()
+
+    stub = AnthropicStub(latency_seconds=args.latency).start()
+    # 설정 모듈은 import 시점에 환경 변수를 읽으므로 MusicService를 불러오기 전에 지정합니다.
+    # 한도에 막혀 기다린 호출이 기본 메시지로 대신되지 않도록 지연 예산은 끕니다.
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": stub.base_url,
+        "ANTHROPIC_API_KEY": "stub-key",
+        "ANTHROPIC_MAX_CONCURRENCY": str(args.max_concurrency),
+        "ANTHROPIC_LATENCY_BUDGET_MS": "0",
+    })
+    try:
+        elapsed = asyncio.run(run(args.requests))
+    finally:
+        stub.stop()
+
+    print(f"{args.requests} calls x {args.latency:.2f}s stub latency, max concurrency {args.max_concurrency}")
+    print(f"  wall time:          {elapsed:.2f}s (serial would be {args.requests * args.latency:.2f}s)")
+    print(f"  max in-flight seen: {stub.max_in_flight}")
+
+    limit = max(1, args.max_concurrency)
+    if stub.max_in_flight > limit:
+        raise AssertionError(f"{stub.max_in_flight} calls in flight, limit is {limit}")
+    if stub.max_in_flight < min(limit, args.requests):
+        raise AssertionError(f"only {stub.max_in_flight} calls overlapped, expected {min(limit, args.requests)}")
+
+
+if __name__ == "__main__":
+    main()
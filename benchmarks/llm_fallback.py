@@ -0,0 +1,183 @@
+"""장애를 주입한 로컬 스텁을 상대로 추천 메시지의 지연 예산과 회로 차단기가 어떻게 동작하는지 측정합니다.
+
+    python -m benchmarks.llm_fallback
+    python -m benchmarks.llm_fallback --budget-ms 0 --failure-threshold 0    # 예산과 차단기 없이 비교
+    python -m benchmarks.llm_fallback --requests 40 --concurrency 8 -o llm_fallback.json
+
+MusicService.get_recommendations_by_emotion_with_claude를 단계별로 호출합니다.
+healthy(정상) → slow(모든 호출이 예산을 넘김) → errors(모든 호출이 오류) → recovery(정상). 앞 단계에서 회로가
+열렸다면 쿨다운이 지난 뒤 다음 단계를 시작합니다.
+단계마다 응답 지연, 기본 메시지로 대신한 비율과 이유, 스텁이 실제로 받은 호출 수, 단계가 끝났을 때의 회로 상태를
+기록합니다. 회로가 열리면 slow/errors 단계의 나머지 요청은 스텁을 부르지 않고 바로 응답해야 합니다.
+요청마다 감지된 소리를 바꿔 메시지 캐시에 걸리지 않게 합니다.
+
+차단기가 켜져 있으면(--failure-threshold > 0) 보고서를 쓴 뒤 다음을 확인하고, 어긋나면 실패합니다.
+장애 단계에서 회로가 열리고, 열린 뒤에는 스텁을 부르지 않고 모두 기본 메시지로 응답하며,
+recovery 단계에서 시험 호출이 성공해 회로가 다시 닫힙니다. slow 단계는 지연 예산이 slow 지연보다 짧을 때만 확인합니다.
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.anthropic_stub import AnthropicStub, STUB_TEXT
+from benchmarks.report import add_baseline_arguments, build_report, finish, latency_summary
+
+PHASES = ("healthy", "slow", "errors", "recovery")
+
+
+def configure_stub(stub: AnthropicStub, phase: str, args):
+    stub.slow_rate = 1.0 if phase == "slow" else 0.0
+    stub.slow_latency_seconds = args.slow_latency
+    stub.error_rate = 1.0 if phase == "errors" else 0.0
+
+
+async def run_phase(service, phase: str, stub: AnthropicStub, args, counter) -> Dict:
+    configure_stub(stub, phase, args)
+    before = service.llm_stats()
+    stub_requests = stub.requests
+    timings = []
+    fallbacks = 0
+
+    async def one():
+        nonlocal fallbacks
+        details = {'top_classes': [{'name': f"Sound {next(counter)}", 'score': 0.9}]}
+        started = time.perf_counter()
+        result = await service.get_recommendations_by_emotion_with_claude('happy', details)
+        timings.append(time.perf_counter() - started)
+        fallbacks += result['recommendation_message'] != STUB_TEXT
+
+    for start in range(0, args.requests, args.concurrency):
+        await asyncio.gather(*[one() for _ in range(min(args.concurrency, args.requests - start))])
+
+    after = service.llm_stats()
+    return {
+        **latency_summary(timings),
+        "fallback_rate": fallbacks / len(timings),
+        **{
+            f"fallbacks_{reason}": count - before['fallbacks'][reason]
+            for reason, count in after['fallbacks'].items()
+        },
+        "stub_calls": stub.requests - stub_requests,
+        "breaker_opened": after['breaker']['opened'] - before['breaker']['opened'],
+        "breaker_state": after['breaker']['state'],
+    }
+
+
+async def run(stub: AnthropicStub, args, log) -> Dict[str, Dict]:
+    from api.service.music_service import MusicService
+
+    service = MusicService()
+    counter = itertools.count()
+    results = {}
+    try:
+        # 앱처럼 SDK를 미리 불러오고 커넥션을 맺어 두어 첫 호출이 예산을 넘기지 않게 합니다.
+        await asyncio.to_thread(service.preload_client)
+        await service._create_message("warmup")
+        for phase in PHASES:
+            if service.breaker.state == "open":
+                # 단계마다 쿨다운을 기다려 시험 호출(half_open)부터 시작합니다.
+                await asyncio.sleep(service.breaker.stats()['cooldown_remaining_seconds'] + 0.05)
+            result = await run_phase(service, phase, stub, args, counter)
+            results[phase] = result
+            print(
+                f"{phase:<10} p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                f"fallback {result['fallback_rate']:5.0%} (budget {result['fallbacks_budget']}, "
+                f"error {result['fallbacks_error']}, circuit_open {result['fallbacks_circuit_open']})  "
+                f"stub calls {result['stub_calls']:3d}  breaker {result['breaker_state']}",
+                flush=True,
+                file=log
+            )
+        results["totals"] = {
+            key: value for key, value in service.llm_stats().items()
+            if key in ("requests", "fallback_rate", "late_completions")
+        }
+    finally:
+        await service.aclose()
+    return results
+
+
+def check(results: Dict[str, Dict], args) -> List[str]:
+    """차단기 동작이 기대와 다르면 그 내용을 돌려줍니다."""
+    problems = []
+    calls_per_request = args.max_retries + 1
+    if args.failure_threshold <= 0:
+        for phase in PHASES:
+            if results[phase]["breaker_opened"] or results[phase]["fallbacks_circuit_open"]:
+                problems.append(f"{phase}: breaker is disabled but the circuit opened")
+        return problems
+
+    healthy = results["healthy"]
+    if healthy["breaker_opened"] or healthy["breaker_state"] != "closed":
+        problems.append(f"healthy: circuit {healthy['breaker_state']} with a healthy stub")
+
+    fault_phases = ["errors"]
+    if 0 < args.budget_ms < args.slow_latency * 1000:
+        fault_phases.insert(0, "slow")
+    for phase in fault_phases:
+        result = results[phase]
+        # 닫힌 동안에는 실패가 failure_threshold번 기록되기 전에 이미 보낸 동시 요청까지만 스텁에 닿습니다.
+        max_calls = (args.failure_threshold + args.concurrency - 1) * calls_per_request
+        if result["breaker_opened"] < 1 or result["breaker_state"] != "open":
+            problems.append(f"{phase}: circuit did not open (state {result['breaker_state']})")
+        if result["fallback_rate"] != 1.0:
+            problems.append(f"{phase}: fallback rate {result['fallback_rate']:.0%}, expected 100%")
+        if result["fallbacks_circuit_open"] < 1:
+            problems.append(f"{phase}: no requests were answered by the open circuit")
+        if result["stub_calls"] > max_calls:
+            problems.append(f"{phase}: stub received {result['stub_calls']} calls, expected at most {max_calls}")
+
+    recovery = results["recovery"]
+    if recovery["breaker_state"] != "closed":
+        problems.append(f"recovery: circuit is {recovery['breaker_state']} after the half-open probe")
+    if recovery["fallbacks_error"] or recovery["fallbacks_budget"]:
+        problems.append("recovery: calls failed after the stub recovered")
+    # 시험 호출과 같은 묶음으로 보낸 나머지 요청만 열린 회로의 기본 메시지를 받을 수 있습니다.
+    if recovery["fallbacks_circuit_open"] > args.concurrency - 1:
+        problems.append(f"recovery: {recovery['fallbacks_circuit_open']} requests short-circuited after the probe")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.llm_fallback")
+    parser.add_argument("--requests", type=int, default=24, help="단계마다 보낼 요청 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 보낼 요청 수")
+    parser.add_argument("--latency", type=float, default=0.1, help="정상 상태의 스텁 응답 지연(초)")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="slow 단계에서 더할 지연(초)")
+    parser.add_argument("--budget-ms", type=float, default=300, help="ANTHROPIC_LATENCY_BUDGET_MS")
+    parser.add_argument("--failure-threshold", type=int, default=3, help="ANTHROPIC_BREAKER_FAILURE_THRESHOLD")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="ANTHROPIC_BREAKER_COOLDOWN_SECONDS")
+    parser.add_argument("--max-retries", type=int, default=0, help="ANTHROPIC_MAX_RETRIES")
+    add_baseline_arguments(parser, "llm_fallback")
+    args = parser.parse_args()
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+
+    stub = AnthropicStub(latency_seconds=args.latency).start()
+    # 설정 모듈은 import 시점에 환경 변수를 읽으므로 MusicService를 불러오기 전에 지정합니다.
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": stub.base_url,
+        "ANTHROPIC_API_KEY": "stub-key",
+        "ANTHROPIC_LATENCY_BUDGET_MS": str(args.budget_ms),
+        "ANTHROPIC_BREAKER_FAILURE_THRESHOLD": str(args.failure_threshold),
+        "ANTHROPIC_BREAKER_COOLDOWN_SECONDS": str(args.cooldown),
+        "ANTHROPIC_MAX_RETRIES": str(args.max_retries),
+    })
+    try:
+        results = asyncio.run(run(stub, args, log))
+    finally:
+        stub.stop()
+
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline")}
+    problems = check(results, args)
+    for problem in problems:
+        print(f"FAIL {problem}", file=log)
+    finish(build_report("llm_fallback", results, options), args, "llm_fallback")
+    if problems:
+        raise AssertionError("; ".join(problems))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+"""FastAPI 앱 전체를 오프라인으로 띄워 부하를 걸고 처리량과 지연 시간 백분위수를 JSON으로 보고합니다.
+
+    python -m benchmarks.load --concurrency 8 --requests 200 -o load.json
+    python -m benchmarks.load --scenarios analyze_emotion stream --baseline
+
+앱은 같은 프로세스의 uvicorn 스레드에서 실행되며, YAMNet은 benchmarks.fake_yamnet의 결정적 가짜 모델로,
+Claude API는 benchmarks.anthropic_stub의 로컬 스텁 서버로 바꿉니다. 추론은 가짜 모델을 공유할 수 있도록
+thread 실행기를 쓰고, 같은 클립이 반복되어도 매번 전체 경로를 거치도록 캐시는 기본적으로 끕니다.
+
+시나리오마다 concurrency개의 클라이언트가 응답을 받는 즉시 다음 요청을 보내는 닫힌 루프로 동작합니다.
+stream 시나리오는 첫 SSE 이벤트(감정 분석 결과)까지의 시간도 따로 기록합니다.
+"""
+import argparse
+import asyncio
+import base64
+import io
+import itertools
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from scipy.io import wavfile
+
+from benchmarks.anthropic_stub import AnthropicStub
+from benchmarks.report import add_baseline_arguments, build_report, finish, latency_summary
+
+SCENARIOS = ("analyze_emotion", "upload", "batch", "stream", "sound", "emotions", "tracks")
+
+
+def make_wavs(rates: List[int], seconds: List[float], seed: int = 0) -> List[bytes]:
+    rng = np.random.default_rng(seed)
+    wavs = []
+    for sample_rate, length in itertools.product(rates, seconds):
+        t = np.arange(int(length * sample_rate)) / sample_rate
+        tone = rng.uniform(100, 2000)
+        audio = 0.3 * np.sin(2 * np.pi * tone * t) + 0.05 * rng.standard_normal(len(t))
+        buffer = io.BytesIO()
+        wavfile.write(buffer, sample_rate, (audio * 32767).astype(np.int16))
+        wavs.append(buffer.getvalue())
+    return wavs
+
+
+class Scenario:
+    def __init__(self, name: str, wavs: List[bytes], batch_size: int):
+        self.name = name
+        self.wavs = wavs
+        self.encoded = [base64.b64encode(wav).decode() for wav in wavs]
+        self.batch_size = batch_size
+        self._counter = itertools.count()
+
+    async def send(self, client: httpx.AsyncClient) -> Optional[float]:
+        """요청 하나를 보내고, stream 시나리오면 첫 이벤트까지 걸린 시간을 돌려줍니다."""
+        i = next(self._counter)
+        clip = self.encoded[i % len(self.encoded)]
+
+        if self.name == "analyze_emotion":
+            response = await client.post("/api/analyze-emotion", json={"audioData": clip})
+        elif self.name == "upload":
+            wav = self.wavs[i % len(self.wavs)]
+            response = await client.post("/api/analyze-emotion/upload", content=wav, headers={"content-type": "audio/wav"})
+        elif self.name == "batch":
+            clips = [{"audioData": self.encoded[(i + j) % len(self.encoded)]} for j in range(self.batch_size)]
+            response = await client.post("/api/analyze-emotion/batch", json={"clips": clips})
+        elif self.name == "sound":
+            response = await client.post("/api/analyze-sound", json={"audioData": clip})
+        elif self.name == "emotions":
+            response = await client.get("/api/emotions")
+        elif self.name == "tracks":
+            response = await client.get("/api/tracks", params={"limit": 50})
+        elif self.name == "stream":
+            return await self._stream(client, clip)
+        else:
+            raise ValueError(f"Unknown scenario: {self.name}")
+
+        response.raise_for_status()
+        return None
+
+    async def _stream(self, client: httpx.AsyncClient, clip: str) -> float:
+        started = time.perf_counter()
+        first_event = None
+        async with client.stream("POST", "/api/analyze-emotion/stream", json={"audioData": clip}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if first_event is None and line.startswith("event: analysis"):
+                    first_event = time.perf_counter() - started
+        return first_event if first_event is not None else time.perf_counter() - started
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, warmup: int) -> Dict:
+    for _ in range(warmup):
+        await scenario.send(client)
+
+    latencies: List[float] = []
+    first_events: List[float] = []
+    errors = 0
+    remaining = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while next(remaining) < requests:
+            started = time.perf_counter()
+            try:
+                first_event = await scenario.send(client)
+            except httpx.HTTPError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            if first_event is not None:
+                first_events.append(first_event)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "requests": requests,
+        "errors": errors,
+        "error_rate": errors / requests,
+        "requests_per_sec": len(latencies) / elapsed,
+    }
+    if latencies:
+        result.update(latency_summary(latencies))
+    if first_events:
+        result.update({f"first_event_{key}": value for key, value in latency_summary(first_events).items()})
+    return result
+
+
+def start_server(app) -> Tuple[object, threading.Thread, str]:
+    import uvicorn
+
+    # proto를 IPPROTO_TCP로 지정해야 asyncio가 받은 연결에 TCP_NODELAY를 켭니다.
+    # 0으로 두면 응답마다 Nagle과 지연 ACK 때문에 40ms 정도씩 멈춰, 가벼운 라우트의 지연을 잴 수 없습니다.
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", access_log=False))
+    thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Benchmark server failed to start")
+        time.sleep(0.01)
+    host, port = sock.getsockname()
+    return server, thread, f"http://{host}:{port}"
+
+
+async def drive(base_url: str, args, log) -> Dict[str, Dict]:
+    wavs = make_wavs(args.rates, args.seconds)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    results = {}
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        for name in args.scenarios:
+            scenario = Scenario(name, wavs, args.batch_size)
+            before = (await client.get("/api/inference/stats")).json()["batching"]
+            result = await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+            after = (await client.get("/api/inference/stats")).json()["batching"]
+            # 마이크로 배처가 이 시나리오 동안 한 번의 YAMNet 호출로 묶은 평균 클립 수
+            batches = after["batches"] - before["batches"]
+            result["average_batch_size"] = (after["clips"] - before["clips"]) / batches if batches else 0.0
+            results[name] = result
+            print(
+                f"{name:<16} {result['requests_per_sec']:8.1f} req/s  "
+                f"p50 {result.get('p50_ms', 0):8.1f} ms  p99 {result.get('p99_ms', 0):8.1f} ms  errors {result['errors']}",
+                flush=True,
+                file=log
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=200, help="시나리오마다 보낼 요청 수")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=8, help="batch 시나리오의 요청당 클립 수")
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 22050, 44100, 48000])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--model-ms-per-call", type=float, default=2.0, help="가짜 YAMNet 호출당 고정 지연")
+    parser.add_argument("--model-ms-per-patch", type=float, default=0.5, help="가짜 YAMNet 패치당 지연")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Claude 스텁의 첫 응답까지 지연(초)")
+    parser.add_argument("--llm-token-interval", type=float, default=0.01, help="Claude 스텁 스트리밍 토큰 간격(초)")
+    parser.add_argument("--cache", action="store_true", help="분석 결과·추천 메시지 캐시를 켠 상태로 측정")
+    add_baseline_arguments(parser, "load")
+    args = parser.parse_args()
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+
+    stub = AnthropicStub(latency_seconds=args.llm_latency, token_interval_seconds=args.llm_token_interval).start()
+    # 설정 모듈은 import 시점에 환경 변수를 읽으므로 앱을 불러오기 전에 지정합니다.
+    os.environ.update({
+        "ANTHROPIC_BASE_URL": stub.base_url,
+        "ANTHROPIC_API_KEY": "stub-key",
+        "INFERENCE_EXECUTOR": "thread",
+        "YAMNET_EAGER_LOAD": "false",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+    })
+    if not args.cache:
+        os.environ.update({"ANALYSIS_CACHE_BACKEND": "none", "MESSAGE_CACHE_BACKEND": "none"})
+
+    import main as app_module
+    from api.controller.dependencies import Services
+    from benchmarks.fake_yamnet import FakeYamnet, install_fake_yamnet
+
+    services = Services()
+    model = install_fake_yamnet(services.emotion_service, FakeYamnet(
+        seconds_per_call=args.model_ms_per_call / 1000,
+        seconds_per_patch=args.model_ms_per_patch / 1000
+    ))
+
+    server, thread, base_url = start_server(app_module.create_app(services))
+    try:
+        results = asyncio.run(drive(base_url, args, log))
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+        stub.stop()
+
+    print(f"fake YAMNet calls: {model.calls}, Claude stub requests: {stub.requests}", file=log)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline")}
+    finish(build_report("load", results, options), args, "load")
+
+
+if __name__ == "__main__":
+    main()
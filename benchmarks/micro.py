@@ -0,0 +1,163 @@
+"""오디오 경로의 단계별 마이크로벤치마크를 실행하고 JSON 보고서를 만듭니다.
+
+    python -m benchmarks.micro --rates 16000 44100 48000 --seconds 1 5 30 -o micro.json
+    python -m benchmarks.micro --baseline            # benchmarks/baselines/micro.json과 비교
+    python -m benchmarks.micro --update-baseline     # 현재 결과를 기준값으로 저장
+
+측정 항목은 WAV 디코딩(wav_decode), 16kHz 리샘플링(resample), 감정 점수 계산(emotion_scores),
+AudioService 특징 추출(sound_features), 응답 직렬화(serialize)입니다. 합성 클립은 시드를 고정해 만들며,
+항목마다 호출 하나씩의 시간을 재서 백분위수를 계산합니다.
+"""
+import argparse
+import io
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+from scipy.io import wavfile
+
+from api.config.catalogConfig import TRACK_CATALOG_PATH
+from api.controller.responses import RawJSON, encode_object, json_response
+from api.model.schemas import BatchAnalysisResponse, BatchClipResult
+from api.service.audio_ingest import decode_wav
+from api.service.audio_service import AudioService
+from api.service.emotion_service import YAMNET_SAMPLE_RATE, EmotionService
+from api.service.resampler import resample
+from api.service.track_catalog import TrackCatalog
+from benchmarks.fake_yamnet import NUM_CLASSES, install_fake_yamnet
+from benchmarks.report import add_baseline_arguments, build_report, finish, latency_summary
+
+
+def make_clip(seconds: float, sample_rate: int, channels: int = 1, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    audio = 0.3 * np.sin(2 * np.pi * 440 * t) + 0.05 * rng.standard_normal(len(t))
+    if channels > 1:
+        audio = np.stack([audio] * channels, axis=1)
+    return audio.astype(np.float32)
+
+
+def to_wav_bytes(audio: np.ndarray, sample_rate: int) -> bytes:
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sample_rate, (audio * 32767).astype(np.int16))
+    return buffer.getvalue()
+
+
+def measure(fn: Callable, min_time: float, min_calls: int = 20) -> Dict[str, float]:
+    for _ in range(3):
+        fn()
+
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_calls or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - call_started)
+
+    return {"calls": len(timings), "ops_per_sec": len(timings) / sum(timings), **latency_summary(timings, unit="us")}
+
+
+def sample_fields(service: EmotionService, class_scores: np.ndarray) -> Dict:
+    """/analyze-emotion 응답에서 추천 곡을 뺀 나머지 필드."""
+    emotion, confidence, details = service._build_result(class_scores)
+    return {
+        'emotion': emotion,
+        'confidence': confidence,
+        'emotion_description': service.get_emotion_description(emotion),
+        'recommendation_message': "오늘의 분위기에 어울리는 음악을 골라봤어요. " * 8,
+        'emotion_details': details,
+    }
+
+
+def run(args, log) -> Dict[str, Dict]:
+    benchmarks: Dict[str, Callable] = {}
+    audio_service = AudioService()
+
+    for sample_rate in args.rates:
+        for seconds in args.seconds:
+            clip = make_clip(seconds, sample_rate)
+            suffix = f"{sample_rate}hz_{seconds:g}s"
+            for channels in args.channels:
+                wav = to_wav_bytes(make_clip(seconds, sample_rate, channels), sample_rate)
+                benchmarks[f"wav_decode/{suffix}_{channels}ch"] = lambda wav=wav: decode_wav(wav)
+            if sample_rate != YAMNET_SAMPLE_RATE:
+                benchmarks[f"resample/{suffix}"] = lambda clip=clip, sr=sample_rate: resample(clip, sr, YAMNET_SAMPLE_RATE)
+            benchmarks[f"sound_features/{suffix}"] = lambda clip=clip, sr=sample_rate: audio_service._classify_sound(clip, sr)
+
+    service = EmotionService()
+    install_fake_yamnet(service)
+    rng = np.random.default_rng(1)
+    class_scores = [rng.random(NUM_CLASSES, dtype=np.float32) ** 4 for _ in range(64)]
+    top_indices = [service._top_class_indices(scores, 10) for scores in class_scores]
+    counter = iter(range(1 << 62))
+
+    def emotion_scores():
+        i = next(counter) % len(class_scores)
+        service._calculate_emotion_scores(class_scores[i], top_indices[i])
+
+    benchmarks["emotion_scores/top10"] = emotion_scores
+    benchmarks["emotion_scores/build_result"] = lambda: service._build_result(class_scores[next(counter) % len(class_scores)])
+
+    # 라우트와 같은 경로: 카탈로그에서 미리 직렬화한 트랙 바이트를 이어 붙이고 나머지는 orjson으로 씁니다.
+    catalog = TrackCatalog(TRACK_CATALOG_PATH)
+    catalog.reload()
+    tracks = catalog.sample_category("calm", 1)
+    fields = sample_fields(service, class_scores[0])
+
+    def emotion_response():
+        return json_response(encode_object({
+            'emotion': fields['emotion'],
+            'confidence': fields['confidence'],
+            'emotion_description': fields['emotion_description'],
+            'recommendation_message': fields['recommendation_message'],
+            'recommendations': RawJSON(catalog.encode_tracks(tracks)),
+            'emotion_details': fields['emotion_details'],
+        })).body
+
+    batch = BatchAnalysisResponse(results=[
+        BatchClipResult(
+            id=str(i),
+            emotion=fields['emotion'],
+            confidence=fields['confidence'],
+            emotion_description=fields['emotion_description'],
+            emotion_details=fields['emotion_details']
+        )
+        for i in range(16)
+    ])
+    benchmarks["serialize/emotion_response"] = emotion_response
+    benchmarks["serialize/batch16"] = lambda: json_response(batch.model_dump_json().encode()).body
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if args.filter and not any(pattern in name for pattern in args.filter):
+            continue
+        results[name] = measure(fn, args.min_time)
+        result = results[name]
+        print(
+            f"{name:<40} p50 {result['p50_us']:10.1f} us  p99 {result['p99_us']:10.1f} us  "
+            f"{result['ops_per_sec']:10.0f} ops/s",
+            flush=True,
+            file=log
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.micro")
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 22050, 44100, 48000])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 5, 30])
+    parser.add_argument("--channels", type=int, nargs="+", default=[1, 2])
+    parser.add_argument("--min-time", type=float, default=0.2, help="항목마다 측정할 최소 시간(초)")
+    parser.add_argument("--filter", nargs="+", help="이름에 이 문자열이 들어간 항목만 실행")
+    add_baseline_arguments(parser, "micro")
+    args = parser.parse_args()
+
+    # 보고서를 표준 출력으로 쓸 때는 진행 상황을 stderr로 보냅니다.
+    results = run(args, sys.stderr if args.output in (None, "-") else sys.stdout)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline")}
+    finish(build_report("micro", results, options), args, "micro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""벤치마크 결과 JSON 보고서를 만들고 저장된 기준값(baseline)과 비교합니다.
+
+보고서 형식:
+
+    {"suite": "micro", "meta": {...}, "results": {"이름": {"p50_us": ..., "ops_per_sec": ...}}}
+
+두 보고서를 직접 비교할 수도 있습니다:
+
+    python -m benchmarks.report current.json benchmarks/baselines/micro.json --tolerance 0.25
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+
+# 지표 이름 끝부분으로 좋아지는 방향을 정합니다. 목록에 없는 지표와 잡음이 큰 최댓값은 비교하지 않습니다.
+_HIGHER_IS_BETTER = ("_per_sec",)
+_LOWER_IS_BETTER = ("_us", "_ms", "error_rate")
+_NOT_COMPARED = ("max_",)
+
+
+def latency_summary(seconds: Sequence[float], unit: str = "ms") -> Dict[str, float]:
+    scale = {"ms": 1e3, "us": 1e6}[unit]
+    values = np.asarray(seconds, dtype=np.float64) * scale
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {
+        f"p50_{unit}": float(p50),
+        f"p90_{unit}": float(p90),
+        f"p99_{unit}": float(p99),
+        f"max_{unit}": float(values.max()),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(suite: str, results: Dict[str, Dict], options: Dict) -> Dict:
+    return {
+        "suite": suite,
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "options": options,
+        },
+        "results": results,
+    }
+
+
+def write_report(report: Dict, path: Optional[str]):
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if path is None or path == "-":
+        print(text)
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text + "\n")
+
+
+def load_report(path: str) -> Dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _direction(metric: str) -> int:
+    if metric.startswith(_NOT_COMPARED):
+        return 0
+    if metric.endswith(_HIGHER_IS_BETTER):
+        return 1
+    if metric.endswith(_LOWER_IS_BETTER):
+        return -1
+    return 0
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[Dict]:
+    """기준값보다 tolerance 비율 이상 나빠진 지표 목록을 돌려줍니다. 한쪽에만 있는 항목은 건너뜁니다."""
+    regressions = []
+    for name, metrics in report["results"].items():
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            reference = expected.get(metric)
+            if direction == 0 or not isinstance(reference, (int, float)) or not isinstance(value, (int, float)):
+                continue
+            if metric.endswith("error_rate"):
+                # 오류율은 비율로 비교하면 0에서 의미가 없으므로 절대 차이로 봅니다.
+                worse = value - reference > tolerance / 10
+            elif reference <= 0:
+                continue
+            else:
+                change = (value - reference) / reference * direction
+                worse = change < -tolerance
+            if worse:
+                regressions.append({"name": name, "metric": metric, "baseline": reference, "current": value})
+    return regressions
+
+
+def print_comparison(report: Dict, baseline: Dict, tolerance: float, file=None) -> bool:
+    """비교 결과를 표로 출력하고, 회귀가 없으면 True를 돌려줍니다."""
+    regressions = compare(report, baseline, tolerance)
+    flagged = {(r["name"], r["metric"]) for r in regressions}
+
+    file = file or sys.stdout
+    print(f"baseline commit {baseline['meta'].get('commit')} vs current {report['meta'].get('commit')}, tolerance {tolerance:.0%}", file=file)
+    for name, metrics in report["results"].items():
+        expected = baseline["results"].get(name, {})
+        for metric, value in metrics.items():
+            reference = expected.get(metric)
+            if _direction(metric) == 0 or not isinstance(reference, (int, float)):
+                continue
+            ratio = f"{value / reference:6.2f}x" if reference else "     -"
+            mark = "  REGRESSION" if (name, metric) in flagged else ""
+            print(f"  {name:<40} {metric:<14} {reference:12.2f} -> {value:12.2f} {ratio}{mark}", file=file)
+
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed beyond {tolerance:.0%}", file=file)
+    return not regressions
+
+
+def add_baseline_arguments(parser: argparse.ArgumentParser, suite: str):
+    parser.add_argument("--output", "-o", help="JSON 보고서를 쓸 경로 (기본값: 표준 출력)")
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=os.path.join(BASELINE_DIR, f"{suite}.json"),
+        help=f"비교할 기준 보고서 (값 없이 쓰면 benchmarks/baselines/{suite}.json)"
+    )
+    parser.add_argument("--tolerance", type=float, default=0.25, help="회귀로 볼 최소 변화 비율")
+    parser.add_argument("--update-baseline", action="store_true", help=f"결과를 benchmarks/baselines/{suite}.json에 저장")
+
+
+def finish(report: Dict, args: argparse.Namespace, suite: str):
+    """보고서를 저장하고, 기준값이 지정되면 비교해 회귀가 있을 때 종료 코드 1로 끝냅니다."""
+    write_report(report, args.output)
+    if args.update_baseline:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        write_report(report, os.path.join(BASELINE_DIR, f"{suite}.json"))
+    if args.baseline:
+        # 보고서를 표준 출력으로 쓸 때는 JSON과 섞이지 않도록 비교 표를 stderr로 보냅니다.
+        file = sys.stderr if args.output in (None, "-") else sys.stdout
+        if not print_comparison(report, load_report(args.baseline), args.tolerance, file=file):
+            sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.report")
+    parser.add_argument("report")
+    parser.add_argument("baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    if not print_comparison(load_report(args.report), load_report(args.baseline), args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
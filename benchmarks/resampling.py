@@ -0,0 +1,83 @@
+"""캐시된 폴리페이즈 리샘플러와 resampy의 속도와 정확도(SNR)를 비교합니다.
+
+    python -m benchmarks.resampling --rates 8000 22050 44100 48000 --seconds 1 10 60
+
+SNR은 resampy 출력을 기준으로 계산합니다. "in-band"는 나이퀴스트의 85% 이하로
+대역 제한한 신호, "broadband"는 백색 잡음이 섞인 신호입니다. 두 필터는 전이 대역
+(나이퀴스트의 약 90~100%) 모양이 달라 broadband SNR은 그 부분의 차이가 대부분을 차지합니다.
+"""
+import argparse
+import time
+
+import numpy as np
+import resampy
+from scipy import signal
+
+from api.service.resampler import resample
+
+TARGET_RATE = 16000
+
+
+def make_signal(sample_rate: int, seconds: float, broadband: bool, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(sample_rate * seconds)) / sample_rate
+    nyquist = min(sample_rate, TARGET_RATE) / 2
+    tones = rng.uniform(50, 0.85 * nyquist, size=12)
+    audio = sum(rng.uniform(0.02, 0.1) * np.sin(2 * np.pi * f * t + rng.uniform(0, 2 * np.pi)) for f in tones)
+    noise = 0.02 * rng.standard_normal(t.shape)
+    if not broadband:
+        sos = signal.butter(8, 0.85 * nyquist, fs=sample_rate, output='sos')
+        noise = signal.sosfiltfilt(sos, noise)
+    return (audio + noise).astype(np.float32)
+
+
+def snr_db(reference: np.ndarray, estimate: np.ndarray) -> float:
+    n = min(len(reference), len(estimate))
+    # 양 끝의 필터 과도 구간은 제외합니다.
+    edge = min(n // 10, TARGET_RATE // 10)
+    reference, estimate = reference[edge:n - edge], estimate[edge:n - edge]
+    return float(10 * np.log10(np.sum(reference ** 2) / np.sum((reference - estimate) ** 2)))
+
+
+def best_time(fn, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rates", type=int, nargs="+", default=[8000, 22050, 32000, 44100, 48000])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 10, 60])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # numba JIT 컴파일과 필터 설계를 측정에서 제외합니다.
+    for rate in args.rates:
+        warm = make_signal(rate, 0.1, True)
+        resampy.resample(warm, rate, TARGET_RATE)
+        resample(warm, rate, TARGET_RATE)
+
+    print(f"{'rate':>6} {'sec':>5} {'resampy ms':>11} {'poly ms':>8} {'speedup':>8} {'in-band dB':>11} {'broadband dB':>13}")
+    for rate in args.rates:
+        for seconds in args.seconds:
+            band_limited = make_signal(rate, seconds, broadband=False)
+            broadband = make_signal(rate, seconds, broadband=True)
+
+            resampy_time = best_time(lambda: resampy.resample(band_limited, rate, TARGET_RATE), args.repeat)
+            poly_time = best_time(lambda: resample(band_limited, rate, TARGET_RATE), args.repeat)
+
+            in_band = snr_db(resampy.resample(band_limited, rate, TARGET_RATE), resample(band_limited, rate, TARGET_RATE))
+            wide = snr_db(resampy.resample(broadband, rate, TARGET_RATE), resample(broadband, rate, TARGET_RATE))
+
+            print(
+                f"{rate:>6} {seconds:>5g} {resampy_time * 1000:>11.1f} {poly_time * 1000:>8.1f} "
+                f"{resampy_time / poly_time:>7.1f}x {in_band:>11.1f} {wide:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""응답 본문 하나를 만드는 데 드는 직렬화 비용을 이전 경로(before)와 현재 경로(after)로 비교합니다.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --timeline-windows 60 --min-time 0.5 -o serialization.json --baseline
+
+before는 라우트가 pydantic 모델이나 dict를 돌려주고 FastAPI가 response_model로 다시 검증한 뒤 jsonable 객체로 바꿔
+json.dumps로 쓰던 경로(fastapi.routing.serialize_response + JSONResponse)를 그대로 실행합니다.
+after는 api.controller.responses로 미리 직렬화한 트랙 바이트를 이어 붙이고 나머지를 orjson으로 쓰는 현재 경로입니다.
+항목마다 두 경로의 본문을 json.loads로 비교해 같은 응답인지 먼저 확인합니다.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from api.config.catalogConfig import TRACK_CATALOG_PATH
+from api.controller.responses import RawJSON, dumps, encode_object, json_response
+from api.model.schemas import (
+    BatchAnalysisResponse,
+    BatchClipResult,
+    EmotionMusicRecommendationResponse,
+    MusicRecommendationResponse,
+)
+from api.service.emotion_service import EmotionService
+from api.service.track_catalog import TrackCatalog
+from benchmarks.fake_yamnet import NUM_CLASSES, install_fake_yamnet
+from benchmarks.micro import measure
+from benchmarks.report import add_baseline_arguments, build_report, finish
+
+MESSAGE = "오늘의 분위기에 어울리는 음악을 골라봤어요. " * 8
+
+
+def fastapi_serialize(field, content: Any) -> bytes:
+    """FastAPI가 라우트 반환값을 응답 본문으로 만드는 경로를 그대로 실행합니다."""
+    # serialize_response는 is_coroutine=True이면 중간에 멈추지 않으므로 이벤트 루프 없이 끝까지 실행합니다.
+    coroutine = serialize_response(field=field, response_content=content, is_coroutine=True)
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return JSONResponse(stop.value).body
+    raise RuntimeError("serialize_response suspended unexpectedly")
+
+
+def build_cases(args) -> Dict[str, Tuple[Callable[[], bytes], Callable[[], bytes]]]:
+    emotion_service = EmotionService()
+    install_fake_yamnet(emotion_service)
+    catalog = TrackCatalog(TRACK_CATALOG_PATH)
+    catalog.reload()
+
+    rng = np.random.default_rng(args.seed)
+    emotion, confidence, details = emotion_service._build_result(rng.random(NUM_CLASSES, dtype=np.float32) ** 4)
+    if args.timeline_windows:
+        details['timeline'] = [
+            {'start': i * 5.0, 'end': (i + 1) * 5.0, 'emotion': emotion, 'confidence': float(rng.random())}
+            for i in range(args.timeline_windows)
+        ]
+    description = emotion_service.get_emotion_description(emotion)
+    tracks = catalog.sample_category("calm", args.tracks)
+    descriptions = emotion_service.emotion_descriptions
+
+    emotion_field = create_model_field("Response", EmotionMusicRecommendationResponse, mode="serialization")
+    sound_field = create_model_field("Response", MusicRecommendationResponse, mode="serialization")
+    batch_field = create_model_field("Response", BatchAnalysisResponse, mode="serialization")
+
+    def emotions_before():
+        return fastapi_serialize(None, {
+            "emotions": [{"id": emotion_id, "description": text} for emotion_id, text in descriptions.items()]
+        })
+
+    emotions_json = dumps({"emotions": [{"id": emotion_id, "description": text} for emotion_id, text in descriptions.items()]})
+
+    def emotion_before():
+        return fastapi_serialize(emotion_field, EmotionMusicRecommendationResponse(
+            emotion=emotion,
+            confidence=confidence,
+            emotion_description=description,
+            recommendation_message=MESSAGE,
+            recommendations=tracks,
+            emotion_details=details
+        ))
+
+    def emotion_after():
+        return json_response(encode_object({
+            'emotion': emotion,
+            'confidence': confidence,
+            'emotion_description': description,
+            'recommendation_message': MESSAGE,
+            'recommendations': RawJSON(catalog.encode_tracks(tracks)),
+            'emotion_details': details,
+        })).body
+
+    def sound_before():
+        return fastapi_serialize(sound_field, MusicRecommendationResponse(
+            category="잔잔", description="조용하고 편안한 환경", recommendations=tracks
+        ))
+
+    def sound_after():
+        return json_response(encode_object({
+            'category': "잔잔",
+            'description': "조용하고 편안한 환경",
+            'recommendations': RawJSON(catalog.encode_tracks(tracks)),
+        })).body
+
+    batch = BatchAnalysisResponse(results=[
+        BatchClipResult(id=str(i), emotion=emotion, confidence=confidence, emotion_description=description, emotion_details=details)
+        for i in range(args.batch_clips)
+    ])
+
+    def stream_before():
+        return json.dumps({
+            "emotion": emotion,
+            "confidence": confidence,
+            "emotion_description": description,
+            "recommendations": [track.model_dump() for track in tracks],
+            "emotion_details": details,
+        }, ensure_ascii=False).encode()
+
+    def stream_after():
+        return encode_object({
+            "emotion": emotion,
+            "confidence": confidence,
+            "emotion_description": description,
+            "recommendations": RawJSON(catalog.encode_tracks(tracks)),
+            "emotion_details": details,
+        })
+
+    return {
+        "emotions": (emotions_before, lambda: json_response(emotions_json).body),
+        "analyze_emotion": (emotion_before, emotion_after),
+        "analyze_sound": (sound_before, sound_after),
+        f"batch{args.batch_clips}": (
+            lambda: fastapi_serialize(batch_field, batch),
+            lambda: json_response(batch.model_dump_json().encode()).body
+        ),
+        "stream_analysis_event": (stream_before, stream_after),
+    }
+
+
+def run(args, log) -> Dict[str, Dict]:
+    results = {}
+    for name, (before, after) in build_cases(args).items():
+        if json.loads(before()) != json.loads(after()):
+            raise AssertionError(f"{name}: before and after bodies differ")
+        results[f"{name}/before"] = measure(before, args.min_time)
+        results[f"{name}/after"] = measure(after, args.min_time)
+        old, new = results[f"{name}/before"], results[f"{name}/after"]
+        print(
+            f"{name:<24} before p50 {old['p50_us']:8.1f} us  after p50 {new['p50_us']:8.1f} us  "
+            f"({old['p50_us'] / new['p50_us']:5.1f}x, {len(after())} bytes)",
+            flush=True,
+            file=log
+        )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.serialization")
+    parser.add_argument("--tracks", type=int, default=1, help="응답에 넣을 추천 곡 수")
+    parser.add_argument("--timeline-windows", type=int, default=0, help="emotion_details에 넣을 타임라인 구간 수")
+    parser.add_argument("--batch-clips", type=int, default=16, help="배치 응답의 클립 수")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-time", type=float, default=0.2, help="항목마다 측정할 최소 시간(초)")
+    add_baseline_arguments(parser, "serialization")
+    args = parser.parse_args()
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+
+    results = run(args, log)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline")}
+    finish(build_report("serialization", results, options), args, "serialization")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""uvicorn 워커 수를 늘릴 때 모델을 워커마다 올리는 방식과 공유 추론 서버를 쓰는 방식의 메모리와 처리량을 비교합니다.
+
+    python -m benchmarks.shared_model --workers 1 2 4 --fake-model-mb 300 -o shared_model.json
+
+모드마다 실제 `uvicorn --workers N` 프로세스를 띄우고 analyze_emotion 시나리오로 부하를 건 뒤,
+/proc/<pid>/smaps_rollup에서 프로세스별 RSS와 PSS를 읽습니다.
+
+- inprocess: 워커마다 가짜 YAMNet을 올립니다 (INFERENCE_EXECUTOR=thread).
+- remote: 가짜 YAMNet은 공유 추론 서버 한 곳에만 올리고 워커는 유닉스 소켓으로 호출합니다.
+
+가짜 모델은 --fake-model-mb만큼 메모리를 채워 YAMNet과 TF 런타임이 차지하는 상주 메모리를 흉내 냅니다.
+실제 TF가 없는 환경에서도 돌아가지만, 처리량은 머신의 코어 수에 크게 좌우되므로 여러 코어에서 측정하세요.
+Linux 전용입니다.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+import numpy as np
+
+from benchmarks.anthropic_stub import AnthropicStub
+from benchmarks.load import Scenario, make_wavs, run_scenario
+from benchmarks.report import add_baseline_arguments, build_report, finish
+
+MODES = ("inprocess", "remote")
+
+
+def _fake_model():
+    from benchmarks.fake_yamnet import FakeYamnet
+
+    model = FakeYamnet(
+        seconds_per_call=float(os.environ["BENCH_MODEL_MS_PER_CALL"]) / 1000,
+        seconds_per_patch=float(os.environ["BENCH_MODEL_MS_PER_PATCH"]) / 1000
+    )
+    # 페이지가 실제로 잡히도록 값을 채워 둡니다.
+    model.weights = np.ones(int(float(os.environ["BENCH_FAKE_MODEL_MB"]) * (1 << 20)), dtype=np.uint8)
+    return model
+
+
+def create_app():
+    """`uvicorn --factory`로 부르는 앱 팩토리. 워커 안에서 모델을 쓰는 모드면 가짜 YAMNet을 설치합니다."""
+    import main as app_module
+    from api.controller.dependencies import Services
+    from benchmarks.fake_yamnet import install_fake_yamnet
+
+    services = Services()
+    if os.environ.get("INFERENCE_EXECUTOR") != "remote":
+        install_fake_yamnet(services.emotion_service, _fake_model())
+    return app_module.create_app(services)
+
+
+def serve_inference(path: str, workers: int):
+    from api.config.loggingConfig import setup_logging
+    from api.service.emotion_service import EmotionService
+    from api.service.inference_server import InferenceServer
+    from benchmarks.fake_yamnet import install_fake_yamnet
+
+    setup_logging()
+    service = EmotionService()
+    install_fake_yamnet(service, _fake_model())
+    try:
+        asyncio.run(InferenceServer(service, workers=workers).serve(path))
+    except KeyboardInterrupt:
+        pass
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            children.extend(int(child) for child in f.read().split())
+    return children
+
+
+def _is_worker(pid: int) -> bool:
+    # uvicorn 감시 프로세스의 자식에는 워커 말고 multiprocessing의 resource_tracker도 있습니다.
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        return b"spawn_main" in f.read()
+
+
+def _memory_mb(pid: int) -> Dict[str, float]:
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in ("Rss", "Pss"):
+                values[key.lower()] = int(rest.split()[0]) / 1024
+    return values
+
+
+def _wait_ready(base_url: str, workers: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/inference/stats", timeout=1).json().get("ready"):
+                # 워커마다 요청을 나눠 받기 전에 모두 기동을 마칠 시간을 줍니다.
+                for _ in range(workers * 4):
+                    httpx.get(f"{base_url}/api/inference/stats", timeout=5)
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not become ready in {timeout:.0f}s")
+
+
+def _stop(process: subprocess.Popen):
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+        try:
+            process.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+def measure(mode: str, workers: int, args, env: Dict[str, str], log) -> Dict:
+    env = dict(env)
+    processes = []
+    server_pid = None
+    with tempfile.TemporaryDirectory() as tmp:
+        if mode == "remote":
+            socket_path = os.path.join(tmp, "inference.sock")
+            env.update({"INFERENCE_EXECUTOR": "remote", "INFERENCE_SERVER_SOCKET": socket_path})
+            server = subprocess.Popen(
+                [sys.executable, "-m", "benchmarks.shared_model", "--serve-inference", socket_path],
+                env=env
+            )
+            processes.append(server)
+            server_pid = server.pid
+        else:
+            env["INFERENCE_EXECUTOR"] = "thread"
+
+        port = _free_port()
+        app = subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "benchmarks.shared_model:create_app", "--factory",
+                "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers),
+                "--log-level", "warning", "--no-access-log",
+            ],
+            env=env
+        )
+        processes.append(app)
+        base_url = f"http://127.0.0.1:{port}"
+        try:
+            _wait_ready(base_url, workers, args.startup_timeout)
+            result = asyncio.run(_drive(base_url, args))
+
+            # 워커가 하나면 uvicorn은 감시 프로세스 없이 자기 자신이 워커가 됩니다.
+            children = _children(app.pid) if workers > 1 else []
+            worker_pids = [pid for pid in children if _is_worker(pid)] or [app.pid]
+            worker_memory = [_memory_mb(pid) for pid in worker_pids]
+            # 감시 프로세스, resource_tracker, (remote 모드의) 추론 서버도 합계에 넣습니다.
+            other_pids = [pid for pid in [app.pid, *children] if pid not in worker_pids] + ([server_pid] if server_pid else [])
+            other_memory = [_memory_mb(pid) for pid in other_pids]
+            all_memory = worker_memory + other_memory
+            result.update({
+                "worker_rss_mb": sum(m["rss"] for m in worker_memory) / len(worker_memory),
+                "worker_pss_mb": sum(m["pss"] for m in worker_memory) / len(worker_memory),
+                "inference_server_pss_mb": _memory_mb(server_pid)["pss"] if server_pid else 0.0,
+                "total_pss_mb": sum(m["pss"] for m in all_memory),
+            })
+        finally:
+            for process in reversed(processes):
+                _stop(process)
+
+    print(
+        f"{mode:<10} workers {workers:<3} {result['requests_per_sec']:8.1f} req/s  p99 {result.get('p99_ms', 0):8.1f} ms  "
+        f"worker PSS {result['worker_pss_mb']:7.1f} MB  total PSS {result['total_pss_mb']:7.1f} MB",
+        flush=True,
+        file=log
+    )
+    return result
+
+
+async def _drive(base_url: str, args) -> Dict:
+    wavs = make_wavs(args.rates, args.seconds)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        scenario = Scenario("analyze_emotion", wavs, batch_size=1)
+        return await run_scenario(client, scenario, args.requests, args.concurrency, args.warmup)
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.shared_model")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="측정할 uvicorn 워커 수")
+    parser.add_argument("--requests", type=int, default=200, help="구성마다 보낼 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--rates", type=int, nargs="+", default=[16000, 44100])
+    parser.add_argument("--seconds", type=float, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--fake-model-mb", type=float, default=200, help="가짜 모델이 차지할 상주 메모리(MB)")
+    parser.add_argument("--model-ms-per-call", type=float, default=2.0, help="가짜 YAMNet 호출당 고정 지연")
+    parser.add_argument("--model-ms-per-patch", type=float, default=0.5, help="가짜 YAMNet 패치당 지연")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Claude 스텁의 응답 지연(초)")
+    parser.add_argument("--startup-timeout", type=float, default=60)
+    parser.add_argument("--serve-inference", metavar="SOCKET", help=argparse.SUPPRESS)
+    add_baseline_arguments(parser, "shared_model")
+    args = parser.parse_args()
+
+    if args.serve_inference:
+        serve_inference(args.serve_inference, workers=int(os.environ.get("INFERENCE_WORKERS", "2")))
+        return
+
+    log = sys.stderr if args.output in (None, "-") else sys.stdout
+    stub = AnthropicStub(latency_seconds=args.llm_latency, token_interval_seconds=0.0).start()
+    env = {
+        **os.environ,
+        "ANTHROPIC_BASE_URL": stub.base_url,
+        "ANTHROPIC_API_KEY": "stub-key",
+        "YAMNET_EAGER_LOAD": "true",
+        "ANALYSIS_CACHE_BACKEND": "none",
+        "MESSAGE_CACHE_BACKEND": "none",
+        "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+        "BENCH_FAKE_MODEL_MB": str(args.fake_model_mb),
+        "BENCH_MODEL_MS_PER_CALL": str(args.model_ms_per_call),
+        "BENCH_MODEL_MS_PER_PATCH": str(args.model_ms_per_patch),
+    }
+
+    results = {}
+    try:
+        for mode in args.modes:
+            for workers in args.workers:
+                results[f"{mode}/workers_{workers}"] = measure(mode, workers, args, env, log)
+    finally:
+        stub.stop()
+
+    print(f"cpu count: {os.cpu_count()}", file=log)
+    options = {key: value for key, value in vars(args).items() if key not in ("output", "baseline", "update_baseline", "serve_inference")}
+    finish(build_report("shared_model", results, options), args, "shared_model")
+
+
+if __name__ == "__main__":
+    main()
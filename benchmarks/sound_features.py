@@ -0,0 +1,81 @@
+"""/analyze-sound에서 쓰는 DSP 특징 추출의 처리량을 비교합니다.
+
+    python -m benchmarks.sound_features --seconds 1 --sample-rate 16000 --clips 256
+
+legacy는 전체 신호에 복소 FFT를 한 번 거는 기존 구현이고, frame은 AudioService의
+프레임별 rfft 구현을 클립마다 호출한 것, batch는 같은 클립들을 2차원 배열 하나로
+classify_batch에 넘긴 것입니다. request는 base64 디코딩과 WAV 파싱을 포함한 요청 하나의 처리량입니다.
+"""
+import argparse
+import base64
+import io
+import time
+
+import numpy as np
+from scipy.io import wavfile
+
+from api.service.audio_service import AudioService
+
+
+def legacy_features(audio: np.ndarray, sample_rate: int):
+    energy = float(np.sqrt(np.mean(audio ** 2)))
+    zcr = float(np.sum(np.abs(np.diff(np.sign(audio)))) / 2 / len(audio))
+    fft = np.fft.fft(audio)
+    magnitude = np.abs(fft[:len(fft)//2])
+    freqs = np.fft.fftfreq(len(audio), 1/sample_rate)[:len(fft)//2]
+    spectral_centroid = np.sum(freqs * magnitude) / np.sum(magnitude) if np.sum(magnitude) > 0 else 0
+    return energy, zcr, float(spectral_centroid)
+
+
+def make_clips(count: int, seconds: float, sample_rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    freqs = rng.uniform(100, 3000, size=(count, 1))
+    levels = rng.uniform(0.05, 0.9, size=(count, 1))
+    clips = levels * np.sin(2 * np.pi * freqs * t) + rng.uniform(0, 0.3, size=(count, 1)) * rng.standard_normal((count, len(t)))
+    return clips.clip(-1, 1).astype(np.float32)
+
+
+def rate(fn, items: int, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return items / best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--clips", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    service = AudioService()
+    clips = make_clips(args.clips, args.seconds, args.sample_rate)
+    sr = args.sample_rate
+
+    legacy_categories = [service._determine_category(*legacy_features(clip, sr)) for clip in clips]
+    batch_categories = service.classify_batch(clips, sr)
+    agreement = np.mean([a[0] == b[0] for a, b in zip(legacy_categories, batch_categories)])
+
+    buffer = io.BytesIO()
+    wavfile.write(buffer, sr, (clips[0] * 32767).astype(np.int16))
+    request_body = base64.b64encode(buffer.getvalue()).decode()
+
+    results = {
+        "legacy": rate(lambda: [legacy_features(clip, sr) for clip in clips], len(clips), args.repeat),
+        "frame": rate(lambda: [service._classify_sound(clip, sr) for clip in clips], len(clips), args.repeat),
+        "batch": rate(lambda: service.classify_batch(clips, sr), len(clips), args.repeat),
+        "request": rate(lambda: [service.analyze_audio_base64(request_body) for _ in range(len(clips))], len(clips), args.repeat),
+    }
+
+    print(f"{args.clips} clips x {args.seconds:g}s @ {sr}Hz, category agreement with legacy: {agreement:.1%}")
+    for name, clips_per_second in results.items():
+        print(f"{name:>8}: {clips_per_second:10.0f} clips/s  ({1e6 / clips_per_second:8.1f} us/clip)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""대규모 트랙 카탈로그의 로드 시간, id 조회, 목록 응답 생성 속도를 측정합니다.
+
+    python -m benchmarks.track_catalog --tracks 50000
+
+page는 미리 직렬화한 JSON을 이어 붙이는 TrackCatalog.page_json, pydantic은 같은 페이지를
+TrackPage 모델로 만들어 직렬화하는 기존 방식입니다.
+"""
+import argparse
+import csv
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from api.model.schemas import TrackPage
+from api.service.track_catalog import TRACK_FIELDS, TrackCatalog
+
+CATEGORIES = ["calm", "energetic", "urban", "nature", "indoor"]
+
+
+def make_rows(count: int):
+    rng = random.Random(0)
+    return [
+        {
+            "id": f"track_{i}",
+            "title": f"곡 {i}",
+            "artist": f"아티스트 {rng.randrange(count // 20 or 1)}",
+            "album": f"앨범 {i // 10}",
+            "coverUrl": f"/images/{i}.jpg",
+            "audioUrl": f"/music/{i}.mp3",
+            "duration": rng.randrange(120, 420),
+            "category": rng.choice(CATEGORIES),
+        }
+        for i in range(count)
+    ]
+
+
+def write_catalogs(rows, directory: str):
+    paths = {}
+
+    paths["json"] = os.path.join(directory, "tracks.json")
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump(rows, f, ensure_ascii=False)
+
+    paths["csv"] = os.path.join(directory, "tracks.csv")
+    with open(paths["csv"], "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=TRACK_FIELDS + ("category",))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    paths["sqlite"] = os.path.join(directory, "tracks.sqlite3")
+    connection = sqlite3.connect(paths["sqlite"])
+    columns = TRACK_FIELDS + ("category",)
+    connection.execute(f"CREATE TABLE tracks ({', '.join(columns)})")
+    connection.executemany(
+        f"INSERT INTO tracks VALUES ({', '.join('?' for _ in columns)})",
+        [tuple(row[column] for column in columns) for row in rows]
+    )
+    connection.commit()
+    connection.close()
+    return paths
+
+
+def per_call_us(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.tracks)
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_catalogs(rows, directory)
+
+        print(f"{args.tracks} tracks")
+        catalogs = {}
+        for name, path in paths.items():
+            catalog = TrackCatalog(path)
+            start = time.perf_counter()
+            catalog.reload()
+            print(f"  load {name:>6}: {(time.perf_counter() - start) * 1000:8.1f} ms")
+            catalogs[name] = catalog
+
+    catalog = catalogs["json"]
+    ids = [row["id"] for row in rows]
+    rng = random.Random(1)
+    page = dict(offset=args.tracks // 10, limit=args.page_size, category="calm")
+
+    def pydantic_page():
+        snapshot = catalog.snapshot
+        positions = snapshot.positions("calm")
+        tracks = [snapshot.tracks[p] for p in positions[page["offset"]:page["offset"] + page["limit"]]]
+        return TrackPage(total=len(positions), offset=page["offset"], limit=page["limit"], tracks=tracks).model_dump_json()
+
+    assert json.loads(catalog.page_json(**page)) == json.loads(pydantic_page())
+
+    print(f"  get by id:        {per_call_us(lambda: catalog.get(rng.choice(ids)), 100000):8.2f} us")
+    print(f"  sample category:  {per_call_us(lambda: catalog.sample_category('calm', 1), 100000):8.2f} us")
+    print(f"  page_json ({args.page_size}):   {per_call_us(lambda: catalog.page_json(**page), 10000):8.2f} us")
+    print(f"  pydantic ({args.page_size}):    {per_call_us(pydantic_page, 10000):8.2f} us")
+    artist = rows[0]["artist"]
+    print(f"  category+artist: {per_call_us(lambda: catalog.page_json(category='calm', artist=artist), 10000):8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,57 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import Depends, FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from api.config.loggingConfig import setup_logging
+
+# 서비스 객체가 만들어지며 남기는 로그도 큐를 거치도록 컨트롤러를 불러오기 전에 설정합니다.
+setup_logging()
+
 from api.controller import audio_controller
+from api.controller.dependencies import Services, get_services
+from api.service import metrics
+
+def create_app(services: Optional[Services] = None) -> FastAPI:
+    """services를 넘기지 않으면 lifespan 시작 시 설정값으로 만듭니다. 모듈 import만으로는 서비스가 만들어지지 않습니다."""
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        app.state.services = services or Services()
+        await app.state.services.startup()
+        yield
+        await app.state.services.shutdown()
+
+    app = FastAPI(title="VIBE Music Recommendation API", lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173", "http://localhost:3000"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(metrics.MetricsMiddleware)
+    app.include_router(audio_controller.router, prefix="/api", tags=["audio"])
+
+    @app.get("/")
+    def read_root():
+        return {"message": "VIBE Music Recommendation API"}
+
+    @app.get("/ready")
+    def read_ready(services: Services = Depends(get_services)):
+        if not services.is_ready():
+            return JSONResponse(status_code=503, content={"ready": False})
+        return {"ready": True}
 
-app = FastAPI(title="VIBE Music Recommendation API")
+    @app.get("/metrics", include_in_schema=False)
+    def read_metrics():
+        body, content_type = metrics.render()
+        return Response(content=body, media_type=content_type)
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:5173", "http://localhost:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-app.include_router(audio_controller.router, prefix="/api", tags=["audio"])
+    return app
 
-@app.get("/")
-def read_root():
-    return {"message": "VIBE Music Recommendation API"}
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn